@@ -0,0 +1,60 @@
+"""Start the app once and print its startup phases as JSON
+
+Run by benchmarks.run in a fresh interpreter, from a scratch directory
+holding a copy of assets/ and an empty config/. The process quits as soon
+as the web view has been created, before any page is fetched. With
+--no-web the web view is never created and it quits after the first paint.
+"""
+import json
+import sys
+import time
+
+STARTED = time.perf_counter()
+
+POLL_MS = 5
+TIMEOUT_MS = 30000
+
+
+def main():
+    wait_for_web = '--no-web' not in sys.argv
+    from PyQt5.QtCore import QStandardPaths, QTimer, Qt
+    from PyQt5.QtWidgets import QApplication
+    from src.app_window import GoogleTasksApp
+    from src.startup_profile import StartupProfile
+    profile = StartupProfile(False, STARTED)
+    profile.mark("imports")
+
+    # Keep the benchmark's task store away from the user's data
+    QStandardPaths.setTestModeEnabled(True)
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    app.setApplicationName("Google Tasks Benchmark")
+    profile.mark("QApplication")
+
+    if not wait_for_web:
+        GoogleTasksApp.init_web_view = lambda self: None
+    window = GoogleTasksApp(profile)
+    window.start()
+
+    ready = []
+
+    def check():
+        if window.browser is not None if wait_for_web else window.web_view_pending:
+            ready.append(True)
+            app.quit()
+        else:
+            QTimer.singleShot(POLL_MS, check)
+
+    QTimer.singleShot(0, check)
+    QTimer.singleShot(TIMEOUT_MS, app.quit)
+    app.exec_()
+    if not ready:
+        sys.exit("timed out before the window was ready")
+
+    json.dump({'phases': [[phase, step * 1000, total * 1000]
+                          for phase, step, total in profile.phases]}, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
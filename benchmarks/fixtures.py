@@ -0,0 +1,78 @@
+import html
+import os
+import random
+import time
+
+WORDS = ("review", "draft", "call", "email", "plan", "fix", "book", "pay", "order", "update",
+         "report", "budget", "meeting", "invoice", "design", "release", "notes", "groceries",
+         "dentist", "travel", "backup", "slides", "contract", "team", "weekly", "client")
+
+# Same selectors the page runtime, the observer and the exporters rely on
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Tasks fixture ({count} items)</title></head>
+<body>
+<input aria-label="Add a task">
+<input aria-label="Due date">
+<div role="button" aria-label="Add task">Add</div>
+<div role="list">
+{items}
+</div>
+</body>
+</html>
+"""
+
+ITEM_TEMPLATE = ('<div role="listitem" data-id="{id}">'
+                 '<input type="checkbox"{checked}>'
+                 '<span aria-label="Task title">{title}</span>'
+                 '{due}</div>')
+
+
+def generate_tasks(count, seed=0, now=None):
+    """Task dicts shaped like the store's, deterministic for a seed and now
+
+    Roughly a fifth are completed, a quarter have no due date and the rest
+    are spread from a month overdue to three months ahead.
+    """
+    rng = random.Random(seed)
+    now = time.time() if now is None else now
+    tasks = []
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        if rng.random() < 0.25:
+            due, due_ts = '', None
+        else:
+            due_ts = int(now + rng.uniform(-30, 90) * 86400) // 86400 * 86400
+            due = time.strftime('%Y-%m-%d', time.gmtime(due_ts))
+        tasks.append({
+            'id': f"task-{i}",
+            'title': f"{title.capitalize()} #{i}",
+            'notes': " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+            'due': due,
+            'due_ts': due_ts,
+            'completed': rng.random() < 0.2,
+        })
+    return tasks
+
+
+def render_page(tasks):
+    """Static HTML with one Google Tasks-like list item per task"""
+    items = []
+    for task in tasks:
+        due = (f'<span aria-label="Due date">{html.escape(task["due"])}</span>'
+               if task['due'] else '')
+        items.append(ITEM_TEMPLATE.format(
+            id=html.escape(task['id'], quote=True),
+            checked=' checked' if task['completed'] else '',
+            title=html.escape(task['title']),
+            due=due))
+    return PAGE_TEMPLATE.format(count=len(tasks), items="\n".join(items))
+
+
+def write_page(directory, count, seed=0):
+    """Write (or reuse) the fixture page for ``count`` items and return its path"""
+    path = os.path.join(directory, f"tasks-{count}-{seed}.html")
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_page(generate_tasks(count, seed)))
+    return path
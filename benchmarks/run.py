@@ -0,0 +1,438 @@
+"""Offline benchmarks for the scraping, scheduling, export and styling paths
+
+    python -m benchmarks.run [--sizes 100,1000,10000,100000] [--repeat 5]
+                             [--only scan,due,export,css,startup]
+                             [--save-baseline [--allow-skipped]] [--baseline PATH]
+
+Everything runs on the offscreen Qt platform against generated fixtures,
+so no network or display is needed. Results are written as JSON and, when
+a baseline exists, compared against it; the exit status is 1 if any
+benchmark got slower than the threshold allows.
+
+Every run also times a fixed pure-Python workload, the calibration.
+Timings are compared as ratios after scaling the baseline by how much
+faster or slower this machine ran the calibration, so the tracked
+reference run in benchmarks/baseline.json stays meaningful on other
+machines. Per-run output goes to benchmarks/results/, which is not
+tracked. A baseline is only saved when nothing was skipped for want of a
+dependency (QtWebEngine, pyarrow, ...), unless --allow-skipped is given.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+GROUPS = ('scan', 'due', 'export', 'css', 'startup')
+# Writers too slow to be worth running at every size
+MAX_SIZE = {'pdf': 10000}
+EXTRACT_CHUNK = 500
+PAGE_TIMEOUT_MS = 120000
+# Slower than baseline by more than this fraction, and by at least
+# MIN_DELTA_MS, counts as a regression
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_MS = 0.5
+CALIBRATION = 'calibration'
+# The fastest of many runs, being the least disturbed by other load
+CALIBRATION_RUNS = 25
+
+
+class Results:
+    """Benchmark name -> timing summary, plus skipped benchmarks"""
+
+    def __init__(self):
+        self.timings = {}
+        self.skipped = {}
+        # Skipped because something is missing here, not by design
+        self.unavailable = set()
+
+    def add(self, name, samples, **extra):
+        self.timings[name] = dict(summarize(samples), **extra)
+        timing = self.timings[name]
+        print(f"  {name:<36}{timing['median_ms']:>12.3f} ms  (min {timing['min_ms']:.3f}, "
+              f"{timing['runs']} runs)", flush=True)
+
+    def skip(self, name, reason, unavailable=True):
+        self.skipped[name] = reason
+        if unavailable:
+            self.unavailable.add(name)
+        print(f"  {name:<36}{'skipped':>12}  ({reason})", flush=True)
+
+
+def summarize(samples):
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+        'runs': len(samples),
+    }
+
+
+def measure(fn, repeat, setup=None):
+    """Run ``fn`` ``repeat`` times and return each duration in ms"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def wait_until(app, condition, timeout_ms=PAGE_TIMEOUT_MS):
+    from PyQt5.QtCore import QEventLoop
+    deadline = time.perf_counter() + timeout_ms / 1000
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("timed out waiting for the page")
+        app.processEvents(QEventLoop.AllEvents | QEventLoop.WaitForMoreEvents, 50)
+
+
+def calibrate(results):
+    """A fixed CPU-bound workload that measures the machine, not the app"""
+    rng = random.Random(0)
+    words = [''.join(rng.choice('abcdefghij') for _ in range(8)) for _ in range(20000)]
+
+    def workload():
+        counts = {}
+        for word in sorted(words):
+            counts[word[:3]] = counts.get(word[:3], 0) + len(word)
+        json.dumps(counts)
+
+    results.add(CALIBRATION, measure(workload, CALIBRATION_RUNS))
+
+
+def bench_due(results, sizes, repeat, workdir):
+    """check_due_tasks: read scheduled tasks from the store and rebuild the heap"""
+    from benchmarks.fixtures import generate_tasks
+    from src.scheduler import DueScheduler
+    from src.task_store import PAGE_LIST_ID, TaskStore
+    for size in sizes:
+        store = TaskStore(os.path.join(workdir, f"due-{size}.db"))
+        tasks = generate_tasks(size)
+        store.replace_list(PAGE_LIST_ID, tasks)
+        scheduler = DueScheduler()
+        results.add(f"due.check_due_tasks[{size}]",
+                    measure(lambda: scheduler.set_tasks(store.scheduled_tasks()), repeat))
+        changed = [dict(tasks[0], due_ts=(tasks[0]['due_ts'] or 0) + 3600)]
+        results.add(f"due.update[{size}]",
+                    measure(lambda: scheduler.update(changed, []), repeat))
+        store.close()
+
+
+def bench_export(results, sizes, repeat, workdir):
+    """Each registered writer into memory, and a full CSV ExportJob to disk"""
+    from benchmarks.fixtures import generate_tasks
+    from src.export_worker import ExportJob
+    from src.exporter import EXPORTERS, get_exporter, is_available, run_export
+    for size in sizes:
+        tasks = generate_tasks(size)
+        for name, export_format in EXPORTERS.items():
+            label = f"export.{name}[{size}]"
+            if size > MAX_SIZE.get(name, size):
+                results.skip(label, f"runs up to {MAX_SIZE[name]} tasks", unavailable=False)
+                continue
+            if not is_available(export_format):
+                results.skip(label, f"missing dependency: {', '.join(export_format.requires)}")
+                continue
+            buffer_type = io.BytesIO if export_format.binary else io.StringIO
+            last = {}
+
+            def export_once():
+                last['buffer'] = buffer_type()
+                run_export(name, tasks, last['buffer'])
+
+            samples = measure(export_once, repeat)
+            # Output size, to compare the compressed and columnar formats
+            output = last['buffer'].getvalue()
+            if isinstance(output, str):
+                output = output.encode('utf-8')
+            results.add(label, samples, bytes=len(output))
+
+        path = os.path.join(workdir, f"export-{size}.csv")
+        results.add(f"export.job.csv[{size}]",
+                    measure(lambda: ExportJob(get_exporter('csv'), tasks, path).run(), repeat))
+
+
+def bench_css(results, repeat):
+    """Minify every theme from source, bypassing the load cache"""
+    from src.stylesheets import STYLES_DIR, available_themes, minify_css
+    for theme in available_themes() + ['custom']:
+        path = os.path.join(ROOT, STYLES_DIR, f"{theme}.css")
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        results.add(f"css.minify.{theme}", measure(lambda: minify_css(source), repeat),
+                    bytes=len(source))
+
+
+def bench_page(app, results, sizes, repeat, workdir, groups):
+    """Load fixture pages, time the observer's first scan, chunked extraction
+    and stylesheet injection through the real runtime"""
+    try:
+        from PyQt5.QtCore import QUrl
+        from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineScript
+        from src.js_runtime import JsRuntime
+        from src.stylesheets import StyleSheetManager, load_stylesheet
+        from src.task_bridge import TaskBridge
+    except ImportError as e:
+        for group in groups:
+            results.skip(f"{group}.page", f"QtWebEngine unavailable: {e}")
+        return
+
+    from benchmarks.fixtures import write_page
+    for size in sizes:
+        page = QWebEnginePage()
+        runtime = JsRuntime(page)
+        runtime.install()
+        bridge = TaskBridge()
+        bridge.install(page)
+        state = {}
+        page.loadFinished.connect(lambda ok: state.setdefault('loaded', time.perf_counter()))
+        bridge.tasks_changed.connect(
+            lambda upserted, removed, reset: reset and state.setdefault('scanned', time.perf_counter()))
+        url = QUrl.fromLocalFile(write_page(workdir, size))
+
+        load_samples, scan_samples, extracted = [], [], 0
+        for run in range(repeat):
+            state.clear()
+            started = time.perf_counter()
+            if run == 0:
+                page.load(url)
+            else:
+                page.triggerAction(QWebEnginePage.Reload)
+            wait_until(app, lambda: 'loaded' in state and 'scanned' in state)
+            load_samples.append((state['loaded'] - started) * 1000)
+            scan_samples.append((state['scanned'] - started) * 1000)
+        if 'scan' in groups:
+            results.add(f"scan.load[{size}]", load_samples)
+            results.add(f"scan.observer_first_scan[{size}]", scan_samples)
+
+            def extract():
+                nonlocal extracted
+                extracted = 0
+                cursor = [0]
+
+                def on_chunk(chunk):
+                    nonlocal extracted
+                    extracted += len(chunk['tasks']) if chunk else 0
+                    cursor[0] = chunk['next'] if chunk else None
+                    if cursor[0] is not None:
+                        runtime.call('extractChunk', cursor[0], EXTRACT_CHUNK, callback=on_chunk)
+
+                runtime.call('extractChunk', 0, EXTRACT_CHUNK, callback=on_chunk)
+                wait_until(app, lambda: cursor[0] is None)
+
+            results.add(f"scan.extract[{size}]", measure(extract, repeat), tasks=extracted)
+
+        if 'css' in groups:
+            stylesheets = StyleSheetManager(page)
+            themes = [load_stylesheet('light'), load_stylesheet('dark')]
+
+            def inject():
+                done = []
+                themes.reverse()
+                stylesheets.set_layers(theme=themes[0])
+                # Scripts run in order, so this returns after the restyle
+                page.runJavaScript("0", QWebEngineScript.ApplicationWorld, done.append)
+                wait_until(app, lambda: done)
+
+            results.add(f"css.inject[{size}]", measure(inject, repeat))
+        page.deleteLater()
+
+
+def bench_startup(results, repeat, workdir):
+    """Cold start in a fresh interpreter, to the first paint and to the web view"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen',
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    for label, flags in (('window', ['--no-web']), ('web_view', [])):
+        samples, phases = [], {}
+        for run in range(repeat):
+            scratch = os.path.join(workdir, f"startup-{label}-{run}")
+            shutil.copytree(os.path.join(ROOT, 'assets'), os.path.join(scratch, 'assets'))
+            os.makedirs(os.path.join(scratch, 'config'))
+            started = time.perf_counter()
+            proc = subprocess.run([sys.executable, '-m', 'benchmarks.cold_start'] + flags,
+                                  cwd=scratch, env=env, capture_output=True, text=True)
+            elapsed = (time.perf_counter() - started) * 1000
+            if proc.returncode != 0:
+                error = (proc.stderr.strip().splitlines() or [f"exit {proc.returncode}"])[-1]
+                results.skip(f"startup.{label}", error)
+                break
+            samples.append(elapsed)
+            for phase, _, total in json.loads(proc.stdout)['phases']:
+                phases.setdefault(phase, []).append(total)
+        else:
+            results.add(f"startup.{label}.process", samples)
+            for phase, totals in phases.items():
+                results.add(f"startup.{label}.{phase.replace(' ', '_')}", totals)
+
+
+def machine_scale(current, baseline):
+    """How much slower this machine is than the baseline's, by calibration"""
+    now = current['timings'].get(CALIBRATION)
+    then = baseline['timings'].get(CALIBRATION)
+    if not now or not then or not then['min_ms']:
+        return None
+    return now['min_ms'] / then['min_ms']
+
+
+def compare(current, baseline, threshold):
+    """Print changes against a baseline and return the regressed names
+
+    Baseline timings are scaled by machine_scale() first, so a slower or
+    faster machine doesn't read as a regression or an improvement.
+    """
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta'].get('date', '?')} "
+          f"({baseline['meta'].get('platform', '?')})")
+    scale = machine_scale(current, baseline)
+    if scale is None:
+        print("  WARNING: no calibration in the baseline; comparing raw timings,"
+              " which only works on the machine that recorded it")
+        scale = 1.0
+    else:
+        print(f"  This machine ran the calibration at {scale:.2f}x the baseline's time;"
+              " baseline timings are scaled to match")
+    unchecked = []
+    for name, timing in current['timings'].items():
+        if name == CALIBRATION:
+            continue
+        before = baseline['timings'].get(name)
+        if before is None:
+            unchecked.append(name)
+            continue
+        expected = before['median_ms'] * scale
+        delta = timing['median_ms'] - expected
+        ratio = timing['median_ms'] / expected if expected else 1.0
+        flag = ''
+        if ratio > 1 + threshold and delta > MIN_DELTA_MS:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"  {name:<36}{expected:>12.3f} -> {timing['median_ms']:>10.3f} ms"
+              f"  ({ratio - 1:+.0%}){flag}")
+    if unchecked:
+        print(f"  WARNING: {len(unchecked)} benchmarks have no baseline and were not checked:"
+              f" {', '.join(unchecked)}")
+    return regressions
+
+
+def metadata(sizes, repeat):
+    from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'platform': platform.platform(),
+        'sizes': list(sizes),
+        'repeat': repeat,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Run the offline benchmarks")
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated fixture sizes (list items)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark")
+    parser.add_argument('--only', default=",".join(GROUPS),
+                        help=f"comma-separated groups out of {', '.join(GROUPS)}")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'),
+                        help="where to write this run's results")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help="results to compare against, if the file exists")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="also store this run as the new baseline")
+    parser.add_argument('--allow-skipped', action='store_true',
+                        help="save the baseline even if benchmarks were skipped"
+                             " for a missing dependency")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a result counts as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    groups = [group for group in args.only.split(',') if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        print(f"Unknown groups: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from PyQt5.QtCore import QStandardPaths, Qt
+    from PyQt5.QtWidgets import QApplication
+    QStandardPaths.setTestModeEnabled(True)
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication([sys.argv[0]])
+
+    results = Results()
+    print("Calibration")
+    calibrate(results)
+    with tempfile.TemporaryDirectory(prefix='gt-bench-') as workdir:
+        if 'due' in groups:
+            print("Due-date scheduling")
+            bench_due(results, sizes, args.repeat, workdir)
+        if 'export' in groups:
+            print("Exports")
+            bench_export(results, sizes, args.repeat, workdir)
+        if 'css' in groups:
+            print("Stylesheets")
+            bench_css(results, args.repeat)
+        page_groups = [group for group in ('scan', 'css') if group in groups]
+        if page_groups:
+            print("Fixture pages")
+            bench_page(app, results, sizes, args.repeat, workdir, page_groups)
+        if 'startup' in groups:
+            print("Cold start")
+            bench_startup(results, args.repeat, workdir)
+
+    current = {'meta': metadata(sizes, args.repeat), 'timings': results.timings,
+               'skipped': results.skipped}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(current, json.load(f), args.threshold)
+    if args.save_baseline:
+        if results.unavailable and not args.allow_skipped:
+            print(f"\nNot saving the baseline: {', '.join(sorted(results.unavailable))} "
+                  "could not run here (see --allow-skipped)", file=sys.stderr)
+            return 1
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
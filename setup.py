@@ -8,6 +8,9 @@ setup(
     entry_points={
         'gui_scripts': [
             'google-tasks=src.main:main'
+        ],
+        'console_scripts': [
+            'google-tasks-cli=src.cli:main'
         ]
     },
     package_data={
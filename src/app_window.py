@@ -1,22 +1,60 @@
+import csv
+import io
 import os
-import json
-from PyQt5.QtCore import QSize, QUrl, Qt, QTimer, QDateTime
+from PyQt5.QtCore import QSize, QUrl, Qt, QTimer, QDateTime, QThreadPool
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QWidget, QMenuBar, 
-                            QMenu, QAction, QSystemTrayIcon, QStatusBar,
-                            QInputDialog, QMessageBox, QFileDialog)
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEngineSettings
-from PyQt5.QtGui import QIcon, QFont
-from PyQt5.QtMultimedia import QSound
+                            QMenu, QAction, QStatusBar,
+                            QInputDialog, QMessageBox, QFileDialog,
+                            QProgressDialog, QSystemTrayIcon, QShortcut,
+                            QApplication)
+from PyQt5.QtGui import QFont, QKeySequence
+from src.settings import load_settings
+from src.startup_profile import StartupProfile
+from src.stylesheets import StyleSheetManager, available_themes, load_stylesheet
+from src.sync_worker import SyncJob
+from src.metrics import metrics, timed
+from src.delta_export import DELTA_FORMATS, manifest_path
+from src.export_worker import DeltaExportJob, ExportJob, PageTaskSource
+from src.exporter import available_exporters, get_exporter
+from src.ics_feed import IcsFeed
+from src.import_worker import ImportJob, PageImporter
+from src.importer import IMPORTERS, importer_for_filename, read_lines, read_tasks
+from src.mini_view import MiniTaskView
+from src.notifications import NotificationCenter
+from src.global_hotkey import GlobalHotkey
+from src.quick_add import QuickAddPopup
+from src.scheduler import DueScheduler
+from src.search_index import SearchIndex
+from src.search_palette import SearchPalette
+from src.task_model import TaskListModel
+from src.task_store import TaskStore, PAGE_LIST_ID
+from src.task_writer import TaskWriter
+from src.tasks_api import get_api_credentials
+from src.tray_icon import SystemTrayIcon
+from src.utilities import system_idle_seconds
 
 class GoogleTasksApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_profile=None):
         super().__init__()
+        self.startup_profile = startup_profile or StartupProfile()
+        
         # Configuration
+        self.settings = load_settings()
         self.zoom_factor = 1.0
-        self.current_theme = "light"
+        self.current_theme = self.settings['theme']
         self.font_size = 14
-        self.notification_enabled = True
-        self.notification_sound = True
+        self.notification_enabled = self.settings['notifications']
+        self.notification_sound = self.settings['sound']
+        
+        # Local task store shared by export and notifications
+        self.task_store = TaskStore()
+        
+        # In-memory view of the store for native widgets like the mini view,
+        # filled by load_tasks() once the window or tray is up
+        self.task_model = TaskListModel(self)
+        self.search_index = SearchIndex()
+        self.mini_view = None
+        self.search_palette = None
         
         # Initialize UI
         self.init_ui()
@@ -24,34 +62,232 @@ class GoogleTasksApp(QMainWindow):
         self.init_tray_icon()
         self.create_status_bar()
         self.setup_notification_checker()
+        self.setup_api_sync()
+        self.setup_ics_feed()
+        self.setup_quick_add()
+        self.setup_prewarm()
+        self.setup_metrics()
+        self.startup_profile.mark("window and tray")
+        QTimer.singleShot(0, self.load_tasks)
+    
+    def start(self):
+        """Show the window, or stay in the tray when start_minimized is set"""
+        if self.settings['start_minimized'] and QSystemTrayIcon.isSystemTrayAvailable():
+            # The web view stays unloaded until the window is first opened
+            # or the idle prewarm kicks in
+            self.startup_profile.report()
+        else:
+            self.show()
+    
+    def setup_prewarm(self):
+        """Load the web view in the background once the user is idle"""
+        self.prewarm_timer = QTimer(self)
+        self.prewarm_timer.setSingleShot(True)
+        self.prewarm_timer.timeout.connect(self.prewarm_web_view)
+        if self.settings['prewarm_web_view']:
+            self.prewarm_timer.start(self.settings['prewarm_delay_seconds'] * 1000)
+        if self.settings['preload_app_shell']:
+            QTimer.singleShot(self.settings['preload_app_shell_delay_seconds'] * 1000,
+                              self.preload_app_shell)
+    
+    def prewarm_web_view(self):
+        """Create the web view while hidden, waiting while the user is active"""
+        if self.browser is not None:
+            return
+        idle = system_idle_seconds()
+        if idle is not None and idle < self.settings['prewarm_idle_seconds']:
+            self.prewarm_timer.start(self.settings['prewarm_idle_seconds'] * 1000)
+            return
+        self.init_web_view()
+    
+    def setup_metrics(self):
+        """Record hot-path timings when enabled and keep the panel one key away"""
+        self.debug_panel = None
+        # Not listed in any menu; meant for support and profiling
+        debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        debug_shortcut.setContext(Qt.ApplicationShortcut)
+        debug_shortcut.activated.connect(self.show_debug_panel)
+        
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(self.settings['metrics_dump_minutes'] * 60000)
+        self.metrics_timer.timeout.connect(self.dump_metrics)
+        self.set_metrics_recording(self.settings['metrics_enabled'])
+        QApplication.instance().aboutToQuit.connect(self.dump_metrics)
+    
+    def set_metrics_recording(self, enabled):
+        """Turn recording on or off, with the periodic dump only while on"""
+        metrics.enabled = enabled
+        if enabled:
+            if not self.metrics_timer.isActive():
+                self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+    
+    def dump_metrics(self):
+        if metrics.enabled:
+            metrics.dump()
+    
+    def show_debug_panel(self):
+        from src.debug_panel import DebugPanel
+        if self.debug_panel is None:
+            self.debug_panel = DebugPanel(self)
+            self.debug_panel.recording_changed.connect(self.set_metrics_recording)
+        self.debug_panel.show()
+        self.debug_panel.raise_()
     
     def init_ui(self):
         self.setWindowTitle("Google Tasks")
         self.setMinimumSize(QSize(800, 600))
         
-        # Main browser view
+        # The web view is created after the window first paints, so the
+        # window, tray and menus don't wait for Chromium to start
+        self.browser = None
+        self.web_view_pending = False
+        # Loaded, and ready for writes only while also Active (not frozen
+        # or discarded in the tray)
+        self.page_loaded = False
+        self.page_ready = False
+        self.web_profile = None
+        self.request_filter = None
+        self.shell_preloader = None
+        
+        # Layout with subtle margins
+        self.browser_layout = QVBoxLayout()
+        self.browser_layout.setContentsMargins(5, 5, 5, 5)
+        
+        container = QWidget()
+        container.setLayout(self.browser_layout)
+        self.setCentralWidget(container)
+    
+    def init_web_view(self):
+        """Create the web view and start loading Google Tasks"""
+        if self.browser is not None:
+            return
+        self.prewarm_timer.stop()
+        from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineSettings
+        from src.js_runtime import JsRuntime
+        from src.page_lifecycle import PageLifecycleManager
+        from src.task_bridge import TaskBridge
+        from src.web_profile import APP_URL
+        self.startup_profile.mark("web engine import")
+        
+        # Main browser view on the app's own persistent profile
         self.browser = QWebEngineView()
-        profile = QWebEngineProfile.defaultProfile()
-        profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+        self.browser.setPage(QWebEnginePage(self.get_web_profile(), self.browser))
+        if self.shell_preloader is not None:
+            self.shell_preloader.stop()
         
         # Enable web engine features
         settings = self.browser.settings()
         settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
         settings.setAttribute(QWebEngineSettings.LocalStorageEnabled, True)
         
-        self.browser.setUrl(QUrl("https://tasks.google.com/embed/"))
+        # Helper functions the app calls by name instead of sending scripts
+        self.js_runtime = JsRuntime(self.browser.page(), self)
+        self.js_runtime.install()
         
-        # Layout with subtle margins
-        layout = QVBoxLayout()
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.addWidget(self.browser)
+        # Task changes are pushed from the page instead of polled
+        self.task_bridge = TaskBridge(self)
+        self.task_bridge.install(self.browser.page())
+        self.task_bridge.tasks_changed.connect(self.on_tasks_changed)
         
-        container = QWidget()
-        container.setLayout(layout)
-        self.setCentralWidget(container)
+        self.browser.loadStarted.connect(self.on_page_load_started)
+        self.browser.loadFinished.connect(self.on_page_load_finished)
+        self.browser.loadFinished.connect(self.on_first_page_load)
+        self.browser.loadFinished.connect(self.schedule_cache_stats)
+        self.browser.setUrl(QUrl(APP_URL))
+        self.browser_layout.addWidget(self.browser)
         
         # Apply initial view settings
+        self.stylesheets = StyleSheetManager(self.browser.page())
         self.apply_view_settings()
+        
+        # Freeze, then discard, the page while the window sits in the tray
+        self.page_lifecycle = PageLifecycleManager(
+            self.browser, self.js_runtime,
+            self.settings['freeze_hidden_after_seconds'],
+            self.settings['discard_hidden_after_seconds'],
+            parent=self)
+        self.browser.page().lifecycleStateChanged.connect(self.on_page_lifecycle_changed)
+        if not self.isVisible():
+            self.page_lifecycle.window_hidden()
+        self.startup_profile.mark("web view created")
+    
+    def get_web_profile(self):
+        """The persistent web profile, created on first use"""
+        if self.web_profile is None:
+            from src.web_profile import create_web_profile
+            self.web_profile = create_web_profile(self.settings, self)
+            if self.settings['request_filter_enabled']:
+                from src.request_filter import RequestFilter
+                self.request_filter = RequestFilter(self.settings['request_block_rules'],
+                                                    self.settings['request_allow_rules'],
+                                                    self.web_profile)
+                self.web_profile.setUrlRequestInterceptor(self.request_filter)
+        return self.web_profile
+    
+    def preload_app_shell(self):
+        """Warm the HTTP cache while the web view is still unloaded"""
+        if self.browser is not None or self.shell_preloader is not None:
+            return
+        from src.web_profile import AppShellPreloader
+        self.shell_preloader = AppShellPreloader(self.get_web_profile(), self)
+        self.shell_preloader.start()
+    
+    def schedule_cache_stats(self, ok):
+        """Count cache hits for the loaded page once late resources are in"""
+        if ok and metrics.enabled:
+            from src.web_profile import CACHE_STATS_DELAY_MS, record_cache_stats
+            QTimer.singleShot(CACHE_STATS_DELAY_MS,
+                              lambda: self.page_call('resourceStats', callback=record_cache_stats))
+    
+    def on_page_load_started(self):
+        self.page_loaded = self.page_ready = False
+    
+    def on_page_load_finished(self, ok):
+        """Replay changes queued while the page was loading or offline"""
+        from src.page_lifecycle import ACTIVE
+        self.page_loaded = ok
+        self.page_ready = ok and self.page_lifecycle.state() == ACTIVE
+        if self.page_ready:
+            self.task_writer.replay()
+    
+    def on_page_lifecycle_changed(self, state):
+        """Hold writes while the page is frozen or discarded, replay on return"""
+        from src.page_lifecycle import ACTIVE, DISCARDED
+        if state == DISCARDED:
+            # The document is gone; it reloads when made active again
+            self.page_loaded = False
+        self.page_ready = self.page_loaded and state == ACTIVE
+        if self.page_ready:
+            self.task_writer.replay()
+    
+    def on_first_page_load(self, ok):
+        """Finish the startup profile once the page has loaded"""
+        self.browser.loadFinished.disconnect(self.on_first_page_load)
+        self.startup_profile.mark("page load" if ok else "page load (failed)")
+        self.startup_profile.report()
+        if self.request_filter is not None and self.request_filter.blocked_count():
+            self.statusBar().showMessage(
+                f"Blocked {self.request_filter.blocked_count()} of "
+                f"{self.request_filter.seen} requests", 3000)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.browser is not None:
+            self.page_lifecycle.window_shown()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.browser is not None and not self.isVisible():
+            self.page_lifecycle.window_hidden()
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.browser is None and not self.web_view_pending:
+            self.web_view_pending = True
+            self.startup_profile.mark("first paint")
+            QTimer.singleShot(0, self.init_web_view)
     
     def create_menu_bar(self):
         menubar = self.menuBar()
@@ -65,28 +301,31 @@ class GoogleTasksApp(QMainWindow):
         add_task.triggered.connect(self.add_new_task)
         tasks_menu.addAction(add_task)
         
+        # Quick Add
+        quick_add = QAction("Quick Add Task", self)
+        quick_add.setShortcut("Ctrl+Shift+A")
+        quick_add.triggered.connect(self.show_quick_add)
+        tasks_menu.addAction(quick_add)
+        
+        # Bulk Import
+        import_action = QAction("Import Tasks...", self)
+        import_action.triggered.connect(self.import_tasks)
+        tasks_menu.addAction(import_action)
+        
         # Complete Selected Task
         complete_task = QAction("Complete Selected Task", self)
         complete_task.setShortcut("Ctrl+D")
         complete_task.triggered.connect(self.complete_selected_task)
         tasks_menu.addAction(complete_task)
         
-        # Export Submenu
-        export_menu = QMenu("Export Tasks", self)
-        
-        export_json = QAction("JSON", self)
-        export_json.triggered.connect(lambda: self.export_tasks('json'))
-        
-        export_csv = QAction("CSV", self)
-        export_csv.triggered.connect(lambda: self.export_tasks('csv'))
-        
-        export_txt = QAction("Text", self)
-        export_txt.triggered.connect(lambda: self.export_tasks('txt'))
+        # Search
+        search_action = QAction("Search Tasks...", self)
+        search_action.setShortcut("Ctrl+K")
+        search_action.triggered.connect(self.open_search_palette)
+        tasks_menu.addAction(search_action)
         
-        export_menu.addAction(export_json)
-        export_menu.addAction(export_csv)
-        export_menu.addAction(export_txt)
-        tasks_menu.addMenu(export_menu)
+        # Export Submenu
+        tasks_menu.addMenu(self.create_export_menu())
         
         # View Menu
         view_menu = menubar.addMenu("View")
@@ -113,18 +352,11 @@ class GoogleTasksApp(QMainWindow):
         # Theme Submenu
         theme_menu = QMenu("Theme", self)
         
-        light_theme = QAction("Light", self)
-        light_theme.triggered.connect(lambda: self.set_theme("light"))
-        
-        dark_theme = QAction("Dark", self)
-        dark_theme.triggered.connect(lambda: self.set_theme("dark"))
-        
-        sepia_theme = QAction("Sepia", self)
-        sepia_theme.triggered.connect(lambda: self.set_theme("sepia"))
-        
-        theme_menu.addAction(light_theme)
-        theme_menu.addAction(dark_theme)
-        theme_menu.addAction(sepia_theme)
+        # One entry per stylesheet in assets/styles
+        for theme_name in available_themes():
+            action = QAction(theme_name.capitalize(), self)
+            action.triggered.connect(lambda _, t=theme_name: self.set_theme(t))
+            theme_menu.addAction(action)
         
         # Font Size Submenu
         font_menu = QMenu("Font Size", self)
@@ -147,6 +379,11 @@ class GoogleTasksApp(QMainWindow):
         view_menu.addSeparator()
         view_menu.addAction(fullscreen_action)
         
+        mini_view_action = QAction("Mini Task View", self)
+        mini_view_action.setShortcut("Ctrl+M")
+        mini_view_action.triggered.connect(self.toggle_mini_view)
+        view_menu.addAction(mini_view_action)
+        
         # Settings Menu
         settings_menu = menubar.addMenu("Settings")
         
@@ -155,194 +392,249 @@ class GoogleTasksApp(QMainWindow):
         notification_action.triggered.connect(self.show_notification_settings)
         settings_menu.addAction(notification_action)
     
+    def create_export_menu(self):
+        """Build an Export Tasks submenu with one entry per format available here"""
+        export_menu = QMenu("Export Tasks", self)
+        for export_format in available_exporters():
+            action = QAction(export_format.label, self)
+            action.triggered.connect(lambda _, name=export_format.name: self.export_tasks(name))
+            export_menu.addAction(action)
+        export_menu.addSeparator()
+        delta_action = QAction("Changes Since Last Export...", self)
+        delta_action.triggered.connect(self.export_task_changes)
+        export_menu.addAction(delta_action)
+        return export_menu
+    
     def create_status_bar(self):
         self.statusBar().showMessage("Ready")
         self.statusBar().setFont(QFont("Segoe UI", 9))
     
     def init_tray_icon(self):
         """Initialize system tray icon with enhanced menu"""
-        self.tray_icon = QSystemTrayIcon(self)
-        icon_path = os.path.join("assets", "icons", "tray.png")
-        if os.path.exists(icon_path):
-            self.tray_icon.setIcon(QIcon(icon_path))
-        
-        # Create tray menu
-        tray_menu = QMenu()
-        
-        # Quick Actions
-        new_task = QAction("Add New Task", self)
-        new_task.triggered.connect(self.add_new_task)
-        tray_menu.addAction(new_task)
-        
-        complete_task = QAction("Complete Task", self)
-        complete_task.triggered.connect(self.complete_selected_task)
-        tray_menu.addAction(complete_task)
-        
-        tray_menu.addSeparator()
-        
-        # Window Control
-        show_hide = QAction("Show/Hide", self)
-        show_hide.triggered.connect(self.toggle_window_visibility)
-        tray_menu.addAction(show_hide)
-        
-        fullscreen = QAction("Toggle Fullscreen", self)
-        fullscreen.triggered.connect(self.toggle_fullscreen)
-        tray_menu.addAction(fullscreen)
-        
-        tray_menu.addSeparator()
-        
-        # App Control
-        quit_action = QAction("Exit", self)
-        quit_action.triggered.connect(self.close)
-        tray_menu.addAction(quit_action)
-        
-        self.tray_icon.setContextMenu(tray_menu)
-        self.tray_icon.activated.connect(self.on_tray_click)
+        self.tray_icon = SystemTrayIcon(self)
         self.tray_icon.show()
+        
+        self.notifications = NotificationCenter(
+            self.tray_icon, self.settings['notification_min_interval_seconds'], parent=self)
     
     def setup_notification_checker(self):
-        """Setup timer for checking due tasks"""
-        if self.notification_enabled:
-            self.notification_timer = QTimer()
-            self.notification_timer.timeout.connect(self.check_due_tasks)
-            self.notification_timer.start(60000)  # Check every minute
+        """Schedule notifications for the next due task instead of polling"""
+        self.due_scheduler = DueScheduler(self)
+        self.due_scheduler.tasks_due.connect(self.show_due_task_notifications)
     
-    def check_due_tasks(self):
-        """Check for due tasks and show notifications"""
-        if not self.notification_enabled:
+    def setup_quick_add(self):
+        """Set up the task writer, the quick-add popup and its global hotkey"""
+        self.task_writer = TaskWriter(self.task_store, self.settings, self.page_call,
+                                      lambda: self.page_ready, self)
+        self.task_writer.applied.connect(self.on_task_applied)
+        self.task_writer.failed.connect(self.on_task_write_failed)
+        self.task_writer.queued.connect(self.on_task_queued)
+        self.task_writer.auth_needed.connect(self.on_auth_needed)
+        self.task_writer.page_needed.connect(self.wake_page)
+        # Changes left over from the last session; page ones wait for the page
+        if self.task_writer.pending_count():
+            QTimer.singleShot(0, self.task_writer.replay)
+        
+        self.quick_add = QuickAddPopup()
+        self.quick_add.submitted.connect(self.task_writer.add)
+        
+        # Where the hotkey can't be registered (taken by another app, or no
+        # X11/Windows) the popup is still reachable from the menu and the tray
+        self.global_hotkey = None
+        if self.settings['quick_add_hotkey']:
+            hotkey = GlobalHotkey(self.settings['quick_add_hotkey'], self)
+            hotkey.activated.connect(self.show_quick_add)
+            if hotkey.register():
+                self.global_hotkey = hotkey
+    
+    def show_quick_add(self):
+        self.quick_add.popup()
+    
+    def wake_page(self):
+        """Get the page running for queued changes, without showing the window"""
+        if self.browser is None:
+            self.init_web_view()
+        else:
+            self.page_lifecycle.wake()
+    
+    def on_task_applied(self, op, task):
+        """Mirror a change the writer applied through the API"""
+        if task and self.task_store.preferred_source() == 'api':
+            self.mirror_task_changes([task], [])
+        if op['kind'] == 'add':
+            self.statusBar().showMessage(f"Added task: {op['body']['title']}", 3000)
+        else:
+            self.statusBar().showMessage("Task marked as complete", 3000)
+    
+    def on_task_write_failed(self, title, error):
+        self.tray_icon.showMessage("Couldn't Save Task Change", f"{title}\n{error}",
+                                   QSystemTrayIcon.Warning, 5000)
+    
+    def on_task_queued(self, title):
+        self.statusBar().showMessage(
+            f"\"{title}\" is saved and will be sent once Google Tasks is reachable "
+            f"({self.task_writer.pending_count()} pending)", 5000)
+    
+    def on_auth_needed(self, error):
+        self.statusBar().showMessage(
+            "Google Tasks needs you to sign in again (google-tasks auth CLIENT_SECRET.json); "
+            "changes are kept until then", 10000)
+    
+    def setup_api_sync(self):
+        """Periodically sync the task store with the Google Tasks API"""
+        self.api_credentials = get_api_credentials(self.settings)
+        if not self.api_credentials:
+            return
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.sync_tasks)
+        self.sync_timer.start(self.settings['sync_interval_minutes'] * 60000)
+        QTimer.singleShot(0, self.sync_tasks)
+    
+    def setup_ics_feed(self):
+        """Keep the optional subscribable .ics file up to date"""
+        self.ics_feed = None
+        path = self.settings['ics_feed_path']
+        if not path:
+            return
+        try:
+            self.ics_feed = IcsFeed(self.task_store, os.path.expanduser(path),
+                                    self.settings['ics_feed_format'], self)
+        except ValueError as e:
+            self.statusBar().showMessage(f"Calendar feed disabled: {e}", 5000)
             return
-            
-        js = """
-        function getDueTasks() {
-            const dueTasks = [];
-            const now = new Date();
-            const items = document.querySelectorAll('[role="listitem"]');
-            
-            items.forEach(item => {
-                const checkbox = item.querySelector('input[type="checkbox"]');
-                if (checkbox && !checkbox.checked) {
-                    const dateElem = item.querySelector('[aria-label="Due date"]');
-                    if (dateElem && dateElem.textContent) {
-                        const dueDate = new Date(dateElem.textContent);
-                        if (dueDate <= now) {
-                            const titleElem = item.querySelector('[aria-label="Task title"]');
-                            if (titleElem) {
-                                dueTasks.push({
-                                    title: titleElem.textContent,
-                                    due: dateElem.textContent
-                                });
-                            }
-                        }
-                    }
-                }
-            });
-            
-            return dueTasks;
-        }
-        getDueTasks();
-        """
-        
-        self.browser.page().runJavaScript(js, self.show_due_task_notifications)
+        self.ics_feed.failed.connect(
+            lambda error: self.statusBar().showMessage(f"Calendar feed not updated: {error}", 5000))
+    
+    def sync_tasks(self):
+        """Start an incremental sync on a worker thread"""
+        job = SyncJob(self.task_store, self.api_credentials, self.settings['api_base_url'])
+        job.signals.finished.connect(self.on_sync_finished)
+        job.signals.failed.connect(
+            lambda error: self.statusBar().showMessage(f"Sync failed: {error}", 5000))
+        QThreadPool.globalInstance().start(job)
+    
+    def on_sync_finished(self, changes):
+        """Refresh notifications after the store picked up API changes"""
+        if changes.switched:
+            # Readers moved from the page's tasks to the API's
+            self.reload_tasks()
+        elif changes:
+            self.mirror_task_changes(changes.upserted, changes.removed)
+        if changes:
+            self.statusBar().showMessage(f"Synced {len(changes)} task changes", 3000)
+        # The API is reachable again
+        self.task_writer.replay()
+    
+    def on_tasks_changed(self, upserted, removed, reset):
+        """Store page changes and reschedule due notifications"""
+        with timed('tasks.apply_changes'):
+            self._apply_task_changes(upserted, removed, reset)
+    
+    def _apply_task_changes(self, upserted, removed, reset):
+        if reset:
+            # A page load sends every task; mirror only what differs
+            upserted, removed = self.task_store.replace_list(PAGE_LIST_ID, upserted)
+        else:
+            self.task_store.upsert_tasks(upserted)
+            self.task_store.delete_tasks(removed)
+        
+        if (upserted or removed) and self.task_store.preferred_source() == 'page':
+            self.mirror_task_changes(upserted, removed)
+    
+    def mirror_task_changes(self, upserted, removed):
+        """Apply incremental store changes to the scheduler, model and index"""
+        self.due_scheduler.update(upserted, removed)
+        self.task_model.apply_changes(upserted, removed)
+        self.search_index.update(upserted, removed)
+        if self.ics_feed is not None:
+            self.ics_feed.tasks_changed()
+    
+    def load_tasks(self):
+        """Build everything that mirrors the task store from scratch"""
+        tasks = self.task_store.all_tasks()
+        self.task_model.reset(tasks)
+        self.search_index.reset(tasks)
+        self.check_due_tasks()
+    
+    def reload_tasks(self):
+        """Rebuild the mirrors after the store changed wholesale"""
+        self.load_tasks()
+        if self.ics_feed is not None:
+            self.ics_feed.tasks_changed()
+    
+    def check_due_tasks(self):
+        """Rebuild the due-date schedule from the task store"""
+        # Overdue tasks fire straight away, the rest arm a single timer
+        with timed('tasks.check_due'):
+            self.due_scheduler.set_tasks(self.task_store.scheduled_tasks())
     
     def show_due_task_notifications(self, due_tasks):
         """Show notifications for due tasks"""
         if not due_tasks or not self.notification_enabled:
             return
-            
-        for task in due_tasks:
-            self.tray_icon.showMessage(
-                "Task Due!",
-                f"'{task['title']}' was due on {task['due']}",
-                QSystemTrayIcon.Warning,
-                10000
-            )
-            if self.notification_sound:
-                QSound.play(os.path.join("assets", "sounds", "notification.mp3"))
+        
+        self.notifications.sound_enabled = self.notification_sound
+        self.notifications.notify(due_tasks)
     
     def apply_view_settings(self):
         """Apply all current view settings"""
+        if self.browser is None:
+            return  # Applied when the web view is created
         self.browser.setZoomFactor(self.zoom_factor)
-        self.inject_css(self.get_theme_css())
-        self.inject_css(f"body {{ font-size: {self.font_size}px; }}")
+        self.stylesheets.set_layers(
+            theme=self.get_theme_css(),
+            font=self.get_font_css(),
+            custom=load_stylesheet("custom"))
     
     def adjust_zoom(self, delta):
         """Adjust zoom by delta amount"""
         self.zoom_factor += delta
         self.zoom_factor = max(0.5, min(2.0, self.zoom_factor))
-        self.browser.setZoomFactor(self.zoom_factor)
+        if self.browser is not None:
+            self.browser.setZoomFactor(self.zoom_factor)
         self.statusBar().showMessage(f"Zoom: {int(self.zoom_factor*100)}%", 2000)
     
     def set_zoom(self, factor):
         """Set zoom to specific factor"""
         self.zoom_factor = factor
-        self.browser.setZoomFactor(self.zoom_factor)
+        if self.browser is not None:
+            self.browser.setZoomFactor(self.zoom_factor)
         self.statusBar().showMessage("Zoom reset to 100%", 2000)
     
     def set_theme(self, theme_name):
         """Change application theme"""
         self.current_theme = theme_name
-        self.inject_css(self.get_theme_css())
+        if self.browser is not None:
+            self.stylesheets.set_layers(theme=self.get_theme_css())
         self.statusBar().showMessage(f"Theme set to {theme_name.capitalize()}", 2000)
     
     def set_font_size(self, size):
         """Change base font size"""
         self.font_size = size
-        self.inject_css(f"body {{ font-size: {size}px; }}")
+        if self.browser is not None:
+            self.stylesheets.set_layers(font=self.get_font_css())
         self.statusBar().showMessage(f"Font size set to {size}px", 2000)
     
     def get_theme_css(self):
         """Return CSS for current theme"""
-        themes = {
-            "light": """
-                body { 
-                    background-color: #ffffff;
-                    color: #202124;
-                }
-                [role="listitem"] {
-                    background-color: #f8f9fa !important;
-                }
-            """,
-            "dark": """
-                body { 
-                    background-color: #202124;
-                    color: #e8eaed;
-                }
-                [role="listitem"] {
-                    background-color: #303134 !important;
-                }
-                input, textarea {
-                    background-color: #303134 !important;
-                    color: #e8eaed !important;
-                }
-            """,
-            "sepia": """
-                body { 
-                    background-color: #f4ecd8;
-                    color: #5b4636;
-                }
-                [role="listitem"] {
-                    background-color: #e8e0c8 !important;
-                }
-            """
-        }
-        return themes.get(self.current_theme, themes["light"])
-    
-    def inject_css(self, css):
-        """Safely inject CSS into the web view"""
-        # Sanitize CSS input
-        sanitized_css = css.replace('`', r'\`').replace('${', r'\${')
-        
-        js = """
-        try {
-            const style = document.createElement('style');
-            style.textContent = `%s`;
-            document.head.appendChild(style);
-        } catch (e) {
-            console.error('CSS injection failed:', e);
-        }
-        """ % sanitized_css
-        
-        self.browser.page().runJavaScript(js)
+        return load_stylesheet(self.current_theme) or load_stylesheet("light")
+    
+    def get_font_css(self):
+        """Return CSS for the current base font size"""
+        return f"body{{font-size:{self.font_size}px}}"
+    
+    def page_loading(self):
+        """Tell the user when the page isn't available yet"""
+        if self.browser is None:
+            self.statusBar().showMessage("Google Tasks is still loading", 3000)
+            return True
+        return False
+    
+    def page_call(self, name, *args, callback=None):
+        """Call a page runtime function by name, batched with other calls"""
+        if self.page_loading():
+            return
+        self.js_runtime.call(name, *args, callback=callback)
     
     def add_new_task(self):
         """Add a new task through dialog"""
@@ -352,134 +644,210 @@ class GoogleTasksApp(QMainWindow):
         
         if ok and task_name:
             due_date = QDateTime.currentDateTime().toString("yyyy-MM-dd")
-            js = f"""
-            try {{
-                const input = document.querySelector('input[aria-label="Add a task"]');
-                if (input) {{
-                    input.value = `{task_name.replace('`', r'\`')}`;
-                    input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    
-                    const dateInput = document.querySelector('input[aria-label="Due date"]');
-                    if (dateInput) {{
-                        dateInput.value = `{due_date}`;
-                        dateInput.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    }}
-                    
-                    const addButton = document.querySelector('div[role="button"][aria-label="Add task"]');
-                    if (addButton) addButton.click();
-                }}
-            }} catch (e) {{
-                console.error('Failed to add task:', e);
-            }}
-            """
-            self.browser.page().runJavaScript(js)
-            self.statusBar().showMessage(f"Added task: {task_name}", 3000)
+            self.task_writer.add(task_name, due_date)
+    
+    def handle_instance_command(self, message):
+        """Run a command forwarded by a second launch"""
+        command = message.get('command')
+        if command == 'show':
+            self.show_normal()
+        elif command == 'add' and message.get('title'):
+            op_id = self.task_writer.add(message['title'], message.get('due', ''),
+                                         message.get('notes', ''),
+                                         message.get('list_id', '@default'))
+            if op_id is None:
+                # The due date was rejected, or the same add is still queued
+                # from a moment ago
+                self.tray_icon.showMessage(
+                    "Task Not Added",
+                    f"{message['title']}\nIts due date is invalid or it is already being added",
+                    QSystemTrayIcon.Warning, 5000)
+            else:
+                self.tray_icon.showMessage("Task Added", message['title'],
+                                           QSystemTrayIcon.Information, 3000)
+        elif command == 'export' and message.get('format') in {
+                export_format.name for export_format in available_exporters()}:
+            self.show_normal()
+            self.export_tasks(message['format'])
     
     def complete_selected_task(self):
-        """Mark selected task as complete"""
-        js = """
-        try {
-            const selected = document.querySelector('[role="listitem"][aria-selected="true"]');
-            if (selected) {
-                const checkbox = selected.querySelector('input[type="checkbox"]');
-                if (checkbox) {
-                    checkbox.click();
-                    return true;
-                }
-            }
-            return false;
-        } catch (e) {
-            console.error('Failed to complete task:', e);
-            return false;
-        }
-        """
-        
-        self.browser.page().runJavaScript(js, self.handle_task_completion)
-    
-    def handle_task_completion(self, success):
-        """Callback for task completion"""
-        if success:
-            self.statusBar().showMessage("Task marked as complete", 3000)
-        else:
+        """Mark the task selected in the page as complete"""
+        self.page_call('selectedTask', callback=self.complete_task)
+    
+    def complete_task(self, task):
+        """Queue completing a task reported by the page"""
+        if not task:
             QMessageBox.warning(self, "No Task Selected", 
                               "Please select a task first by clicking on it")
+            return
+        self.task_writer.complete(task['id'], task.get('title', ''))
     
     def export_tasks(self, format_type):
         """Export tasks to different formats"""
-        js = """
-        function getTasks() {
-            const tasks = [];
-            const items = document.querySelectorAll('[role="listitem"]');
-            
-            items.forEach(item => {
-                const textElem = item.querySelector('[aria-label="Task title"]');
-                const dateElem = item.querySelector('[aria-label="Due date"]');
-                const completed = !!item.querySelector('input[type="checkbox"]:checked');
-                
-                if (textElem) {
-                    tasks.push({
-                        title: textElem.textContent,
-                        due: dateElem ? dateElem.textContent : '',
-                        completed: completed
-                    });
-                }
-            });
-            
-            return tasks;
-        }
-        getTasks();
-        """
-        
-        self.browser.page().runJavaScript(js, lambda result: self.process_export(result, format_type))
-    
-    def process_export(self, tasks, format_type):
-        """Process exported tasks based on format"""
-        if not tasks:
-            QMessageBox.warning(self, "No Tasks", "No tasks found to export")
+        export_format = get_exporter(format_type)
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save Tasks", "", export_format.file_filter)
+        if not filename:
             return
         
-        if format_type == 'json':
-            self.export_json(tasks)
-        elif format_type == 'csv':
-            self.export_csv(tasks)
-        elif format_type == 'txt':
-            self.export_txt(tasks)
+        if self.task_store.count() or self.browser is None:
+            job = ExportJob(export_format, self.task_store.iter_tasks(), filename)
+            total = self.task_store.count()
+        else:
+            # Nothing stored yet (page still loading), stream what is rendered
+            job = ExportJob(export_format, None, filename)
+            total = 0
+        
+        progress = QProgressDialog("Exporting tasks...", "Cancel", 0, total, self)
+        progress.setWindowTitle("Export Tasks")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(job.cancel)
+        job.signals.total.connect(progress.setMaximum)
+        job.signals.progress.connect(progress.setValue)
+        job.signals.finished.connect(
+            lambda name, count, seconds: self.on_export_finished(progress, name, count, seconds))
+        job.signals.failed.connect(lambda error: self.on_export_failed(progress, error))
+        job.signals.cancelled.connect(progress.reset)
+        job.signals.cancelled.connect(
+            lambda: self.statusBar().showMessage("Export cancelled", 3000))
+        
+        if job.tasks is None:
+            chunks = job.page_chunks()
+            self.page_export_source = PageTaskSource(self.js_runtime, chunks, job, parent=self)
+            self.page_export_source.start()
+        QThreadPool.globalInstance().start(job)
     
-    def export_json(self, tasks):
-        """Export tasks to JSON file"""
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Tasks", "", "JSON Files (*.json)")
-        
-        if filename:
-            with open(filename, 'w') as f:
-                json.dump(tasks, f, indent=2)
-            self.statusBar().showMessage(f"Tasks exported to {filename}", 5000)
+    def on_export_finished(self, progress, filename, count, seconds):
+        """Close the progress dialog and report the export"""
+        progress.reset()
+        if not count:
+            QMessageBox.warning(self, "No Tasks", "No tasks found to export")
+            return
+        self.statusBar().showMessage(
+            f"{count} tasks exported to {filename} in {seconds:.2f}s", 5000)
     
-    def export_csv(self, tasks):
-        """Export tasks to CSV file"""
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Tasks", "", "CSV Files (*.csv)")
-        
-        if filename:
-            import csv
-            with open(filename, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Title', 'Due Date', 'Completed'])
-                for task in tasks:
-                    writer.writerow([task['title'], task['due'], task['completed']])
-            self.statusBar().showMessage(f"Tasks exported to {filename}", 5000)
-    
-    def export_txt(self, tasks):
-        """Export tasks to plain text file"""
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Tasks", "", "Text Files (*.txt)")
-        
-        if filename:
-            with open(filename, 'w') as f:
-                for task in tasks:
-                    status = "✓" if task['completed'] else "✗"
-                    f.write(f"{status} {task['title']} (Due: {task['due']})\n")
-            self.statusBar().showMessage(f"Tasks exported to {filename}", 5000)
+    def export_task_changes(self):
+        """Append what changed since the last delta export to a file"""
+        if not self.task_store.count():
+            QMessageBox.warning(self, "No Tasks", "No tasks stored yet, try again once they have loaded")
+            return
+        filters = [delta_format.file_filter for delta_format in DELTA_FORMATS.values()]
+        # The file is appended to, not replaced
+        filename, selected = QFileDialog.getSaveFileName(
+            self, "Export Changes", "", ";;".join(filters),
+            options=QFileDialog.DontConfirmOverwrite)
+        if not filename:
+            return
+        extension = os.path.splitext(filename)[1].lstrip('.').lower()
+        delta_format = next(
+            (f for f in DELTA_FORMATS.values() if f.extension == extension),
+            next((f for f in DELTA_FORMATS.values() if f.file_filter == selected),
+                 DELTA_FORMATS['jsonl']))
+        
+        job = DeltaExportJob(delta_format, self.task_store.iter_tasks(), filename,
+                             manifest_path(filename))
+        progress = QProgressDialog("Exporting changes...", "Cancel", 0,
+                                   self.task_store.count(), self)
+        progress.setWindowTitle("Export Changes")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(job.cancel)
+        job.signals.progress.connect(progress.setValue)
+        job.signals.finished.connect(
+            lambda name, count, seconds: self.on_delta_export_finished(progress, job, seconds))
+        job.signals.failed.connect(lambda error: self.on_export_failed(progress, error))
+        job.signals.cancelled.connect(progress.reset)
+        job.signals.cancelled.connect(
+            lambda: self.statusBar().showMessage("Export cancelled", 3000))
+        QThreadPool.globalInstance().start(job)
+    
+    def on_delta_export_finished(self, progress, job, seconds):
+        progress.reset()
+        self.statusBar().showMessage(
+            f"Exported changes to {job.filename} in {seconds:.2f}s: {job.summary}", 5000)
+    
+    def on_export_failed(self, progress, error):
+        progress.reset()
+        QMessageBox.warning(self, "Export Failed", error)
+    
+    def import_tasks(self):
+        """Import many tasks from a file or a pasted list"""
+        sources = ["From a file...", "Paste a list..."]
+        source, ok = QInputDialog.getItem(
+            self, "Import Tasks", "Import tasks:", sources, 0, False)
+        if not ok:
+            return
+        if source == sources[0]:
+            file_filter = ";;".join(
+                [import_format.file_filter for import_format in IMPORTERS.values()]
+                + ["All Files (*)"])
+            filename, _ = QFileDialog.getOpenFileName(self, "Import Tasks", "", file_filter)
+            if not filename:
+                return
+            tasks = read_tasks(filename, importer_for_filename(filename))
+        else:
+            text, ok = QInputDialog.getMultiLineText(
+                self, "Import Tasks",
+                "One task per line (end a line with YYYY-MM-DD to set a due date):")
+            if not ok or not text.strip():
+                return
+            tasks = read_lines(io.StringIO(text))
+        
+        credentials = get_api_credentials(self.settings)
+        if credentials:
+            job = ImportJob(tasks, self.task_store, credentials, self.settings['api_base_url'],
+                            op_log=self.task_writer.log)
+        else:
+            if not self.page_ready:
+                # Without API access, tasks can only be added by the page
+                self.init_web_view()
+                self.statusBar().showMessage(
+                    "Google Tasks is still loading, import again once it has", 5000)
+                return
+            try:
+                job = PageImporter(self.js_runtime, list(tasks), self.task_writer.log, parent=self)
+            except (OSError, ValueError, csv.Error) as e:
+                self.on_import_failed(None, str(e))
+                return
+        
+        progress = QProgressDialog("Importing tasks...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Import Tasks")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(job.cancel)
+        job.signals.total.connect(progress.setMaximum)
+        job.signals.progress.connect(progress.setValue)
+        job.signals.finished.connect(lambda result: self.on_import_finished(progress, result))
+        job.signals.failed.connect(lambda error: self.on_import_failed(progress, error))
+        job.signals.cancelled.connect(progress.reset)
+        job.signals.cancelled.connect(
+            lambda: self.statusBar().showMessage("Import cancelled", 3000))
+        
+        if credentials:
+            QThreadPool.globalInstance().start(job)
+        else:
+            self.page_importer = job
+            job.start()
+    
+    def on_import_finished(self, progress, result):
+        """Close the progress dialog and report the import"""
+        progress.reset()
+        if not result.processed:
+            QMessageBox.warning(self, "No Tasks", "No tasks found to import")
+            return
+        if result.imported and self.task_store.preferred_source() == 'api':
+            self.reload_tasks()
+        if result.queued:
+            # Left in the operation log; the writer retries them
+            self.task_writer.replay()
+        if result.failed:
+            QMessageBox.warning(self, "Import Finished",
+                                result.summary() + "\n\n" + "\n".join(result.errors))
+        else:
+            self.statusBar().showMessage(result.summary(), 5000)
+    
+    def on_import_failed(self, progress, error):
+        if progress is not None:
+            progress.reset()
+        QMessageBox.warning(self, "Import Failed", error)
     
     def show_notification_settings(self):
         """Show notification settings dialog"""
@@ -528,12 +896,26 @@ class GoogleTasksApp(QMainWindow):
         self.setWindowState(self.windowState() & ~Qt.WindowMinimized)
         self.activateWindow()
     
-    def on_tray_click(self, reason):
-        """Handle tray icon clicks"""
-        if reason == QSystemTrayIcon.Trigger:  # Single click
-            self.toggle_window_visibility()
-        elif reason == QSystemTrayIcon.DoubleClick:
-            self.toggle_fullscreen()
+    def toggle_mini_view(self):
+        """Show or hide the native quick-glance task list"""
+        if self.mini_view is None:
+            self.mini_view = MiniTaskView(self.task_model, self)
+        self.mini_view.toggle()
+    
+    def open_search_palette(self):
+        """Open the instant task search"""
+        if self.search_palette is None:
+            self.search_palette = SearchPalette(self.search_index, self)
+        self.search_palette.open()
+    
+    def reveal_task(self, task_id):
+        """Bring up the main window scrolled to a task"""
+        self.show_normal()
+        self.page_call('revealTask', task_id, callback=self.handle_task_reveal)
+    
+    def handle_task_reveal(self, found):
+        if not found:
+            self.statusBar().showMessage("That task isn't shown on the current page", 3000)
     
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
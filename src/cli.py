@@ -0,0 +1,251 @@
+"""Headless command line interface
+
+Runs without QtWebEngine or a window, reading from and writing to the local
+task store and the Google Tasks API:
+
+    google-tasks export --format csv --out tasks.csv
+    google-tasks export --delta --out changes.jsonl
+    google-tasks list --pending
+    google-tasks add "Buy milk" --due 2024-05-01
+    google-tasks import backlog.csv
+    google-tasks sync
+    google-tasks auth client_secret.json
+"""
+import argparse
+import os
+import sys
+
+COMMANDS = ('export', 'list', 'add', 'import', 'sync', 'auth')
+
+SIGN_IN_HINT = "run google-tasks auth CLIENT_SECRET.json, or set GOOGLE_TASKS_TOKEN"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='google-tasks', description="Google Tasks command line interface")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help="export tasks to a file")
+    export.add_argument('--format', default='json', help="export format (default: json)")
+    export.add_argument('--out', help="output file, or - for stdout; without it a running "
+                                       "app opens its export dialog")
+    export.add_argument('--sync', action='store_true', help="sync with the API first")
+    export.add_argument('--delta', action='store_true',
+                        help="append only what changed since the last delta export "
+                             "(formats: jsonl, csv)")
+    export.add_argument('--manifest', help="delta manifest file (default: OUT.manifest.json)")
+
+    list_cmd = subparsers.add_parser('list', help="print tasks")
+    list_cmd.add_argument('--pending', action='store_true', help="hide completed tasks")
+    list_cmd.add_argument('--sync', action='store_true', help="sync with the API first")
+
+    add = subparsers.add_parser('add', help="create a task through the API")
+    add.add_argument('title')
+    add.add_argument('--due', help="due date as YYYY-MM-DD")
+    add.add_argument('--notes', default='')
+    add.add_argument('--list', dest='list_id', default='@default', help="task list id")
+
+    import_cmd = subparsers.add_parser('import', help="create many tasks through the API")
+    import_cmd.add_argument('file', help="CSV, JSON, ICS or text list, or - for stdin")
+    import_cmd.add_argument('--format', help="import format (default: from the file extension)")
+    import_cmd.add_argument('--list', dest='list_id', default='@default', help="task list id")
+    import_cmd.add_argument('--concurrency', type=int, default=4,
+                            help="API requests in flight at once (default: 4)")
+
+    subparsers.add_parser('sync', help="sync the local store with the API")
+
+    auth = subparsers.add_parser('auth', help="sign in to Google Tasks in the browser")
+    auth.add_argument('client_secrets',
+                      help="OAuth client JSON downloaded for a Desktop app client")
+    return parser
+
+
+def init_core():
+    """Prepare Qt for headless use without creating a GUI"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtCore import QCoreApplication
+    # Same name as the GUI so both share one data directory
+    QCoreApplication.setApplicationName("Google Tasks")
+
+
+def api_client(settings):
+    from src.tasks_api import TasksApiClient, get_api_credentials
+    credentials = get_api_credentials(settings)
+    if not credentials:
+        return None
+    return TasksApiClient(credentials, settings['api_base_url'])
+
+
+def run_sync(store, settings):
+    from src.tasks_api import sync
+    client = api_client(settings)
+    if client is None:
+        print(f"Not signed in to Google Tasks ({SIGN_IN_HINT})", file=sys.stderr)
+        return False
+    changes = sync(client, store)
+    print(f"Synced {len(changes)} task changes", file=sys.stderr)
+    return True
+
+
+def cmd_export(args, store, settings):
+    from src.exporter import get_exporter
+    if args.out is None:
+        print("--out is required when the app isn't running", file=sys.stderr)
+        return 2
+    if args.delta:
+        return export_delta(args, store)
+    export_format = get_exporter(args.format)
+    if export_format.name == 'pdf':
+        # Text layout needs a GUI application, the offscreen platform is enough
+        from PyQt5.QtGui import QGuiApplication
+        app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    tasks = store.iter_tasks()
+    if args.out == '-':
+        out = sys.stdout.buffer if export_format.binary else sys.stdout
+        count = sum(step is not False for step in export_format.writer(tasks, out))
+    else:
+        mode, options = ('wb', {}) if export_format.binary else (
+            'w', {'newline': '', 'encoding': 'utf-8'})
+        with open(args.out, mode, **options) as f:
+            count = sum(step is not False for step in export_format.writer(tasks, f))
+    print(f"Exported {count} tasks", file=sys.stderr)
+    return 0
+
+
+def export_delta(args, store):
+    from src.delta_export import DeltaExport, get_delta_format, manifest_path
+    # JSON (the default) becomes JSON Lines, which can be appended to
+    delta_format = get_delta_format('jsonl' if args.format == 'json' else args.format)
+    if args.out == '-' and not args.manifest:
+        print("--manifest is required when writing a delta to stdout", file=sys.stderr)
+        return 2
+    delta = DeltaExport(delta_format, args.manifest or manifest_path(args.out))
+    tasks = store.iter_tasks()
+    if args.out == '-':
+        for _ in delta.write(tasks, sys.stdout):
+            pass
+        sys.stdout.flush()
+    else:
+        for _ in delta.append(tasks, args.out):
+            pass
+    delta.commit()
+    print(f"Delta export: {delta.summary()}", file=sys.stderr)
+    return 0
+
+
+def cmd_list(args, store, settings):
+    from src.exporter import run_export
+    tasks = store.iter_tasks()
+    if args.pending:
+        tasks = (task for task in tasks if not task['completed'])
+    run_export('txt', tasks, sys.stdout)
+    return 0
+
+
+def cmd_add(args, store, settings):
+    from src.tasks_api import new_task_body, task_from_api
+    client = api_client(settings)
+    if client is None:
+        print(f"Adding tasks needs Google Tasks access ({SIGN_IN_HINT})",
+              file=sys.stderr)
+        return 2
+
+    body = new_task_body(args.title, args.notes, args.due)
+    try:
+        created = client.insert_task(args.list_id, body)
+    except OSError as e:
+        # Offline: leave it in the app's operation log. It may have reached
+        # the server anyway, so the app looks for it before sending again.
+        from src.op_log import OpLog, new_op
+        OpLog().append(new_op('add', list_id=args.list_id, body=body, sent=True))
+        print(f"Couldn't reach the API ({e}); the task is queued and will be added "
+              "the next time the app runs", file=sys.stderr)
+        return 0
+    if store.preferred_source() == 'api':
+        store.upsert_tasks([task_from_api(created, args.list_id)], source='api')
+    print(created.get('id', ''))
+    return 0
+
+
+def cmd_import(args, store, settings):
+    import csv
+    from src.importer import get_importer, import_to_api, read_tasks
+    from src.op_log import OpLog
+    from src.tasks_api import TasksApiClient, get_api_credentials
+    credentials = get_api_credentials(settings)
+    if not credentials:
+        print(f"Importing tasks needs Google Tasks access ({SIGN_IN_HINT})",
+              file=sys.stderr)
+        return 2
+
+    import_format = None
+    if args.format:
+        import_format = get_importer(args.format)
+    elif args.file == '-':
+        import_format = get_importer('txt')
+    try:
+        if args.file == '-':
+            tasks = list(import_format.reader(sys.stdin))
+        else:
+            tasks = list(read_tasks(args.file, import_format))
+    except csv.Error as e:
+        raise ValueError(str(e)) from None
+
+    def report(result):
+        print(f"\r{result.processed}/{len(tasks)} tasks", end='', file=sys.stderr)
+
+    # Tasks that can't get through now are added the next time the app runs
+    result = import_to_api(tasks, lambda: TasksApiClient(credentials, settings['api_base_url']),
+                           store, args.list_id, max(1, args.concurrency), on_progress=report,
+                           op_log=OpLog())
+    if tasks:
+        print(file=sys.stderr)
+    for error in result.errors:
+        print(f"Failed: {error}", file=sys.stderr)
+    print(result.summary(), file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def cmd_sync(args, store, settings):
+    return 0 if run_sync(store, settings) else 2
+
+
+def cmd_auth(args, store, settings):
+    from src.google_auth import authorize
+    path = authorize(args.client_secrets, settings.get('api_token_file') or None)
+    print(f"Signed in; the refresh token is stored in {path}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    init_core()
+
+    from src.settings import load_settings
+    from src.task_store import TaskStore
+    from src.tasks_api import TasksApiError
+    settings = load_settings()
+    store = TaskStore()
+
+    handlers = {
+        'export': cmd_export,
+        'list': cmd_list,
+        'add': cmd_add,
+        'import': cmd_import,
+        'sync': cmd_sync,
+        'auth': cmd_auth,
+    }
+    try:
+        if getattr(args, 'sync', False) and not run_sync(store, settings):
+            return 2
+        return handlers[args.command](args, store, settings)
+    except (TasksApiError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
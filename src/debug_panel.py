@@ -0,0 +1,82 @@
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QHBoxLayout, QHeaderView, QPushButton,
+                             QTableWidget, QTableWidgetItem, QVBoxLayout)
+from src.metrics import metrics
+
+COLUMNS = (("Metric", None), ("Count", 'count'), ("Mean ms", 'mean_ms'), ("p50 ms", 'p50_ms'),
+           ("p95 ms", 'p95_ms'), ("p99 ms", 'p99_ms'), ("Max ms", 'max_ms'))
+REFRESH_MS = 1000
+
+
+class DebugPanel(QDialog):
+    """Hidden window listing the recorded latency metrics"""
+
+    recording_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance Metrics")
+        self.resize(640, 360)
+
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels([label for label, _ in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        self.record_check = QCheckBox("Record metrics", self)
+        self.record_check.setChecked(metrics.enabled)
+        self.record_check.toggled.connect(self.set_recording)
+        reset_button = QPushButton("Reset", self)
+        reset_button.clicked.connect(self.reset)
+        dump_button = QPushButton("Dump to File", self)
+        dump_button.clicked.connect(self.dump)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.record_check)
+        buttons.addStretch()
+        buttons.addWidget(reset_button)
+        buttons.addWidget(dump_button)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        # Counters only fill the Count column
+        snapshot.update((name, {'count': value}) for name, value in metrics.counters().items())
+        self.table.setRowCount(len(snapshot))
+        for row, (name, stats) in enumerate(snapshot.items()):
+            for column, (_, key) in enumerate(COLUMNS):
+                value = name if key is None else stats.get(key)
+                if isinstance(value, float):
+                    value = f"{value:.3f}"
+                self.table.setItem(row, column, QTableWidgetItem("" if value is None else str(value)))
+
+    def set_recording(self, enabled):
+        metrics.enabled = enabled
+        self.recording_changed.emit(enabled)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def dump(self):
+        path = metrics.dump()
+        self.setWindowTitle(f"Performance Metrics - saved to {path}" if path
+                            else "Performance Metrics - nothing recorded")
@@ -0,0 +1,155 @@
+"""Incremental exports
+
+A delta export compares every task with a manifest of content hashes
+from the previous run and writes only what was added, changed or
+deleted. One record per line with an op column, so a file can be
+appended to run after run and replayed in order by whatever reads it.
+"""
+import csv
+import hashlib
+import json
+import os
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+from src.exporter import EXPORT_FIELDS, export_record
+
+DeltaFormat = namedtuple('DeltaFormat', 'name label file_filter extension writer')
+
+DELTA_FORMATS = {}
+
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+
+# Ops in report order, with how the summary words them
+OPS = {'add': 'added', 'change': 'changed', 'delete': 'deleted'}
+
+
+def register_delta_format(name, label, file_filter, extension):
+    """Register a writer for delta records
+
+    A writer is a generator ``writer(changes, f, exported_at)`` over
+    ``(op, record)`` pairs that yields once per pair. ``op`` is None for an
+    unchanged task, which is consumed but not written. ``f`` is opened for
+    appending.
+    """
+    def decorator(writer):
+        DELTA_FORMATS[name] = DeltaFormat(name, label, file_filter, extension, writer)
+        return writer
+    return decorator
+
+
+def get_delta_format(name):
+    try:
+        return DELTA_FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown delta export format: {name}") from None
+
+
+def content_hash(record):
+    # repr of the field values is stable for the str and bool fields
+    # exported, and several times cheaper than JSON
+    data = repr([record[field] for field in EXPORT_FIELDS]).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def manifest_path(filename):
+    return filename + MANIFEST_SUFFIX
+
+
+def load_manifest(path):
+    """Hashes by task id from the last run; empty before the first one"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {path}")
+    return manifest['hashes']
+
+
+def save_manifest(path, hashes):
+    """Replace the manifest atomically"""
+    partial = path + '.part'
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'hashes': hashes}, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+class DeltaExport:
+    """One incremental export run against a manifest"""
+
+    def __init__(self, delta_format, manifest):
+        self.delta_format = delta_format
+        self.manifest = manifest
+        self.previous = load_manifest(manifest)
+        self.hashes = {}
+        self.counts = Counter()
+        self.exported_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def changes(self, tasks):
+        """Yield (op, record) for every task, then a delete per vanished id"""
+        for task in tasks:
+            record = export_record(task)
+            digest = content_hash(record)
+            self.hashes[record['id']] = digest
+            previous = self.previous.get(record['id'])
+            op = 'add' if previous is None else ('change' if previous != digest else None)
+            if op:
+                self.counts[op] += 1
+            yield op, record
+        for task_id in sorted(self.previous.keys() - self.hashes.keys()):
+            self.counts['delete'] += 1
+            yield 'delete', dict(dict.fromkeys(EXPORT_FIELDS, ''), id=task_id)
+
+    def write(self, tasks, f):
+        """Generator writing the changes to ``f``, one step per task"""
+        return self.delta_format.writer(self.changes(tasks), f, self.exported_at)
+
+    def append(self, tasks, filename):
+        """Generator appending the changes to ``filename``, one step per task
+
+        Closing it early, or an error while writing, truncates the file back
+        to where this run started, so a run appends all of its records or
+        none of them.
+        """
+        with open(filename, 'a', newline='', encoding='utf-8') as f:
+            start = f.tell()
+            try:
+                yield from self.write(tasks, f)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(start)
+                raise
+
+    def commit(self):
+        """Record this run so the next one starts from here"""
+        save_manifest(self.manifest, self.hashes)
+
+    def summary(self):
+        return ", ".join(f"{self.counts[op]} {label}" for op, label in OPS.items())
+
+
+@register_delta_format('jsonl', "JSON Lines", "JSON Lines Files (*.jsonl)", 'jsonl')
+def write_jsonl_delta(changes, f, exported_at):
+    for op, record in changes:
+        if op:
+            line = dict(op=op, **record, exported_at=exported_at)
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        yield
+
+
+@register_delta_format('csv', "CSV", "CSV Files (*.csv)", 'csv')
+def write_csv_delta(changes, f, exported_at):
+    writer = csv.writer(f)
+    # Appending to an existing file keeps its header
+    if f.tell() == 0:
+        writer.writerow(['Op', 'Title', 'Due Date', 'Completed', 'Notes', 'ID', 'Exported At'])
+    for op, record in changes:
+        if op:
+            writer.writerow([op, record['title'], record['due'], record['completed'],
+                             record['notes'], record['id'], exported_at])
+        yield
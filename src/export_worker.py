@@ -0,0 +1,231 @@
+import os
+import queue
+import threading
+import time
+import traceback
+from contextlib import closing
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from src.delta_export import DeltaExport
+from src.metrics import metrics
+from src.page_dates import page_due_ts
+
+# How often (in tasks) a running export reports progress
+PROGRESS_EVERY = 200
+# Chunks fetched from the page ahead of the writer
+PREFETCH_CHUNKS = 2
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportSourceError(Exception):
+    """The tasks being exported stopped arriving, e.g. the page navigated away"""
+
+
+class ChunkQueue:
+    """Hand chunks of tasks from the GUI thread to an export worker"""
+
+    _END = object()
+
+    def __init__(self, cancelled, on_consumed=None):
+        self._queue = queue.Queue()
+        self._cancelled = cancelled
+        self._on_consumed = on_consumed
+
+    def put(self, tasks):
+        self._queue.put(tasks)
+
+    def close(self):
+        self._queue.put(self._END)
+
+    def fail(self, message):
+        """End the stream with an error instead of a clean end of data"""
+        self._queue.put(ExportSourceError(message))
+
+    def backlog(self):
+        return self._queue.qsize()
+
+    def __iter__(self):
+        while True:
+            try:
+                chunk = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._cancelled.is_set():
+                    raise ExportCancelled()
+                continue
+            if chunk is self._END:
+                return
+            if isinstance(chunk, ExportSourceError):
+                raise chunk
+            yield from chunk
+            if self._on_consumed:
+                self._on_consumed()
+
+
+class PageTaskSource(QObject):
+    """Pull tasks out of the page in bounded chunks, feeding a ChunkQueue"""
+
+    def __init__(self, runtime, chunks, job, chunk_size=500, parent=None):
+        super().__init__(parent)
+        self.runtime = runtime
+        self.chunks = chunks
+        self.job = job
+        self.chunk_size = chunk_size
+        self._next = 0
+        self._in_flight = False
+        job.signals.chunk_consumed.connect(self._fetch_more)
+
+    def start(self):
+        self._fetch_more()
+
+    def _fetch_more(self):
+        if (self._in_flight or self._next is None or self.job.is_cancelled()
+                or self.chunks.backlog() >= PREFETCH_CHUNKS):
+            return
+        self._in_flight = True
+        self.runtime.call('extractChunk', self._next, self.chunk_size,
+                          callback=self._on_chunk)
+
+    def _on_chunk(self, result):
+        self._in_flight = False
+        if result is None:
+            # The call failed or the document changed under the export;
+            # a real last chunk, even an empty one, still has next = null
+            self._next = None
+            self.chunks.fail("The page reloaded or stopped responding during the export")
+            return
+        if self._next == 0:
+            self.job.signals.total.emit(int(result.get('total') or 0))
+        tasks = result.get('tasks') or []
+        for task in tasks:
+            task['due_ts'] = page_due_ts(task.get('due') or '')
+        self.chunks.put(tasks)
+        self._next = result.get('next')
+        if self._next is None:
+            self.chunks.close()
+        else:
+            self._fetch_more()
+
+
+class ExportSignals(QObject):
+    total = pyqtSignal(int)
+    progress = pyqtSignal(int)
+    chunk_consumed = pyqtSignal()
+    finished = pyqtSignal(str, int, float)  # filename, tasks written, seconds
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class ExportJob(QRunnable):
+    """Stream tasks through a registered exporter on a pool thread
+
+    The writer goes to ``filename + '.part'`` and is moved into place only
+    when it completes, so a cancelled or failed export leaves no partial
+    file behind.
+    """
+
+    def __init__(self, export_format, tasks, filename):
+        super().__init__()
+        self.export_format = export_format
+        self.tasks = tasks
+        self.filename = filename
+        self.signals = ExportSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def page_chunks(self):
+        """Return a ChunkQueue this job can consume as its task iterator"""
+        self.tasks = ChunkQueue(self._cancelled, self.signals.chunk_consumed.emit)
+        return self.tasks
+
+    def run(self):
+        partial = self.filename + '.part'
+        count = written = 0
+        started = time.perf_counter()
+        if self.export_format.binary:
+            mode, options = 'wb', {}
+        else:
+            mode, options = 'w', {'newline': '', 'encoding': 'utf-8'}
+        try:
+            with open(partial, mode, **options) as f:
+                for step in self.export_format.writer(iter(self.tasks), f):
+                    count += 1
+                    if step is not False:
+                        written += 1
+                    if self._cancelled.is_set():
+                        raise ExportCancelled()
+                    if count % PROGRESS_EVERY == 0:
+                        self.signals.progress.emit(count)
+            os.replace(partial, self.filename)
+        except ExportCancelled:
+            self._discard(partial)
+            self.signals.cancelled.emit()
+            return
+        except (ExportSourceError, OSError, ValueError, KeyError) as e:
+            self._discard(partial)
+            self.signals.failed.emit(str(e))
+            return
+        except Exception as e:
+            # Anything escaping run() would abort the app; report it instead
+            traceback.print_exc()
+            self._discard(partial)
+            self.signals.failed.emit(f"Export failed unexpectedly: {e}")
+            return
+        elapsed = time.perf_counter() - started
+        metrics.record(f"export.{self.export_format.name}", elapsed * 1000)
+        self.signals.finished.emit(self.filename, written, elapsed)
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class DeltaExportJob(ExportJob):
+    """Append the changes since the last run to ``filename``
+
+    The manifest is only replaced once the appended records are on disk;
+    a cancelled or failed run leaves both the file and the manifest as
+    they were.
+    """
+
+    def __init__(self, delta_format, tasks, filename, manifest):
+        super().__init__(delta_format, tasks, filename)
+        self.manifest = manifest
+        self.summary = ''
+
+    def run(self):
+        count = 0
+        started = time.perf_counter()
+        try:
+            delta = DeltaExport(self.export_format, self.manifest)
+            with closing(delta.append(iter(self.tasks), self.filename)) as steps:
+                for _ in steps:
+                    count += 1
+                    if self._cancelled.is_set():
+                        raise ExportCancelled()
+                    if count % PROGRESS_EVERY == 0:
+                        self.signals.progress.emit(count)
+            delta.commit()
+        except ExportCancelled:
+            self.signals.cancelled.emit()
+            return
+        except (ExportSourceError, OSError, ValueError, KeyError) as e:
+            self.signals.failed.emit(str(e))
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(f"Export failed unexpectedly: {e}")
+            return
+        elapsed = time.perf_counter() - started
+        metrics.record(f"export.delta.{self.export_format.name}", elapsed * 1000)
+        self.summary = delta.summary()
+        self.signals.finished.emit(self.filename, sum(delta.counts.values()), elapsed)
@@ -1,49 +1,354 @@
-import os
+import csv
+import gzip
+import hashlib
+import html
+import importlib.util
 import json
-from datetime import datetime
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-from PyQt5.QtWidgets import QFileDialog
-from icalendar import Calendar, Event
-
-def export_tasks(format_type):
-    # In a real app, you would fetch tasks from Google API
-    tasks = [
-        {"title": "Complete project", "due": "2023-12-01"},
-        {"title": "Meeting with team", "due": "2023-12-02"}
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from functools import lru_cache
+
+# Fields written by the structured formats, in column order
+EXPORT_FIELDS = ('id', 'title', 'notes', 'due', 'completed')
+
+ExportFormat = namedtuple(
+    'ExportFormat', 'name label file_filter extension binary writer requires')
+
+# Registered formats in menu order, keyed by name
+EXPORTERS = {}
+
+# Rows buffered per record batch by the columnar writers
+BATCH_ROWS = 10000
+
+
+def register_exporter(name, label, file_filter, extension, binary=False, requires=()):
+    """Register a writer as an export format
+
+    A writer is a generator function ``writer(tasks, f)`` that takes a task
+    iterator and an open file (binary when ``binary`` is set) and yields once
+    per task it consumed, ``False`` for a task it left out. Yielding lets the
+    export job report progress and cancel between tasks, and keeps writers
+    from holding the whole list.
+    ``requires`` names optional modules the writer imports; the format is
+    only offered when they are installed.
+    """
+    def decorator(writer):
+        EXPORTERS[name] = ExportFormat(
+            name, label, file_filter, extension, binary, writer, tuple(requires))
+        return writer
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def module_installed(name):
+    # Finds the module without importing it, so menus stay cheap to build
+    return importlib.util.find_spec(name) is not None
+
+
+def is_available(export_format):
+    """Whether the optional modules a format needs are installed"""
+    return all(module_installed(module) for module in export_format.requires)
+
+
+def available_exporters():
+    """Registered formats that can run here, in menu order"""
+    return [export_format for export_format in EXPORTERS.values() if is_available(export_format)]
+
+
+def get_exporter(name):
+    """Return the ExportFormat registered under ``name``"""
+    try:
+        export_format = EXPORTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown export format: {name}") from None
+    if not is_available(export_format):
+        raise ValueError(f"{export_format.label} export needs "
+                         f"{', '.join(export_format.requires)} installed")
+    return export_format
+
+
+def export_record(task):
+    """Return the exported subset of a task dict"""
+    return {field: task.get(field, '') for field in EXPORT_FIELDS}
+
+
+def run_export(format_name, tasks, f):
+    """Write every task synchronously and return how many were written"""
+    count = 0
+    for step in get_exporter(format_name).writer(tasks, f):
+        if step is not False:
+            count += 1
+    return count
+
+
+@register_exporter('json', "JSON", "JSON Files (*.json)", 'json')
+def write_json(tasks, f):
+    f.write('[')
+    first = True
+    for task in tasks:
+        item = json.dumps(export_record(task), indent=2, ensure_ascii=False)
+        f.write(('\n' if first else ',\n') + '  ' + item.replace('\n', '\n  '))
+        first = False
+        yield
+    f.write('\n]\n' if not first else ']\n')
+
+
+@register_exporter('csv', "CSV", "CSV Files (*.csv)", 'csv')
+def write_csv(tasks, f):
+    writer = csv.writer(f)
+    writer.writerow(['Title', 'Due Date', 'Completed', 'Notes', 'ID'])
+    for task in tasks:
+        writer.writerow([task['title'], task['due'], task['completed'],
+                         task.get('notes', ''), task.get('id', '')])
+        yield
+
+
+@register_exporter('txt', "Text", "Text Files (*.txt)", 'txt')
+def write_txt(tasks, f):
+    for task in tasks:
+        status = "✓" if task['completed'] else "✗"
+        f.write(f"{status} {task['title']} (Due: {task['due']})\n")
+        yield
+
+
+def jsonl_line(task):
+    return json.dumps(export_record(task), ensure_ascii=False) + '\n'
+
+
+@register_exporter('jsonl.gz', "JSON Lines (gzip)", "Gzipped JSON Lines (*.jsonl.gz)",
+                   'jsonl.gz', binary=True)
+def write_jsonl_gzip(tasks, f):
+    with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=6) as out:
+        for task in tasks:
+            out.write(jsonl_line(task).encode('utf-8'))
+            yield
+
+
+@register_exporter('jsonl.zst', "JSON Lines (zstd)", "Zstandard JSON Lines (*.jsonl.zst)",
+                   'jsonl.zst', binary=True, requires=('zstandard',))
+def write_jsonl_zstd(tasks, f):
+    import zstandard
+    with zstandard.ZstdCompressor(level=3).stream_writer(f, closefd=False) as out:
+        for task in tasks:
+            out.write(jsonl_line(task).encode('utf-8'))
+            yield
+
+
+@lru_cache(maxsize=4096)
+def parse_due_date(value):
+    """Due date as a date, or None for empty and page-rendered dates"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def task_due_date(task):
+    """A task's due date, from its text or else from due_ts
+
+    Page-rendered dates ("Tue, May 1") don't parse, but tasks from the page
+    also carry due_ts, which is read as a date in local time.
+    """
+    day = parse_due_date(task.get('due') or '')
+    if day is None and task.get('due_ts') is not None:
+        day = date.fromtimestamp(task['due_ts'])
+    return day
+
+
+def arrow_batches(tasks, schema):
+    """Yield None per task consumed and a RecordBatch every BATCH_ROWS tasks
+
+    Shared by the columnar writers, which write the batches and pass the
+    Nones on as progress steps.
+    """
+    import pyarrow as pa
+    columns = {field: [] for field in EXPORT_FIELDS}
+    for task in tasks:
+        record = export_record(task)
+        for field in ('id', 'title', 'notes'):
+            columns[field].append(record[field] or '')
+        columns['due'].append(task_due_date(task))
+        columns['completed'].append(bool(record['completed']))
+        yield None
+        if len(columns['id']) >= BATCH_ROWS:
+            yield pa.record_batch(list(columns.values()), schema=schema)
+            columns = {field: [] for field in EXPORT_FIELDS}
+    if columns['id']:
+        yield pa.record_batch(list(columns.values()), schema=schema)
+
+
+def arrow_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('id', pa.string()),
+        ('title', pa.string()),
+        ('notes', pa.string()),
+        ('due', pa.date32()),
+        ('completed', pa.bool_()),
+    ])
+
+
+@register_exporter('parquet', "Parquet", "Parquet Files (*.parquet)", 'parquet',
+                   binary=True, requires=('pyarrow',))
+def write_parquet(tasks, f):
+    import pyarrow.parquet as pq
+    schema = arrow_schema()
+    with pq.ParquetWriter(f, schema, compression='zstd') as writer:
+        for batch in arrow_batches(tasks, schema):
+            if batch is None:
+                yield
+            else:
+                writer.write_batch(batch)
+
+
+@register_exporter('arrow', "Arrow IPC", "Arrow Files (*.arrow)", 'arrow',
+                   binary=True, requires=('pyarrow',))
+def write_arrow(tasks, f):
+    import pyarrow as pa
+    schema = arrow_schema()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_file(f, schema, options=options) as writer:
+        for batch in arrow_batches(tasks, schema):
+            if batch is None:
+                yield
+            else:
+                writer.write_batch(batch)
+
+
+ICS_PRODID = '-//Google Tasks Desktop//EN'
+ICS_UID_DOMAIN = 'google-tasks-desktop'
+# Content lines are folded at 75 octets (RFC 5545 3.1)
+ICS_LINE_OCTETS = 75
+
+
+@lru_cache(maxsize=4096)
+def ics_date(value):
+    """Due date text as YYYYMMDD, or None when it isn't an ISO date"""
+    day = parse_due_date(value)
+    return day.strftime('%Y%m%d') if day else None
+
+
+def ics_task_date(task):
+    """A task's due date as YYYYMMDD, or None when it has none"""
+    due = ics_date(task.get('due') or '')
+    if due is None and task.get('due_ts') is not None:
+        due = task_due_date(task).strftime('%Y%m%d')
+    return due
+
+
+def ics_text(value):
+    """Escape a TEXT property value"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_ics_line(line):
+    """Encode one content line, folding it into 75-octet pieces
+
+    Folds never split a UTF-8 sequence; continuation lines start with a
+    space, which counts towards their 75 octets.
+    """
+    data = line.encode('utf-8')
+    if len(data) <= ICS_LINE_OCTETS:
+        return data + b'\r\n'
+    pieces = []
+    start = 0
+    limit = ICS_LINE_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        # Back up to the start of a UTF-8 sequence
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(data[start:end])
+        start = end
+        limit = ICS_LINE_OCTETS - 1
+    pieces.append(data[start:])
+    return b'\r\n '.join(pieces) + b'\r\n'
+
+
+def ics_uid(task):
+    task_id = task.get('id') or hashlib.blake2b(
+        f"{task['title']}\x1f{task['due']}".encode('utf-8'), digest_size=12).hexdigest()
+    return f"{task_id}@{ICS_UID_DOMAIN}"
+
+
+def ics_component(task, component, stamp):
+    """Content lines for one task, or None when an event has no date"""
+    due = ics_task_date(task)
+    if component == 'VEVENT' and due is None:
+        return None
+    lines = [
+        f"BEGIN:{component}",
+        f"UID:{ics_text(ics_uid(task))}",
+        f"DTSTAMP:{stamp}",
+        f"SUMMARY:{ics_text(task['title'])}",
     ]
-    
-    if format_type == 'pdf':
-        export_pdf(tasks)
-    elif format_type == 'ics':
-        export_ical(tasks)
-    elif format_type == 'json':
-        export_json(tasks)
-
-def export_pdf(tasks):
-    printer = QPrinter()
-    dialog = QPrintDialog(printer)
-    if dialog.exec_():
-        # Implement PDF printing logic
-        pass
-
-def export_ical(tasks):
-    cal = Calendar()
+    if task.get('notes'):
+        lines.append(f"DESCRIPTION:{ics_text(task['notes'])}")
+    if component == 'VEVENT':
+        # All-day event on the due date
+        lines.append(f"DTSTART;VALUE=DATE:{due}")
+    else:
+        if due:
+            lines.append(f"DUE;VALUE=DATE:{due}")
+        lines.append("STATUS:COMPLETED" if task.get('completed') else "STATUS:NEEDS-ACTION")
+    lines.append(f"END:{component}")
+    return lines
+
+
+def write_ics(tasks, f, component):
+    """Stream a calendar to ``f``, one component per task
+
+    Each component is folded and written as soon as it is built, so memory
+    stays flat however long the list is.
+    """
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    f.write(b''.join(fold_ics_line(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICS_PRODID}", "CALSCALE:GREGORIAN")))
     for task in tasks:
-        event = Event()
-        event.add('summary', task['title'])
-        event.add('dtstart', datetime.strptime(task['due'], '%Y-%m-%d'))
-        cal.add_component(event)
-    
-    filename, _ = QFileDialog.getSaveFileName(
-        None, "Save iCalendar File", "", "iCalendar Files (*.ics)")
-    if filename:
-        with open(filename, 'wb') as f:
-            f.write(cal.to_ical())
-
-def export_json(tasks):
-    filename, _ = QFileDialog.getSaveFileName(
-        None, "Save JSON File", "", "JSON Files (*.json)")
-    if filename:
-        with open(filename, 'w') as f:
-            json.dump(tasks, f, indent=2)
-            
\ No newline at end of file
+        lines = ics_component(task, component, stamp)
+        if lines:
+            f.write(b''.join(map(fold_ics_line, lines)))
+            yield
+        else:
+            yield False
+    f.write(fold_ics_line("END:VCALENDAR"))
+
+
+@register_exporter('ics', "iCalendar", "iCalendar Files (*.ics)", 'ics', binary=True)
+def write_ics_events(tasks, f):
+    """Tasks with a due date as all-day events, for calendar apps"""
+    return write_ics(tasks, f, 'VEVENT')
+
+
+@register_exporter('ics-todo', "iCalendar (to-dos)", "iCalendar Files (*.ics)", 'ics',
+                   binary=True)
+def write_ics_todos(tasks, f):
+    """Every task as a to-do with its due date and status"""
+    return write_ics(tasks, f, 'VTODO')
+
+
+@register_exporter('pdf', "PDF", "PDF Files (*.pdf)", 'pdf', binary=True)
+def write_pdf(tasks, f):
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt5.QtGui import QPdfWriter, QTextDocument
+    rows = []
+    for task in tasks:
+        status = "✓" if task['completed'] else "✗"
+        rows.append(f"<tr><td>{status}</td><td>{html.escape(task['title'])}</td>"
+                    f"<td>{html.escape(task['due'])}</td></tr>")
+        yield
+
+    document = QTextDocument()
+    document.setHtml(
+        "<h2>Google Tasks</h2><table cellpadding='4'>"
+        "<tr><th></th><th align='left'>Task</th><th align='left'>Due</th></tr>"
+        + "".join(rows) + "</table>")
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    writer = QPdfWriter(buffer)
+    document.print_(writer)
+    del writer  # Finishes the PDF
+    buffer.close()
+    f.write(bytes(data))
@@ -0,0 +1,264 @@
+"""System-wide hotkeys registered with the window system
+
+Windows gets RegisterHotKey, whose WM_HOTKEY messages reach Qt's event
+loop and are picked out by a native event filter. X11 gets XGrabKey on the
+root window, over a separate Xlib connection that Qt watches with a socket
+notifier. Nothing hooks the keyboard, so no extra privileges are needed.
+Elsewhere (macOS, Wayland) register() returns False.
+"""
+import ctypes
+import ctypes.util
+import os
+import sys
+from PyQt5.QtCore import QAbstractNativeEventFilter, QCoreApplication, QObject, QSocketNotifier, pyqtSignal
+
+# Windows
+WM_HOTKEY = 0x0312
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_WIN = 0x0008
+MOD_NOREPEAT = 0x4000
+WIN_MODIFIERS = {'ctrl': MOD_CONTROL, 'control': MOD_CONTROL, 'shift': MOD_SHIFT,
+                 'alt': MOD_ALT, 'win': MOD_WIN, 'super': MOD_WIN, 'meta': MOD_WIN}
+WIN_KEYS = {'space': 0x20, 'enter': 0x0D, 'return': 0x0D, 'tab': 0x09,
+            'esc': 0x1B, 'escape': 0x1B, 'insert': 0x2D, 'delete': 0x2E,
+            'home': 0x24, 'end': 0x23, 'pageup': 0x21, 'pagedown': 0x22}
+
+# X11
+KEY_PRESS = 2
+SHIFT_MASK = 1 << 0
+LOCK_MASK = 1 << 1
+CONTROL_MASK = 1 << 2
+MOD1_MASK = 1 << 3  # Alt
+MOD2_MASK = 1 << 4  # Num Lock
+MOD4_MASK = 1 << 6  # Super
+GRAB_MODE_ASYNC = 1
+X11_MODIFIERS = {'ctrl': CONTROL_MASK, 'control': CONTROL_MASK, 'shift': SHIFT_MASK,
+                 'alt': MOD1_MASK, 'win': MOD4_MASK, 'super': MOD4_MASK, 'meta': MOD4_MASK}
+X11_KEYS = {'space': 'space', 'enter': 'Return', 'return': 'Return', 'tab': 'Tab',
+            'esc': 'Escape', 'escape': 'Escape', 'insert': 'Insert', 'delete': 'Delete',
+            'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pagedown': 'Next'}
+# The hotkey should work whether or not Caps Lock or Num Lock is on
+LOCK_VARIANTS = (0, LOCK_MASK, MOD2_MASK, LOCK_MASK | MOD2_MASK)
+
+
+def parse_hotkey(hotkey):
+    """Split "ctrl+shift+space" into (modifier names, key name)"""
+    parts = [part.strip().lower() for part in hotkey.split('+') if part.strip()]
+    if not parts:
+        raise ValueError(f"Empty hotkey: {hotkey!r}")
+    modifiers, key = parts[:-1], parts[-1]
+    unknown = [name for name in modifiers if name not in WIN_MODIFIERS]
+    if unknown:
+        raise ValueError(f"Unknown modifier in hotkey {hotkey!r}: {', '.join(unknown)}")
+    return modifiers, key
+
+
+def _function_key(key):
+    if key[0] == 'f' and key[1:].isdigit() and 1 <= int(key[1:]) <= 24:
+        return int(key[1:])
+    return None
+
+
+def windows_key(key):
+    """Virtual-key code for a key name"""
+    if key in WIN_KEYS:
+        return WIN_KEYS[key]
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return ord(key.upper())
+    number = _function_key(key)
+    if number is not None:
+        return 0x70 + number - 1
+    raise ValueError(f"Unsupported hotkey key: {key!r}")
+
+
+def x11_keysym_name(key):
+    """Keysym name for a key name, as XStringToKeysym takes it"""
+    if key in X11_KEYS:
+        return X11_KEYS[key]
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return key
+    number = _function_key(key)
+    if number is not None:
+        return f"F{number}"
+    raise ValueError(f"Unsupported hotkey key: {key!r}")
+
+
+class GlobalHotkey(QObject):
+    """One system-wide hotkey; ``activated`` fires on the GUI thread"""
+
+    activated = pyqtSignal()
+
+    def __init__(self, hotkey, parent=None):
+        super().__init__(parent)
+        self.hotkey = hotkey
+        self.backend = None
+
+    def register(self):
+        """Return False when the hotkey can't be registered here"""
+        try:
+            modifiers, key = parse_hotkey(self.hotkey)
+            if sys.platform == 'win32':
+                backend = _WindowsHotkey(modifiers, key, self.activated.emit)
+            elif sys.platform.startswith('linux') and os.environ.get('DISPLAY') and (
+                    os.environ.get('XDG_SESSION_TYPE', 'x11') == 'x11'):
+                backend = _X11Hotkey(modifiers, key, self.activated.emit, self)
+            else:
+                return False
+        except (OSError, ValueError):
+            return False
+        self.backend = backend
+        return True
+
+    def unregister(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+
+class _WindowsHotkey(QAbstractNativeEventFilter):
+    # Ids an application may use are 0x0000 to 0xBFFF
+    next_id = 1
+
+    def __init__(self, modifiers, key, callback):
+        super().__init__()
+        from ctypes import wintypes
+        self.wintypes = wintypes
+        self.user32 = ctypes.windll.user32
+        self.callback = callback
+        self.id = _WindowsHotkey.next_id
+        _WindowsHotkey.next_id += 1
+        flags = MOD_NOREPEAT
+        for name in modifiers:
+            flags |= WIN_MODIFIERS[name]
+        # A NULL window posts WM_HOTKEY to this (the GUI) thread's queue
+        if not self.user32.RegisterHotKey(None, self.id, flags, windows_key(key)):
+            raise ctypes.WinError()
+        QCoreApplication.instance().installNativeEventFilter(self)
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type == b'windows_generic_MSG':
+            msg = self.wintypes.MSG.from_address(int(message))
+            if msg.message == WM_HOTKEY and msg.wParam == self.id:
+                self.callback()
+                return True, 0
+        return False, 0
+
+    def close(self):
+        QCoreApplication.instance().removeNativeEventFilter(self)
+        self.user32.UnregisterHotKey(None, self.id)
+
+
+class _XKeyEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int),
+        ('serial', ctypes.c_ulong),
+        ('send_event', ctypes.c_int),
+        ('display', ctypes.c_void_p),
+        ('window', ctypes.c_ulong),
+        ('root', ctypes.c_ulong),
+        ('subwindow', ctypes.c_ulong),
+        ('time', ctypes.c_ulong),
+        ('x', ctypes.c_int),
+        ('y', ctypes.c_int),
+        ('x_root', ctypes.c_int),
+        ('y_root', ctypes.c_int),
+        ('state', ctypes.c_uint),
+        ('keycode', ctypes.c_uint),
+        ('same_screen', ctypes.c_int),
+    ]
+
+
+class _XEvent(ctypes.Union):
+    _fields_ = [('type', ctypes.c_int), ('xkey', _XKeyEvent), ('pad', ctypes.c_long * 24)]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+
+class _X11Hotkey:
+    """XGrabKey on the root window of a private display connection
+
+    Grabs of a key someone else already holds fail with BadAccess, which
+    Xlib reports asynchronously; a temporary error handler catches it so
+    the process isn't aborted and register() can return False instead.
+    """
+
+    def __init__(self, modifiers, key, callback, parent):
+        path = ctypes.util.find_library('X11')
+        if not path:
+            raise OSError("libX11 is not available")
+        xlib = self.xlib = ctypes.cdll.LoadLibrary(path)
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XStringToKeysym.restype = ctypes.c_ulong
+        xlib.XStringToKeysym.argtypes = [ctypes.c_char_p]
+        xlib.XKeysymToKeycode.restype = ctypes.c_ubyte
+        xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        xlib.XGrabKey.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_uint, ctypes.c_ulong,
+                                  ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        xlib.XUngrabKey.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_uint, ctypes.c_ulong]
+        xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XPending.argtypes = [ctypes.c_void_p]
+        xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XEvent)]
+        xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xlib.XSetErrorHandler.restype = ctypes.c_void_p
+        xlib.XSetErrorHandler.argtypes = [ctypes.c_void_p]
+
+        self.callback = callback
+        self.display = xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("Can't open the X display")
+        self.root = xlib.XDefaultRootWindow(self.display)
+        keysym = xlib.XStringToKeysym(x11_keysym_name(key).encode('ascii'))
+        self.keycode = xlib.XKeysymToKeycode(self.display, keysym) if keysym else 0
+        if not self.keycode:
+            xlib.XCloseDisplay(self.display)
+            raise ValueError(f"No key code for hotkey key {key!r}")
+        self.modifiers = 0
+        for name in modifiers:
+            self.modifiers |= X11_MODIFIERS[name]
+
+        failed = []
+        handler = _X_ERROR_HANDLER(lambda display, error: failed.append(error) or 0)
+        previous = xlib.XSetErrorHandler(ctypes.cast(handler, ctypes.c_void_p))
+        try:
+            for locks in LOCK_VARIANTS:
+                xlib.XGrabKey(self.display, self.keycode, self.modifiers | locks, self.root,
+                              False, GRAB_MODE_ASYNC, GRAB_MODE_ASYNC)
+            xlib.XSync(self.display, False)
+        finally:
+            xlib.XSetErrorHandler(previous)
+        if failed:
+            self._ungrab()
+            xlib.XCloseDisplay(self.display)
+            raise OSError("The hotkey is already taken by another application")
+
+        self.notifier = QSocketNotifier(xlib.XConnectionNumber(self.display),
+                                        QSocketNotifier.Read, parent)
+        self.notifier.activated.connect(self._read_events)
+
+    def _read_events(self):
+        event = _XEvent()
+        ignored = LOCK_MASK | MOD2_MASK
+        while self.xlib.XPending(self.display):
+            self.xlib.XNextEvent(self.display, ctypes.byref(event))
+            if (event.type == KEY_PRESS and event.xkey.keycode == self.keycode
+                    and event.xkey.state & ~ignored & 0xFF == self.modifiers):
+                self.callback()
+
+    def _ungrab(self):
+        for locks in LOCK_VARIANTS:
+            self.xlib.XUngrabKey(self.display, self.keycode, self.modifiers | locks, self.root)
+        self.xlib.XSync(self.display, False)
+
+    def close(self):
+        self.notifier.setEnabled(False)
+        self.notifier.deleteLater()
+        self._ungrab()
+        self.xlib.XCloseDisplay(self.display)
+        self.display = None
@@ -0,0 +1,227 @@
+"""Google OAuth for an installed app
+
+``google-tasks auth client_secret.json`` runs the loopback flow once: the
+browser asks the user to allow access and redirects back to a port on
+127.0.0.1, and the refresh token is kept in the app's data directory, not
+in the tracked config/. Access tokens last about an hour and are refreshed
+from it whenever they run out.
+"""
+import base64
+import hashlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from src.tasks_api import AuthError
+from src.utilities import get_data_dir, ensure_directory_exists
+
+TOKEN_FILE = 'google_token.json'
+AUTH_URI = 'https://accounts.google.com/o/oauth2/v2/auth'
+TOKEN_URI = 'https://oauth2.googleapis.com/token'
+SCOPE = 'https://www.googleapis.com/auth/tasks'
+# Refresh this long before the access token actually expires
+EXPIRY_MARGIN_SECONDS = 60
+
+REAUTH_MESSAGE = "Google sign-in is needed again; run: google-tasks auth CLIENT_SECRET.json"
+
+# One OAuthCredentials per token file, shared by every thread
+_credentials = {}
+_credentials_lock = threading.Lock()
+
+
+def default_token_path():
+    data_dir = get_data_dir()
+    ensure_directory_exists(data_dir)
+    return os.path.join(data_dir, TOKEN_FILE)
+
+
+def load_credentials(path=None):
+    """Shared credentials from the token file, or None before ``auth`` has run"""
+    path = path or default_token_path()
+    with _credentials_lock:
+        credentials = _credentials.get(path)
+        if credentials is None:
+            if not os.path.exists(path):
+                return None
+            credentials = _credentials[path] = OAuthCredentials(path)
+        return credentials
+
+
+class StaticToken:
+    """An access token given as is, e.g. in GOOGLE_TASKS_TOKEN
+
+    It can't be refreshed, so once it expires every call needs re-auth.
+    """
+
+    def __init__(self, token):
+        self.token = token
+
+    def access_token(self):
+        return self.token
+
+    def refresh(self):
+        return False
+
+
+class OAuthCredentials:
+    """Access token refreshed from a stored refresh token
+
+    The token file is re-read when another process (``google-tasks auth``
+    while the app runs) replaced it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._data = {}
+        self._load()
+
+    def access_token(self):
+        with self._lock:
+            self._reload_if_changed()
+            if (not self._data.get('access_token')
+                    or self._data.get('expiry', 0) - EXPIRY_MARGIN_SECONDS < time.time()):
+                self._refresh()
+            return self._data['access_token']
+
+    def refresh(self):
+        """Get a new access token after the API rejected the current one"""
+        with self._lock:
+            self._reload_if_changed()
+            self._refresh()
+        return True
+
+    def _refresh(self):
+        if not self._data.get('refresh_token'):
+            raise AuthError(REAUTH_MESSAGE)
+        try:
+            response = token_request(self._data.get('token_uri', TOKEN_URI), {
+                'client_id': self._data['client_id'],
+                'client_secret': self._data.get('client_secret', ''),
+                'refresh_token': self._data['refresh_token'],
+                'grant_type': 'refresh_token',
+            })
+        except AuthError:
+            # Revoked or expired refresh token; only signing in again helps
+            raise AuthError(REAUTH_MESSAGE) from None
+        self._data.update(access_token=response['access_token'],
+                          expiry=time.time() + response.get('expires_in', 3600))
+        save_token_file(self.path, self._data)
+        self._mtime = os.path.getmtime(self.path)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self._data = json.load(f)
+        self._mtime = os.path.getmtime(self.path)
+
+    def _reload_if_changed(self):
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self._load()
+        except (OSError, ValueError):
+            pass
+
+
+def token_request(token_uri, fields, timeout=30):
+    """POST to the token endpoint; rejected grants raise AuthError"""
+    data = urllib.parse.urlencode(fields).encode('utf-8')
+    req = urllib.request.Request(token_uri, data=data, method='POST')
+    req.add_header('Content-Type', 'application/x-www-form-urlencoded')
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        if e.code in (400, 401):
+            raise AuthError(e.read().decode('utf-8', 'replace')) from e
+        raise
+
+
+def save_token_file(path, data):
+    """Replace the token file atomically, readable by this user only"""
+    partial = path + '.part'
+    fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(partial, path)
+
+
+def authorize(client_secrets_path, path=None, open_browser=None):
+    """Run the installed-app loopback flow and store the refresh token
+
+    ``client_secrets_path`` is the JSON downloaded for a "Desktop app"
+    OAuth client. Returns the token file path.
+    """
+    with open(client_secrets_path, 'r', encoding='utf-8') as f:
+        secrets_json = json.load(f)
+    client = secrets_json.get('installed') or secrets_json
+    verifier = secrets.token_urlsafe(64)
+    challenge = base64.urlsafe_b64encode(
+        hashlib.sha256(verifier.encode('ascii')).digest()).rstrip(b'=').decode('ascii')
+    state = secrets.token_urlsafe(16)
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            if query.get('state', [''])[0] == state:
+                received.update((key, values[0]) for key, values in query.items())
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(b"Google Tasks is signed in; you can close this tab.")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    redirect_uri = f"http://127.0.0.1:{server.server_port}"
+    url = client.get('auth_uri', AUTH_URI) + '?' + urllib.parse.urlencode({
+        'client_id': client['client_id'],
+        'redirect_uri': redirect_uri,
+        'response_type': 'code',
+        'scope': SCOPE,
+        'access_type': 'offline',
+        'prompt': 'consent',
+        'state': state,
+        'code_challenge': challenge,
+        'code_challenge_method': 'S256',
+    })
+    if open_browser is None:
+        import webbrowser
+        open_browser = webbrowser.open
+    print(f"Opening the browser to sign in; if it doesn't open, visit:\n{url}", file=sys.stderr)
+    open_browser(url)
+    try:
+        while 'code' not in received and 'error' not in received:
+            server.handle_request()
+    finally:
+        server.server_close()
+    if 'error' in received:
+        raise AuthError(f"Sign-in was not completed: {received['error']}")
+
+    token_uri = client.get('token_uri', TOKEN_URI)
+    response = token_request(token_uri, {
+        'client_id': client['client_id'],
+        'client_secret': client.get('client_secret', ''),
+        'code': received['code'],
+        'code_verifier': verifier,
+        'grant_type': 'authorization_code',
+        'redirect_uri': redirect_uri,
+    })
+    path = path or default_token_path()
+    save_token_file(path, {
+        'client_id': client['client_id'],
+        'client_secret': client.get('client_secret', ''),
+        'token_uri': token_uri,
+        'refresh_token': response['refresh_token'],
+        'access_token': response['access_token'],
+        'expiry': time.time() + response.get('expires_in', 3600),
+    })
+    return path
@@ -0,0 +1,60 @@
+import os
+from PyQt5.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+from src.export_worker import ExportJob
+from src.exporter import get_exporter
+
+# Changes arriving within this window share one rewrite
+FEED_DELAY_MS = 5000
+
+
+class IcsFeed(QObject):
+    """Keep a subscribable .ics file in step with the task store
+
+    The file is rewritten on a worker thread only after tasks changed,
+    with changes debounced into one rewrite. ExportJob writes to a
+    temporary file and renames it into place, so a calendar app polling
+    the file never reads half of it.
+    """
+
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, path, format_name='ics', parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+        self.export_format = get_exporter(format_name)
+        self.running = False
+        self.dirty = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FEED_DELAY_MS)
+        self.timer.timeout.connect(self.regenerate)
+        if not os.path.exists(path):
+            self.timer.start()
+
+    def tasks_changed(self):
+        self.timer.start()
+
+    def regenerate(self):
+        if self.running:
+            # Run again once the current rewrite is done
+            self.dirty = True
+            return
+        self.running = True
+        try:
+            job = ExportJob(self.export_format, self.store.iter_tasks(), self.path)
+            # Every way a job ends clears running, or the feed would stop
+            job.signals.finished.connect(self._on_done)
+            job.signals.failed.connect(self._on_done)
+            job.signals.cancelled.connect(self._on_done)
+            job.signals.failed.connect(self.failed)
+            QThreadPool.globalInstance().start(job)
+        except Exception as e:
+            self._on_done()
+            self.failed.emit(str(e))
+
+    def _on_done(self, *args):
+        self.running = False
+        if self.dirty:
+            self.dirty = False
+            self.timer.start()
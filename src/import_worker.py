@@ -0,0 +1,116 @@
+import csv
+import threading
+import time
+from PyQt5.QtCore import QObject, QRunnable, QTimer, pyqtSignal
+from src.importer import (API_CONCURRENCY, ImportCancelled, ImportResult, chunked, import_ops,
+                          import_to_api)
+from src.metrics import metrics
+from src.tasks_api import TasksApiClient, TasksApiError
+
+# Tasks the page adds per runtime call
+PAGE_CHUNK_SIZE = 25
+
+
+class ImportSignals(QObject):
+    total = pyqtSignal(int)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)  # ImportResult
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class ImportJob(QRunnable):
+    """Read tasks and create them through the API on a pool thread"""
+
+    def __init__(self, tasks, store, credentials, base_url, list_id='@default',
+                 concurrency=API_CONCURRENCY, op_log=None):
+        super().__init__()
+        self.tasks = tasks
+        self.store = store
+        self.credentials = credentials
+        self.base_url = base_url
+        self.list_id = list_id
+        self.concurrency = concurrency
+        self.op_log = op_log
+        self.signals = ImportSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            # Reading the whole file first gives the progress dialog a total
+            tasks = list(self.tasks)
+            self.signals.total.emit(len(tasks))
+            result = import_to_api(
+                tasks, lambda: TasksApiClient(self.credentials, self.base_url), self.store,
+                self.list_id, self.concurrency,
+                on_progress=lambda result: self.signals.progress.emit(result.processed),
+                cancelled=self._cancelled, op_log=self.op_log)
+        except ImportCancelled:
+            self.signals.cancelled.emit()
+            return
+        except (TasksApiError, OSError, ValueError, csv.Error) as e:
+            self.signals.failed.emit(str(e))
+            return
+        metrics.record('import.api', result.seconds * 1000)
+        self.signals.finished.emit(result)
+
+
+class PageImporter(QObject):
+    """Add tasks through the page, one batched runtime call per chunk
+
+    Chunks are sent one after another so the page never has more than one
+    in flight, each appended to the operation log first. Tasks the page
+    couldn't add are left there for the TaskWriter to replay. Shares
+    ImportSignals with ImportJob so the app handles both the same way.
+    """
+
+    def __init__(self, runtime, tasks, op_log, chunk_size=PAGE_CHUNK_SIZE, parent=None):
+        super().__init__(parent)
+        self.runtime = runtime
+        self.op_log = op_log
+        self.chunks = list(chunked(tasks, chunk_size))
+        self.total = len(tasks)
+        self.signals = ImportSignals()
+        self.result = ImportResult()
+        self._started = 0.0
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.signals.total.emit(self.total)
+        self._next_chunk()
+
+    def _next_chunk(self):
+        self.result.seconds = time.perf_counter() - self._started
+        if self._cancelled:
+            self.signals.cancelled.emit()
+            return
+        if not self.chunks:
+            metrics.record('import.page', self.result.seconds * 1000)
+            self.signals.finished.emit(self.result)
+            return
+        chunk, ops = import_ops(self.chunks.pop(0), self.result)
+        if not ops:
+            # Every task in the chunk was rejected
+            self.signals.progress.emit(self.result.processed)
+            QTimer.singleShot(0, self._next_chunk)
+            return
+        self.op_log.append_batch(ops)
+        items = [[task['title'], task.get('due', '')] for task in chunk]
+        self.runtime.call('addTasks', items, callback=lambda added: self._on_chunk(ops, added))
+
+    def _on_chunk(self, ops, added):
+        # None when the script didn't run; the whole chunk is replayed
+        added = added or 0
+        self.op_log.mark_done(*(op['op_id'] for op in ops[:added]))
+        self.op_log.release(op['op_id'] for op in ops[added:])
+        self.result.imported += added
+        self.result.queued += len(ops) - added
+        self.signals.progress.emit(self.result.processed)
+        self._next_chunk()
@@ -0,0 +1,329 @@
+import csv
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from src.op_log import new_op
+from src.tasks_api import RETRY_STATUSES, AuthError, TasksApiError, new_task_body, task_from_api
+
+ImportFormat = namedtuple('ImportFormat', 'name label file_filter extensions reader')
+
+IMPORTERS = {}
+
+# Tasks sent per batch, and API requests in flight at once
+IMPORT_CHUNK_SIZE = 50
+API_CONCURRENCY = 4
+# Retries for rate limiting and server errors, with exponential backoff
+MAX_RETRIES = 3
+RETRY_DELAY = 1.0
+# Error messages kept for the final report
+MAX_ERRORS = 20
+
+# "Pay rent 2024-05-01" sets a due date, as does the text exporter's
+# "Pay rent (Due: 2024-05-01)"
+DUE_SUFFIX_RE = re.compile(r'\s*(?:\(Due:\s*(\d{4}-\d{2}-\d{2})?\)|\s(\d{4}-\d{2}-\d{2}))$')
+# "- item", "1. item", "[ ] item", "[x] done item", "✓ done item"
+BULLET_RE = re.compile(r'^\s*(?:([-*•✓✗])|\d+[.)])?\s*(?:\[([ xX]?)\])?\s*')
+
+TITLE_KEYS = ('title', 'name', 'task', 'summary', 'subject')
+NOTES_KEYS = ('notes', 'note', 'description', 'details')
+DUE_KEYS = ('due', 'due date', 'due_date', 'date', 'deadline')
+TRUE_VALUES = ('true', 'yes', 'y', '1', 'x', 'done', 'completed', '✓')
+
+
+def register_importer(name, label, file_filter, extensions):
+    """Decorator adding a reader to the import registry
+
+    A reader takes a text file object and yields task dicts with title,
+    notes, due (YYYY-MM-DD or '') and completed.
+    """
+    def decorator(reader):
+        IMPORTERS[name] = ImportFormat(name, label, file_filter, extensions, reader)
+        return reader
+    return decorator
+
+
+def get_importer(name):
+    """Return the registered ImportFormat for ``name``"""
+    try:
+        return IMPORTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown import format: {name}") from None
+
+
+def importer_for_filename(filename):
+    """Pick a format by extension, falling back to a plain list"""
+    extension = os.path.splitext(filename)[1].lstrip('.').lower()
+    for import_format in IMPORTERS.values():
+        if extension in import_format.extensions:
+            return import_format
+    return IMPORTERS['txt']
+
+
+def read_tasks(filename, import_format=None):
+    """Yield tasks from a file, opened only once iteration starts"""
+    import_format = import_format or importer_for_filename(filename)
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from import_format.reader(f)
+
+
+def parse_task_line(text):
+    """Split one line of text into (title, due)"""
+    text = text.strip()
+    match = DUE_SUFFIX_RE.search(text)
+    if match:
+        return text[:match.start()].strip(), match.group(1) or match.group(2) or ''
+    return text, ''
+
+
+def _field(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ''):
+            return str(value).strip()
+    return ''
+
+
+def _task_from_record(record):
+    """Map a loosely named record (CSV row, JSON object) to a task"""
+    record = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    title = _field(record, TITLE_KEYS)
+    if not title:
+        return None
+    completed = record.get('completed', record.get('status', ''))
+    if not isinstance(completed, bool):
+        completed = str(completed).strip().lower() in TRUE_VALUES
+    return {
+        'title': title,
+        'notes': _field(record, NOTES_KEYS),
+        # Accept full timestamps, keep the date
+        'due': _field(record, DUE_KEYS)[:10],
+        'completed': completed,
+    }
+
+
+@register_importer('csv', "CSV", "CSV Files (*.csv)", ('csv',))
+def read_csv(f):
+    for row in csv.DictReader(f):
+        task = _task_from_record(row)
+        if task:
+            yield task
+
+
+@register_importer('json', "JSON", "JSON Files (*.json)", ('json',))
+def read_json(f):
+    data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('items') or data.get('tasks') or []
+    for item in data:
+        task = _task_from_record(item) if isinstance(item, dict) else None
+        if task:
+            yield task
+
+
+def _ics_lines(f):
+    """Unfold continuation lines (RFC 5545 3.1)"""
+    current = None
+    for line in f:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _ics_text(value):
+    return (value.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\'))
+
+
+@register_importer('ics', "iCalendar", "iCalendar Files (*.ics)", ('ics', 'ical'))
+def read_ics(f):
+    component = None
+    for line in _ics_lines(f):
+        name, _, value = line.partition(':')
+        name, _, params = name.partition(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() in ('VTODO', 'VEVENT'):
+            component = {}
+        elif component is None:
+            continue
+        elif name == 'END' and value.upper() in ('VTODO', 'VEVENT'):
+            if component.get('title'):
+                yield {
+                    'title': component['title'],
+                    'notes': component.get('notes', ''),
+                    'due': component.get('due') or component.get('start', ''),
+                    'completed': component.get('completed', False),
+                }
+            component = None
+        elif name == 'SUMMARY':
+            component['title'] = _ics_text(value).strip()
+        elif name == 'DESCRIPTION':
+            component['notes'] = _ics_text(value)
+        elif name in ('DUE', 'DTSTART') and len(value) >= 8 and value[:8].isdigit():
+            day = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+            component['due' if name == 'DUE' else 'start'] = day
+        elif name == 'STATUS':
+            component['completed'] = value.strip().upper() == 'COMPLETED'
+
+
+@register_importer('txt', "Text List", "Text Files (*.txt)", ('txt', 'md'))
+def read_lines(f):
+    for line in f:
+        match = BULLET_RE.match(line)
+        title, due = parse_task_line(line[match.end():])
+        if title:
+            yield {'title': title, 'notes': '', 'due': due,
+                   'completed': match.group(1) == '✓' or bool((match.group(2) or '').strip())}
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportResult:
+    """Running totals for an import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        # Left in the operation log, to be added by the app's replays
+        self.queued = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def fail(self, title, error):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"{title}: {error}")
+
+    @property
+    def processed(self):
+        return self.imported + self.failed + self.queued
+
+    @property
+    def rate(self):
+        return self.processed / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        text = (f"Imported {self.imported} tasks in {self.seconds:.1f}s "
+                f"({self.rate:.1f} tasks/s)")
+        if self.queued:
+            text += f", {self.queued} queued to retry"
+        if self.failed:
+            text += f", {self.failed} failed"
+        return text
+
+
+def import_ops(chunk, result, list_id='@default'):
+    """Operation log entries adding a chunk of imported tasks
+
+    Returns ``(tasks, ops)`` for the tasks that can be sent. A task whose
+    due date isn't a valid YYYY-MM-DD date is failed in ``result`` and
+    left out, so one bad row doesn't stop the import.
+    """
+    tasks, ops = [], []
+    for task in chunk:
+        try:
+            body = new_task_body(task['title'], task.get('notes', ''), task.get('due', ''))
+        except ValueError:
+            result.fail(task['title'], f"invalid due date {task.get('due')!r}, expected YYYY-MM-DD")
+            continue
+        if task.get('completed'):
+            body['status'] = 'completed'
+        tasks.append(task)
+        # Sent straight away, so a replay first checks whether it landed
+        ops.append(new_op('add', list_id=list_id, body=body, sent=True))
+    return tasks, ops
+
+
+def import_to_api(tasks, make_client, store, list_id='@default', concurrency=API_CONCURRENCY,
+                  chunk_size=IMPORT_CHUNK_SIZE, on_progress=None, cancelled=None, op_log=None):
+    """Create tasks through the API, ``concurrency`` requests at a time
+
+    Tasks go out in chunks; each finished chunk is written to the store in
+    one transaction and reported to ``on_progress(result)``. Each chunk is
+    first appended to ``op_log`` in one batch. Tasks that fail on the
+    network or a retryable status after MAX_RETRIES are left there for the
+    app to replay; other failures are counted and skipped. ``cancelled``
+    is an optional threading.Event checked between chunks.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+    local = threading.local()
+
+    def insert(body):
+        # One client per worker thread
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = make_client()
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return task_from_api(client.insert_task(list_id, body), list_id)
+            except TasksApiError as e:
+                if e.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for chunk in chunked(tasks, chunk_size):
+            if cancelled is not None and cancelled.is_set():
+                raise ImportCancelled()
+            chunk, ops = import_ops(chunk, result, list_id)
+            if op_log is not None:
+                op_log.append_batch(ops)
+            futures = [pool.submit(insert, op['body']) for op in ops]
+            created, done, queued = [], [], []
+            for task, op, future in zip(chunk, ops, futures):
+                try:
+                    created.append(future.result())
+                    done.append(op['op_id'])
+                except AuthError:
+                    # Every other task would fail the same way; whatever
+                    # isn't known to be done waits in the log for sign-in
+                    for pending in futures:
+                        pending.cancel()
+                    if op_log is not None:
+                        op_log.mark_done(*done)
+                        op_log.release(other['op_id'] for other in ops)
+                    raise
+                except (TasksApiError, OSError, ValueError) as e:
+                    retry = isinstance(e, OSError) or (
+                        isinstance(e, TasksApiError) and (e.status in RETRY_STATUSES
+                                                          or e.status == 408))
+                    if retry and op_log is not None:
+                        queued.append(op['op_id'])
+                    else:
+                        result.fail(task['title'], e)
+                        done.append(op['op_id'])
+            if op_log is not None:
+                op_log.mark_done(*done)
+                op_log.release(queued)
+            result.queued += len(queued)
+            if created and store.preferred_source() == 'api':
+                store.upsert_tasks(created, source='api', list_id=list_id)
+            result.imported += len(created)
+            result.seconds = time.perf_counter() - started
+            if on_progress:
+                on_progress(result)
+    result.seconds = time.perf_counter() - started
+    return result
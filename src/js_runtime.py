@@ -0,0 +1,235 @@
+import json
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.metrics import metrics
+from src.task_bridge import TASK_ID_JS
+
+SCRIPT_NAME = "gt-runtime"
+
+# Helper library installed once per document in the application's isolated
+# world. Python calls these functions by name with JSON arguments.
+RUNTIME_JS = """
+(function () {
+    if (window.__gt) return;
+    const ITEM = '[role="listitem"]';
+    // Room for the app's resources in the timing buffer (default 250)
+    if (performance.setResourceTimingBufferSize) performance.setResourceTimingBufferSize(1000);
+
+    function titleOf(item) {
+        const textElem = item.querySelector('[aria-label="Task title"]');
+        return textElem ? textElem.textContent : '';
+    }
+
+    function setInputValue(input, value) {
+        input.value = value;
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+    }
+
+    const api = {
+        addTask(title, due, completed) {
+            const input = document.querySelector('input[aria-label="Add a task"]');
+            if (!input) return false;
+            setInputValue(input, title);
+            const dateInput = document.querySelector('input[aria-label="Due date"]');
+            if (dateInput && due) setInputValue(dateInput, due);
+            const addButton = document.querySelector('div[role="button"][aria-label="Add task"]');
+            if (addButton) addButton.click();
+            if (completed) {
+                // The newest item with this title is the one just added
+                const added = Array.from(document.querySelectorAll(ITEM))
+                    .filter(item => titleOf(item) === title).pop();
+                // The observer tags new items later; derive the id now
+                if (added) api.completeTask(window.__gtTaskId(added), title);
+            }
+            return true;
+        },
+
+        // Idempotent: an already completed task is left alone. The title
+        // guards against a derived id that now names another task.
+        completeTask(id, title) {
+            const item = document.querySelector(ITEM + '[data-gt-id="' + CSS.escape(id) + '"]');
+            if (!item || (title && titleOf(item) !== title)) return 'not-found';
+            const checkbox = item.querySelector('input[type="checkbox"]');
+            if (!checkbox) return false;
+            if (!checkbox.checked) checkbox.click();
+            return true;
+        },
+
+        selectedTask() {
+            const selected = document.querySelector(ITEM + '[aria-selected="true"]');
+            if (!selected) return null;
+            return { id: window.__gtTaskId(selected), title: titleOf(selected) };
+        },
+
+        // Adds [title, due] pairs in order, stopping at the first failure;
+        // returns how many were added
+        addTasks(items) {
+            let added = 0;
+            for (const item of items) {
+                if (!api.addTask(item[0], item[1])) break;
+                added++;
+            }
+            return added;
+        },
+
+        saveScroll() {
+            const root = document.scrollingElement || document.documentElement;
+            return {
+                x: window.scrollX, y: window.scrollY,
+                root: root ? root.scrollTop : 0,
+                lists: Array.from(document.querySelectorAll('[role="list"]')).map(el => el.scrollTop)
+            };
+        },
+
+        restoreScroll(state) {
+            window.scrollTo(state.x, state.y);
+            const root = document.scrollingElement || document.documentElement;
+            if (root) root.scrollTop = state.root;
+            document.querySelectorAll('[role="list"]').forEach((el, i) => {
+                if (i < state.lists.length) el.scrollTop = state.lists[i];
+            });
+            return true;
+        },
+
+        revealTask(id) {
+            const item = document.querySelector(ITEM + '[data-gt-id="' + CSS.escape(id) + '"]');
+            if (!item) return false;
+            item.scrollIntoView({ block: 'center' });
+            item.click();
+            return true;
+        },
+
+        // Resources served from cache transfer no bytes but still decode some
+        resourceStats() {
+            const entries = performance.getEntriesByType('navigation')
+                .concat(performance.getEntriesByType('resource'));
+            const stats = { total: entries.length, cached: 0, network: 0, unknown: 0, transferred: 0 };
+            entries.forEach(entry => {
+                if (entry.transferSize > 0) {
+                    stats.network++;
+                    stats.transferred += entry.transferSize;
+                } else if (entry.decodedBodySize > 0) {
+                    stats.cached++;
+                } else {
+                    stats.unknown++;
+                }
+            });
+            return stats;
+        },
+
+        clickNewTask() {
+            const button = document.querySelector('div[role="button"]');
+            if (!button) return false;
+            button.click();
+            return true;
+        },
+
+        // One bounded chunk of tasks starting at cursor. The first call
+        // snapshots the rendered items so later chunks page a stable list;
+        // null means the document was replaced since and the export is lost.
+        extractChunk(cursor, limit) {
+            if (cursor === 0) {
+                api._exportItems = Array.from(document.querySelectorAll(ITEM));
+            } else if (!api._exportItems) {
+                return null;
+            }
+            const items = api._exportItems;
+            const tasks = [];
+            const end = Math.min(items.length, cursor + limit);
+            for (let i = cursor; i < end; i++) {
+                const item = items[i];
+                const textElem = item.querySelector('[aria-label="Task title"]');
+                if (!textElem) continue;
+                const dateElem = item.querySelector('[aria-label="Due date"]');
+                tasks.push({
+                    id: window.__gtTaskId(item),
+                    title: textElem.textContent,
+                    notes: '',
+                    due: dateElem ? dateElem.textContent : '',
+                    completed: !!item.querySelector('input[type="checkbox"]:checked')
+                });
+            }
+            const total = items.length;
+            if (end >= total) api._exportItems = null;
+            return { tasks: tasks, next: end >= total ? null : end, total: total };
+        }
+    };
+
+    // Runs queued calls in order; one failing call doesn't stop the rest
+    api.batch = function (calls) {
+        return calls.map(call => {
+            try {
+                return { ok: true, value: api[call[0]].apply(null, call[1]) };
+            } catch (e) {
+                return { ok: false, error: String(e) };
+            }
+        });
+    };
+
+    window.__gt = api;
+})();
+"""
+
+BATCH_JS = "typeof __gt === 'undefined' ? null : __gt.batch(%s);"
+
+
+class JsRuntime(QObject):
+    """Call the page's preinstalled helper functions by name
+
+    Calls made in the same event-loop tick are sent together, so several
+    operations cost a single runJavaScript round trip and the page never has
+    to parse more than a short JSON batch.
+    """
+
+    def __init__(self, page, parent=None):
+        super().__init__(parent)
+        self.page = page
+        self._queue = []
+        self._flush_pending = False
+
+    def install(self):
+        """Register the runtime so it is present in every loaded document"""
+        scripts = self.page.scripts()
+        for script in scripts.findScripts(SCRIPT_NAME):
+            scripts.remove(script)
+
+        script = QWebEngineScript()
+        script.setName(SCRIPT_NAME)
+        script.setSourceCode(TASK_ID_JS + RUNTIME_JS)
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+
+    def call(self, name, *args, callback=None):
+        """Queue a call to ``__gt.<name>(*args)``
+
+        ``callback`` receives the return value, or None when the call failed
+        or the runtime isn't loaded yet.
+        """
+        self._queue.append((name, list(args), callback))
+        if not self._flush_pending:
+            self._flush_pending = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """Send every queued call in one round trip"""
+        self._flush_pending = False
+        calls, self._queue = self._queue, []
+        if not calls:
+            return
+        payload = json.dumps([[name, args] for name, args, _ in calls])
+        callbacks = [callback for _, _, callback in calls]
+        started = metrics.start()
+        self.page.runJavaScript(BATCH_JS % payload, QWebEngineScript.ApplicationWorld,
+                                lambda results: self._dispatch(callbacks, results, started))
+
+    @staticmethod
+    def _dispatch(callbacks, results, started=None):
+        metrics.record_since('js.round_trip', started)
+        results = results or []
+        for i, callback in enumerate(callbacks):
+            if callback is None:
+                continue
+            result = results[i] if i < len(results) else None
+            callback(result.get('value') if result and result.get('ok') else None)
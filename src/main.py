@@ -1,18 +1,51 @@
+import time
+
+# Taken before any project import so they count towards startup time
+STARTED = time.perf_counter()
+
 import sys
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from src.app_window import GoogleTasksApp
+from src import cli, single_instance
 
 def main():
+    # A running instance takes over show, add and interactive export
+    message = single_instance.command_message(sys.argv[1:])
+    if message is not None and single_instance.forward(message):
+        sys.exit(0)
+    
+    # Batch commands run headless and never load QtWebEngine
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+    
+    from src.startup_profile import StartupProfile
+    profile = StartupProfile('--startup-profile' in sys.argv, STARTED)
+    argv = [arg for arg in sys.argv if arg != '--startup-profile']
+    
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import Qt
+    from src.app_window import GoogleTasksApp
+    profile.mark("imports")
+    
     # Enable high DPI scaling
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
+    # Lets QtWebEngine be imported lazily, after QApplication exists
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
     app.setApplicationName("Google Tasks")
     app.setApplicationDisplayName("Google Tasks App")
+    profile.mark("QApplication")
+    
+    server = single_instance.InstanceServer(app)
+    if not server.listen() and single_instance.forward(message or {'command': 'show'}):
+        # Another instance won the race to start
+        sys.exit(0)
     
-    window = GoogleTasksApp()
-    window.show()
+    window = GoogleTasksApp(profile)
+    server.command_received.connect(window.handle_instance_command)
+    if argv[1:2] == ['show']:
+        window.show_normal()
+    else:
+        window.start()
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,178 @@
+import bisect
+import json
+import os
+import threading
+import time
+from src.utilities import ensure_directory_exists, get_data_dir
+
+# Histogram bucket upper bounds in milliseconds; slower samples go in a last
+# overflow bucket
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+METRICS_FILE = "metrics.jsonl"
+MAX_FILE_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+
+
+class Histogram:
+    """Latency counts per bucket plus count, total, min and max"""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, ms):
+        self.count += 1
+        self.total += ms
+        if self.min is None or ms < self.min:
+            self.min = ms
+        if self.max is None or ms > self.max:
+            self.max = ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, hits in zip(BUCKETS_MS, self.buckets):
+            seen += hits
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'min_ms': self.min,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': dict(zip([str(b) for b in BUCKETS_MS] + ['inf'], self.buckets)),
+        }
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Named latency histograms and counters, free to call while disabled
+
+    ``timed(name)`` returns a shared no-op context manager when recording
+    is off, so instrumented code pays one attribute check. Asynchronous
+    paths take ``start()`` and later pass its value to ``record_since``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def timed(self, name):
+        return _Timer(self, name) if self.enabled else NULL_TIMER
+
+    def start(self):
+        """Timestamp for record_since, or None while disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def record_since(self, name, started):
+        if started is not None:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def record(self, name, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(ms)
+
+    def increment(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.snapshot()
+                    for name, histogram in sorted(self._histograms.items())}
+
+    def counters(self):
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def dump(self, path=None):
+        """Append a snapshot line to the metrics log, rotating it when full"""
+        snapshot = self.snapshot()
+        counters = self.counters()
+        if not snapshot and not counters:
+            return None
+        if path is None:
+            data_dir = get_data_dir()
+            ensure_directory_exists(data_dir)
+            path = os.path.join(data_dir, METRICS_FILE)
+        rotate(path)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'time': time.time(), 'pid': os.getpid(),
+                                'metrics': snapshot, 'counters': counters}) + '\n')
+        return path
+
+
+def rotate(path, max_bytes=MAX_FILE_BYTES, backups=BACKUP_COUNT):
+    """Shift path -> path.1 -> ... -> path.<backups> once path is full"""
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+# Process-wide registry used by the instrumented code paths
+metrics = Metrics()
+timed = metrics.timed
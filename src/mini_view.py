@@ -0,0 +1,56 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QLabel, QListView, QVBoxLayout, QWidget
+from src.task_model import PendingTasksProxy
+
+
+class MiniTaskView(QWidget):
+    """Small always-on-top list of pending tasks
+
+    Renders the shared TaskListModel natively, so it costs a few widgets
+    rather than a second browser.
+    """
+
+    def __init__(self, model, main_window):
+        super().__init__(None, Qt.Tool | Qt.WindowStaysOnTopHint)
+        self.main_window = main_window
+        self.setWindowTitle("Tasks")
+        self.resize(320, 420)
+
+        self.proxy = PendingTasksProxy(self)
+        self.proxy.setSourceModel(model)
+
+        self.summary = QLabel(self)
+        self.list_view = QListView(self)
+        # Fixed row height lets the view lay out only the visible rows
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setModel(self.proxy)
+        self.list_view.setEditTriggers(QListView.NoEditTriggers)
+        self.list_view.doubleClicked.connect(self.open_main_window)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+
+        for signal in (self.proxy.rowsInserted, self.proxy.rowsRemoved, self.proxy.modelReset):
+            signal.connect(self.update_summary)
+        self.update_summary()
+
+    def update_summary(self, *args):
+        self.summary.setText(f"{self.proxy.rowCount()} pending tasks")
+
+    def toggle(self):
+        """Show near the bottom-right corner of the screen, or hide"""
+        if self.isVisible():
+            self.hide()
+            return
+        screen = QApplication.primaryScreen().availableGeometry()
+        self.move(screen.right() - self.width() - 16, screen.bottom() - self.height() - 16)
+        self.show()
+        self.raise_()
+
+    def open_main_window(self, index=None):
+        self.hide()
+        self.main_window.show_normal()
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWidgets import QSystemTrayIcon
+from src.utilities import get_data_dir, ensure_directory_exists
+
+# Remember at most this many notified tasks, oldest are forgotten first
+MAX_REMEMBERED = 5000
+# Wait this long after the first due task so a burst ends up in one toast
+COALESCE_MS = 500
+# How many titles a digest toast lists before summarizing the rest
+DIGEST_TITLES = 3
+
+
+def notification_key(task):
+    """Identify one due occurrence of a task
+
+    API ids are stable. Page ids can shift between loads (identical tasks
+    are numbered in document order), so page tasks are keyed by title and
+    due time: a reload neither repeats a toast nor silences another task.
+    """
+    if task.get('source') == 'api':
+        return f"{task['id']}:{task.get('due_ts')}"
+    return f"page:{task.get('title', '')}:{task.get('due_ts')}"
+
+
+class NotificationCenter(QObject):
+    """Turn due tasks into de-duplicated, rate-limited digest toasts
+
+    A task is announced once per due time. The set of announced tasks is
+    persisted so restarts don't repeat old toasts. Tasks that become due
+    close together are merged into one toast, and toasts are spaced at
+    least ``min_interval`` seconds apart. The sound is decoded once and
+    replayed from memory.
+    """
+
+    def __init__(self, tray_icon, min_interval=30, state_path=None, parent=None):
+        super().__init__(parent)
+        self.tray_icon = tray_icon
+        self.min_interval = min_interval
+        self.sound_enabled = True
+        self.state_path = state_path or os.path.join(get_data_dir(), 'notified.json')
+        self._notified = self._load_state()
+        self._pending = {}
+        self._last_shown = 0.0
+        self._sound = None
+
+        self._digest_timer = QTimer(self)
+        self._digest_timer.setSingleShot(True)
+        self._digest_timer.timeout.connect(self._show_digest)
+
+    def notify(self, tasks):
+        """Queue due tasks that haven't been announced yet"""
+        for task in tasks:
+            key = notification_key(task)
+            if key not in self._notified and key not in self._pending:
+                self._pending[key] = task
+        if not self._pending or self._digest_timer.isActive():
+            return
+
+        wait = self._last_shown + self.min_interval - time.monotonic()
+        self._digest_timer.start(max(COALESCE_MS, int(wait * 1000)))
+        if self.sound_enabled:
+            self._load_sound()  # Decodes while the digest is being collected
+
+    def _show_digest(self):
+        if not self._pending:
+            return
+        tasks = list(self._pending.values())
+        for key in self._pending:
+            self._notified[key] = None
+        self._pending.clear()
+        self._last_shown = time.monotonic()
+        self._trim_and_save()
+
+        if len(tasks) == 1:
+            title = "Task Due!"
+            message = f"'{tasks[0]['title']}' was due on {tasks[0]['due']}"
+        else:
+            title = f"{len(tasks)} Tasks Due!"
+            lines = [f"• {task['title']}" for task in tasks[:DIGEST_TITLES]]
+            if len(tasks) > DIGEST_TITLES:
+                lines.append(f"and {len(tasks) - DIGEST_TITLES} more")
+            message = "\n".join(lines)
+
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.Warning, 10000)
+        if self.sound_enabled:
+            self.play_sound()
+
+    def play_sound(self):
+        """Play the notification sound from memory"""
+        self._load_sound()
+        self._sound.play()
+
+    def _load_sound(self):
+        if self._sound is None:
+            from PyQt5.QtMultimedia import QSoundEffect
+            self._sound = QSoundEffect(self)
+            path = os.path.abspath(os.path.join("assets", "sounds", "notification.wav"))
+            self._sound.setSource(QUrl.fromLocalFile(path))
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return dict.fromkeys(json.load(f))
+        except (OSError, ValueError):
+            return {}
+
+    def _trim_and_save(self):
+        while len(self._notified) > MAX_REMEMBERED:
+            del self._notified[next(iter(self._notified))]
+        ensure_directory_exists(os.path.dirname(self.state_path))
+        with open(self.state_path, 'w') as f:
+            json.dump(list(self._notified), f)
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+import uuid
+from src.utilities import get_data_dir, ensure_directory_exists
+
+OP_LOG_FILE = 'pending_ops.jsonl'
+# Rewrite the log with only the pending ops once it grows past this
+COMPACT_BYTES = 64 * 1024
+# Identical adds submitted within this many seconds are the same action
+DEDUPE_SECONDS = 5
+
+
+def new_op(kind, **fields):
+    """Build an operation with a fresh id"""
+    return dict(fields, op_id=uuid.uuid4().hex, kind=kind, time=time.time())
+
+
+def default_log_path():
+    data_dir = get_data_dir()
+    ensure_directory_exists(data_dir)
+    return os.path.join(data_dir, OP_LOG_FILE)
+
+
+class OpLog:
+    """Append-only on-disk log of task mutations not yet applied
+
+    Each line is one record: ``{"op": {...}}`` queues an operation (or
+    replaces the queued one with the same op_id), ``{"sent": id}`` notes
+    that it may have reached the server and ``{"done": id}`` retires it.
+    Every record is flushed and fsynced before the call returns, so a
+    queued operation survives a crash or a power cut. A torn last line
+    from a crash mid-write is skipped on load.
+
+    Redundant operations are coalesced as they are appended: an identical
+    add within DEDUPE_SECONDS, or a second complete of the same task, is
+    dropped.
+
+    Bulk imports append a batch at a time with one fsync. Their ops stay
+    claimed by the import, and out of pending_ops(), until it retires them
+    or releases the ones it couldn't apply for replay.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_log_path()
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._claimed = set()
+        if os.path.exists(self.path):
+            self._load()
+            self._compact()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def pending_ops(self):
+        """Queued operations not claimed by an import, oldest first"""
+        with self._lock:
+            return [dict(op) for op_id, op in self._pending.items()
+                    if op_id not in self._claimed]
+
+    def append(self, op):
+        """Queue an operation; returns the op to apply, or None when coalesced"""
+        with self._lock:
+            if op['op_id'] in self._pending:
+                return None
+            target = self._coalesce(op)
+            if target is None:
+                return None
+            self._pending[target['op_id']] = target
+            self._write({'op': target})
+            return target
+
+    def append_batch(self, ops):
+        """Queue many operations with one write, claimed by the caller
+
+        Nothing is coalesced: an import adds every task it was given, even
+        identical ones.
+        """
+        with self._lock:
+            for op in ops:
+                self._pending[op['op_id']] = op
+                self._claimed.add(op['op_id'])
+            self._write(*({'op': op} for op in ops))
+
+    def release(self, op_ids):
+        """Hand claimed operations back for replay"""
+        with self._lock:
+            self._claimed.difference_update(op_ids)
+
+    def mark_sent(self, op_id):
+        with self._lock:
+            op = self._pending.get(op_id)
+            if op is not None and not op.get('sent'):
+                op['sent'] = True
+                self._write({'sent': op_id})
+
+    def mark_done(self, *op_ids):
+        with self._lock:
+            self._claimed.difference_update(op_ids)
+            done = [op_id for op_id in op_ids if self._pending.pop(op_id, None) is not None]
+            if not done:
+                return
+            self._write(*({'done': op_id} for op_id in done))
+            if not self._pending or os.path.getsize(self.path) > COMPACT_BYTES:
+                self._compact()
+
+    def _coalesce(self, op):
+        pending = list(self._pending.values())
+        if op['kind'] == 'add':
+            for other in pending:
+                if (other['kind'] == 'add' and other['body'] == op['body']
+                        and other.get('list_id') == op.get('list_id')
+                        and op['time'] - other['time'] < DEDUPE_SECONDS):
+                    return None
+            return op
+        if op['kind'] == 'complete':
+            for other in pending:
+                if other['kind'] == 'complete' and other['task_id'] == op['task_id']:
+                    return None
+        return op
+
+    def _write(self, *records):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'op' in record:
+                    self._pending[record['op']['op_id']] = record['op']
+                elif 'sent' in record and record['sent'] in self._pending:
+                    self._pending[record['sent']]['sent'] = True
+                elif 'done' in record:
+                    self._pending.pop(record['done'], None)
+
+    def _compact(self):
+        """Rewrite the log with just the pending ops, atomically"""
+        partial = self.path + '.part'
+        with open(partial, 'w', encoding='utf-8') as f:
+            for op in self._pending.values():
+                f.write(json.dumps({'op': op}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, self.path)
@@ -0,0 +1,57 @@
+"""Due dates as the Google Tasks page renders them
+
+The page labels dates relative to today ("Today", "Tomorrow") or without
+a year ("Tue, May 1") unless the date is in another year ("Mon, Jan 4,
+2027"). A year-less label is given the year that puts it closest to
+today, so "Jan 3" seen in late December is next January and "Dec 20" seen
+in early January is last December.
+"""
+import re
+from datetime import date, datetime, timedelta
+
+MONTHS = {name: number for number, names in enumerate((
+    ('jan', 'january'), ('feb', 'february'), ('mar', 'march'), ('apr', 'april'),
+    ('may',), ('jun', 'june'), ('jul', 'july'), ('aug', 'august'),
+    ('sep', 'sept', 'september'), ('oct', 'october'), ('nov', 'november'),
+    ('dec', 'december')), start=1) for name in names}
+RELATIVE_DAYS = {'yesterday': -1, 'today': 0, 'tomorrow': 1}
+# "Tue, May 1", "May 1, 2027", "1 May 2027"; the weekday is ignored
+LABEL_RE = re.compile(
+    r'^(?:[a-z]+,?\s+)??(?:(?P<month>[a-z]+)\.?\s+(?P<day>\d{1,2})'
+    r'|(?P<day2>\d{1,2})\s+(?P<month2>[a-z]+)\.?)(?:,?\s+(?P<year>\d{4}))?$')
+
+
+def page_due_date(label, today=None):
+    """The date a page due label stands for, or None when it isn't one"""
+    text = ' '.join(label.strip().lower().split())
+    today = today or date.today()
+    if text in RELATIVE_DAYS:
+        return today + timedelta(days=RELATIVE_DAYS[text])
+    match = LABEL_RE.match(text)
+    if not match:
+        return None
+    month = MONTHS.get(match.group('month') or match.group('month2'))
+    day = int(match.group('day') or match.group('day2'))
+    if month is None:
+        return None
+    if match.group('year'):
+        years = (int(match.group('year')),)
+    else:
+        years = (today.year - 1, today.year, today.year + 1)
+    candidates = []
+    for year in years:
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            pass  # Feb 29 outside a leap year, or no such day
+    if not candidates:
+        return None
+    return min(candidates, key=lambda day: abs(day - today))
+
+
+def page_due_ts(label, today=None):
+    """Local midnight of a page due label, or None"""
+    day = page_due_date(label, today)
+    if day is None:
+        return None
+    return datetime(day.year, day.month, day.day).timestamp()
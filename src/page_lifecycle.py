@@ -0,0 +1,99 @@
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+ACTIVE = QWebEnginePage.LifecycleState.Active
+FROZEN = QWebEnginePage.LifecycleState.Frozen
+DISCARDED = QWebEnginePage.LifecycleState.Discarded
+
+
+class PageLifecycleManager(QObject):
+    """Freeze and later discard the page while the window is hidden
+
+    A frozen page keeps its memory but stops running JavaScript, timers and
+    network traffic. A discarded page releases the renderer's memory and is
+    reloaded on restore. Scroll position and zoom are captured before
+    freezing and put back when the window is shown again.
+    """
+
+    def __init__(self, view, runtime, freeze_after=60, discard_after=1800, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.runtime = runtime
+        self.saved_scroll = None
+        self.saved_zoom = view.zoomFactor()
+
+        self._freeze_timer = QTimer(self)
+        self._freeze_timer.setSingleShot(True)
+        self._freeze_timer.timeout.connect(self.freeze)
+        self._discard_timer = QTimer(self)
+        self._discard_timer.setSingleShot(True)
+        self._discard_timer.timeout.connect(self.discard)
+        self.freeze_after = freeze_after
+        self.discard_after = discard_after
+
+    def window_hidden(self):
+        """Start counting down to freeze and discard"""
+        if self.freeze_after > 0:
+            self._freeze_timer.start(self.freeze_after * 1000)
+        if self.discard_after > 0:
+            self._discard_timer.start(self.discard_after * 1000)
+
+    def window_shown(self):
+        """Cancel pending transitions and bring the page back"""
+        self._freeze_timer.stop()
+        self._discard_timer.stop()
+        self.restore()
+
+    def wake(self):
+        """Reactivate the page for work while the window stays hidden
+
+        It freezes (and later is discarded) again on the usual schedule.
+        """
+        self.restore()
+        if not self.view.isVisible():
+            self.window_hidden()
+
+    def state(self):
+        return self.view.page().lifecycleState()
+
+    def freeze(self):
+        """Save the view state, then freeze the page"""
+        page = self.view.page()
+        if page.lifecycleState() != ACTIVE:
+            return
+        self.saved_zoom = self.view.zoomFactor()
+        self.runtime.call('saveScroll', callback=self._on_scroll_saved)
+
+    def _on_scroll_saved(self, state):
+        self.saved_scroll = state
+        page = self.view.page()
+        # The window may have been reopened while the script ran
+        if not self.view.isVisible() and page.lifecycleState() == ACTIVE:
+            page.setLifecycleState(FROZEN)
+
+    def discard(self):
+        """Release the page's memory, it reloads on restore"""
+        page = self.view.page()
+        if page.lifecycleState() == DISCARDED:
+            return
+        if page.lifecycleState() == ACTIVE:
+            self.saved_zoom = self.view.zoomFactor()
+        page.setLifecycleState(DISCARDED)
+
+    def restore(self):
+        """Reactivate a frozen or discarded page"""
+        page = self.view.page()
+        state = page.lifecycleState()
+        if state == ACTIVE:
+            return
+        if state == DISCARDED:
+            # The page reloads, put the scroll position back once it has
+            self.view.loadFinished.connect(self._on_reloaded)
+        page.setLifecycleState(ACTIVE)
+        self.view.setZoomFactor(self.saved_zoom)
+
+    def _on_reloaded(self, ok):
+        self.view.loadFinished.disconnect(self._on_reloaded)
+        self.view.setZoomFactor(self.saved_zoom)
+        if ok and self.saved_scroll:
+            self.runtime.call('restoreScroll', self.saved_scroll)
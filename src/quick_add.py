@@ -0,0 +1,67 @@
+from PyQt5.QtCore import QEvent, Qt, pyqtSignal
+from PyQt5.QtGui import QCursor
+from PyQt5.QtWidgets import QApplication, QFrame, QLabel, QLineEdit, QVBoxLayout
+from src.importer import parse_task_line
+
+
+class QuickAddPopup(QFrame):
+    """Frameless one-line task entry that is built once and only shown
+
+    The widget, its native window and its style are created up front, so
+    popping it up is a move and a show. Submissions are emitted and the
+    popup hides straight away; writing the task is someone else's job.
+    """
+
+    submitted = pyqtSignal(str, str)
+
+    def __init__(self):
+        super().__init__(None, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setFixedWidth(480)
+
+        self.input = QLineEdit(self)
+        self.input.setPlaceholderText("Add a task (end with YYYY-MM-DD to set a due date)")
+        self.input.returnPressed.connect(self.submit)
+        hint = QLabel("Enter to add, Esc to close", self)
+        hint.setEnabled(False)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(8, 8, 8, 6)
+        layout.addWidget(self.input)
+        layout.addWidget(hint)
+        self.setLayout(layout)
+
+        # Prewarm: polish, lay out and create the native window now
+        self.ensurePolished()
+        self.adjustSize()
+        self.winId()
+
+    def popup(self):
+        """Show on the screen under the mouse, ready to type"""
+        screen = QApplication.screenAt(QCursor.pos()) or QApplication.primaryScreen()
+        area = screen.availableGeometry()
+        self.move(area.center().x() - self.width() // 2, area.top() + area.height() // 4)
+        self.input.clear()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.input.setFocus()
+
+    def submit(self):
+        title, due = parse_task_line(self.input.text())
+        self.hide()
+        if title:
+            self.submitted.emit(title, due)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.hide()
+            return
+        super().keyPressEvent(event)
+
+    def changeEvent(self, event):
+        # Clicking elsewhere dismisses the popup
+        if event.type() == QEvent.ActivationChange and self.isVisible() and not self.isActiveWindow():
+            self.hide()
+        super().changeEvent(event)
+
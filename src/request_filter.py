@@ -0,0 +1,104 @@
+import fnmatch
+import re
+from collections import Counter
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor
+from src.metrics import metrics
+
+RESOURCE_TYPES = {
+    'stylesheet': QWebEngineUrlRequestInfo.ResourceTypeStylesheet,
+    'script': QWebEngineUrlRequestInfo.ResourceTypeScript,
+    'image': QWebEngineUrlRequestInfo.ResourceTypeImage,
+    'font': QWebEngineUrlRequestInfo.ResourceTypeFontResource,
+    'subframe': QWebEngineUrlRequestInfo.ResourceTypeSubFrame,
+    'media': QWebEngineUrlRequestInfo.ResourceTypeMedia,
+    'favicon': QWebEngineUrlRequestInfo.ResourceTypeFavicon,
+    'xhr': QWebEngineUrlRequestInfo.ResourceTypeXhr,
+    # Also covers navigator.sendBeacon
+    'ping': QWebEngineUrlRequestInfo.ResourceTypePing,
+}
+TYPE_NAMES = {value: name for name, value in RESOURCE_TYPES.items()}
+
+
+class RuleSet:
+    """Request rules compiled into an index
+
+    A rule is one of:
+
+    - ``type:<name>`` matches a resource type, e.g. ``type:font``
+    - a bare host, optionally ``*.``-prefixed, e.g. ``doubleclick.net``,
+      matches that host and its subdomains
+    - anything else is a glob over ``host/path?query``, e.g. ``*/gen_204*``
+
+    Host rules are looked up by walking the request host's parent domains,
+    types are a set lookup and all globs share one compiled regex.
+    """
+
+    def __init__(self, rules):
+        self.hosts = set()
+        self.types = set()
+        globs = []
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule:
+                continue
+            if rule.startswith('type:'):
+                # Unknown type names are ignored rather than blocking everything
+                if rule[5:] in RESOURCE_TYPES:
+                    self.types.add(RESOURCE_TYPES[rule[5:]])
+            elif '/' not in rule and '*' not in rule.lstrip('*.') and '?' not in rule:
+                self.hosts.add(rule.lstrip('*.'))
+            else:
+                globs.append(fnmatch.translate(rule))
+        self.pattern = re.compile('|'.join(globs)) if globs else None
+
+    def __bool__(self):
+        return bool(self.hosts or self.types or self.pattern)
+
+    def matches(self, host, target, resource_type):
+        if resource_type in self.types:
+            return True
+        if self.hosts:
+            domain = host
+            while domain:
+                if domain in self.hosts:
+                    return True
+                domain = domain.partition('.')[2]
+        return self.pattern is not None and self.pattern.match(target) is not None
+
+
+class RequestFilter(QWebEngineUrlRequestInterceptor):
+    """Block requests matching the deny rules unless an allow rule matches
+
+    Top-level navigations are never blocked. Blocked requests are counted
+    per session and by resource type. Their size can't be counted because
+    nothing is downloaded; the web.bytes_transferred counter shows what
+    the page actually fetched.
+    """
+
+    def __init__(self, block_rules, allow_rules=(), parent=None):
+        super().__init__(parent)
+        self.block = RuleSet(block_rules)
+        self.allow = RuleSet(allow_rules)
+        self.seen = 0
+        self.blocked = Counter()
+
+    def interceptRequest(self, info):
+        self.seen += 1
+        resource_type = info.resourceType()
+        if resource_type == QWebEngineUrlRequestInfo.ResourceTypeMainFrame or not self.block:
+            return
+        url = info.requestUrl()
+        host = url.host().lower()
+        target = host + url.path().lower()
+        if url.hasQuery():
+            target += '?' + url.query().lower()
+        if (self.block.matches(host, target, resource_type)
+                and not self.allow.matches(host, target, resource_type)):
+            info.block(True)
+            type_name = TYPE_NAMES.get(resource_type, 'other')
+            self.blocked[type_name] += 1
+            metrics.increment('web.blocked_requests')
+            metrics.increment(f"web.blocked_requests.{type_name}")
+
+    def blocked_count(self):
+        return sum(self.blocked.values())
@@ -0,0 +1,94 @@
+import heapq
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+# Longest single sleep. Re-checking at least hourly keeps the schedule right
+# across wall-clock changes and suspend/resume.
+MAX_SLEEP_MS = 60 * 60 * 1000
+
+
+class DueScheduler(QObject):
+    """Fire a signal when pending tasks reach their due time
+
+    Pending due times live in a min-heap and a single single-shot timer is
+    armed for the earliest one, so nothing wakes up while nothing is due.
+    Entries are invalidated lazily: a heap entry only counts if the task is
+    still pending with the same due time.
+    """
+
+    # List of task dicts whose due time has passed
+    tasks_due = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._heap = []
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._fire)
+
+    def set_tasks(self, tasks):
+        """Replace the whole schedule"""
+        self._pending = {}
+        self._heap = []
+        for task in tasks:
+            if self._schedulable(task):
+                self._pending[task['id']] = task
+                self._heap.append((task['due_ts'], task['id']))
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def update(self, upserted, removed):
+        """Apply incremental task changes"""
+        for task_id in removed:
+            self._pending.pop(task_id, None)
+        for task in upserted:
+            if self._schedulable(task):
+                previous = self._pending.get(task['id'])
+                self._pending[task['id']] = task
+                if previous is None or previous['due_ts'] != task['due_ts']:
+                    heapq.heappush(self._heap, (task['due_ts'], task['id']))
+            else:
+                self._pending.pop(task['id'], None)
+        self._arm()
+
+    def next_due(self):
+        """Return the epoch time of the next due task, or None"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    @staticmethod
+    def _schedulable(task):
+        return not task.get('completed') and task.get('due_ts') is not None
+
+    def _is_current(self, entry):
+        task = self._pending.get(entry[1])
+        return task is not None and task['due_ts'] == entry[0]
+
+    def _drop_stale(self):
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        # Stale entries piling up behind the head are compacted occasionally
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [e for e in self._heap if self._is_current(e)]
+            heapq.heapify(self._heap)
+
+    def _arm(self):
+        due_ts = self.next_due()
+        if due_ts is None:
+            self._timer.stop()
+            return
+        delay_ms = int(max(0.0, due_ts - time.time()) * 1000)
+        self._timer.start(min(delay_ms, MAX_SLEEP_MS))
+
+    def _fire(self):
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_current(entry):
+                due.append(self._pending.pop(entry[1]))
+        self._arm()
+        if due:
+            self.tasks_due.emit(due)
@@ -0,0 +1,300 @@
+import bisect
+import heapq
+import re
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+NONZERO_BYTE_RE = re.compile(rb"[^\x00]")
+# Sort key for tasks without a due date: after every dated task
+NO_DUE = float('inf')
+# Candidate sets larger than 1/SCAN_RATIO of all tasks are not ranked in
+# full; the ranked list is walked instead and stops at ``limit`` hits
+SCAN_RATIO = 32
+# Terms in at least this many tasks also keep a bitset of task slots, so
+# tokens matching common words are ANDed a machine word at a time
+BITSET_MIN = 1024
+# A token matching more common terms than this isn't ORed into one bitset
+BITSET_MAX_TERMS = 16
+# Set bit positions of every byte value
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+
+def trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    """Incremental inverted index over task titles, notes and due dates
+
+    Terms map to the ids of the tasks containing them. Query tokens match
+    terms by prefix, through a sorted vocabulary, and tokens of three or
+    more characters also match inside terms through a trigram index over
+    the vocabulary. Every query token has to match (AND).
+
+    Results are ranked pending first, then by due date. Every task gets a
+    slot number, handed out in rank order by reset(), and common terms keep
+    a bitset of the slots of their tasks. A query made of common words is
+    then a few big-integer ANDs, and its best hits are the lowest set bits,
+    plus any matching tasks added since reset(). Rarer tokens are
+    intersected smallest first; large candidate sets are not ranked in full
+    but found by walking a pre-ranked list of all tasks.
+    """
+
+    def __init__(self):
+        self._docs = {}
+        self._postings = {}
+        self._bitsets = {}
+        self._vocabulary = []
+        self._trigrams = {}
+        self._ranked = []
+        self._slots = []
+        self._free_slots = []
+        # Slots from reset() below this are in rank order, except the ones
+        # in _unordered_slots, handed out again since
+        self._ordered_end = 0
+        self._unordered_slots = set()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def reset(self, tasks):
+        """Rebuild from scratch, handing out slots in rank order"""
+        ranked = sorted((self._rank(task), task['id'], task) for task in tasks)
+        docs = self._docs = {}
+        postings_map = self._postings = {}
+        slots = self._slots = []
+        for rank, task_id, task in ranked:
+            terms = self._terms(task)
+            docs[task_id] = (terms, rank, task, len(slots))
+            slots.append(task_id)
+            for term in terms:
+                postings = postings_map.get(term)
+                if postings is None:
+                    postings = postings_map[term] = set()
+                postings.add(task_id)
+        self._vocabulary = sorted(postings_map)
+        self._trigrams = {}
+        for term in self._vocabulary:
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+        self._ranked = [(rank, task_id) for rank, task_id, _ in ranked]
+        self._free_slots = []
+        self._ordered_end = len(slots)
+        self._unordered_slots = set()
+        self._bitsets = {term: self._build_bitset(postings)
+                         for term, postings in postings_map.items()
+                         if len(postings) >= BITSET_MIN}
+
+    def update(self, upserted, removed):
+        for task_id in removed:
+            self.remove(task_id)
+        for task in upserted:
+            self.add(task)
+
+    def add(self, task):
+        if task['id'] in self._docs:
+            self.remove(task['id'])
+        bisect.insort(self._ranked, (self._index(task), task['id']))
+
+    def _index(self, task):
+        task_id = task['id']
+        terms = self._terms(task)
+        rank = self._rank(task)
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slots[slot] = task_id
+        else:
+            slot = len(self._slots)
+            self._slots.append(task_id)
+        self._unordered_slots.add(slot)
+        self._docs[task_id] = (terms, rank, task, slot)
+        bit = 1 << slot
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                bisect.insort(self._vocabulary, term)
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            postings.add(task_id)
+            bits = self._bitsets.get(term)
+            if bits is not None:
+                self._bitsets[term] = bits | bit
+            elif len(postings) == BITSET_MIN:
+                # Became common since reset()
+                self._bitsets[term] = self._build_bitset(postings)
+        return rank
+
+    @staticmethod
+    def _terms(task):
+        return set(tokenize(f"{task.get('title', '')} {task.get('notes', '')} "
+                            f"{task.get('due', '')}"))
+
+    @staticmethod
+    def _rank(task):
+        due_ts = task.get('due_ts')
+        return (bool(task.get('completed')), NO_DUE if due_ts is None else due_ts,
+                task.get('title', '').casefold())
+
+    def remove(self, task_id):
+        doc = self._docs.pop(task_id, None)
+        if doc is None:
+            return
+        terms, rank, _, slot = doc
+        del self._ranked[bisect.bisect_left(self._ranked, (rank, task_id))]
+        self._slots[slot] = None
+        self._free_slots.append(slot)
+        self._unordered_slots.discard(slot)
+        mask = ~(1 << slot)
+        for term in terms:
+            postings = self._postings[term]
+            postings.discard(task_id)
+            bits = self._bitsets.get(term)
+            if bits is not None:
+                if len(postings) < BITSET_MIN // 2:
+                    del self._bitsets[term]
+                else:
+                    self._bitsets[term] = bits & mask
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+                for gram in trigrams(term):
+                    gram_terms = self._trigrams[gram]
+                    gram_terms.discard(term)
+                    if not gram_terms:
+                        del self._trigrams[gram]
+
+    def _build_bitset(self, postings):
+        data = bytearray((len(self._slots) + 7) // 8)
+        docs = self._docs
+        for task_id in postings:
+            slot = docs[task_id][3]
+            data[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(data, 'little')
+
+    def _matching_terms(self, token):
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + '\U0010ffff')
+        terms = set(self._vocabulary[start:end])
+        if len(token) >= 3:
+            grams = sorted((self._trigrams.get(gram, ()) for gram in trigrams(token)), key=len)
+            if grams and grams[0]:
+                candidates = set(grams[0]).intersection(*grams[1:])
+                terms.update(term for term in candidates if token in term)
+        return terms
+
+    def search(self, query, limit=50):
+        """Return up to ``limit`` task dicts matching every query token"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        docs = self._docs
+        scan_size = len(docs) // SCAN_RATIO
+        mask = None
+        exact, broad = [], []
+        for token in set(tokens):
+            terms = self._matching_terms(token)
+            if not terms:
+                return []
+            if len(terms) <= BITSET_MAX_TERMS and all(term in self._bitsets for term in terms):
+                bits = 0
+                for term in terms:
+                    bits |= self._bitsets[term]
+                mask = bits if mask is None else mask & bits
+                if not mask:
+                    return []
+                continue
+            if len(terms) == 1:
+                # The posting set itself, nothing to build
+                exact.append(self._postings[next(iter(terms))])
+                continue
+            postings = []
+            size = 0
+            for term in terms:
+                postings.append(self._postings[term])
+                size += len(postings[-1])
+                if size > scan_size:
+                    # Too costly to union; checked per candidate instead
+                    broad.append(terms)
+                    break
+            else:
+                exact.append(set().union(*postings))
+
+        def accept(task_id):
+            doc_terms = docs[task_id][0]
+            return all(not doc_terms.isdisjoint(terms) for terms in broad)
+
+        if mask is not None:
+            mask_bytes = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+            if not exact:
+                return self._best_in_mask(mask_bytes, accept, limit)
+
+            def accept_masked(task_id):
+                slot = docs[task_id][3]
+                byte = slot >> 3
+                return (byte < len(mask_bytes) and mask_bytes[byte] >> (slot & 7) & 1
+                        and accept(task_id))
+        else:
+            accept_masked = accept
+
+        if not exact:
+            return self._first_ranked(accept, limit)
+
+        # Smallest first: each intersection only walks the smaller operand,
+        # so the candidate set shrinks as fast as it can
+        exact.sort(key=len)
+        result = exact[0]
+        for postings in exact[1:]:
+            result = result & postings
+            if not result:
+                return []
+        if len(result) > scan_size:
+            return self._first_ranked(
+                lambda task_id: task_id in result and accept_masked(task_id), limit)
+        if mask is not None or broad:
+            result = [task_id for task_id in result if accept_masked(task_id)]
+        return self._best(result, limit)
+
+    def _best(self, task_ids, limit):
+        docs = self._docs
+        best = heapq.nsmallest(limit, ((docs[task_id][1], task_id) for task_id in task_ids))
+        return [docs[task_id][2] for _, task_id in best]
+
+    def _best_in_mask(self, mask_bytes, accept, limit):
+        """Best ``limit`` accepted tasks among the set bits of a slot mask
+
+        Ordered slots are visited lowest first and stop at ``limit`` hits;
+        slots handed out since reset() are checked one by one.
+        """
+        slots = self._slots
+        ordered_end = self._ordered_end
+        unordered = self._unordered_slots
+        found = []
+        for match in NONZERO_BYTE_RE.finditer(mask_bytes):
+            base = match.start() * 8
+            if base >= ordered_end or len(found) >= limit:
+                break
+            for bit in BYTE_BITS[mask_bytes[match.start()]]:
+                slot = base + bit
+                if slot < ordered_end and slot not in unordered and accept(slots[slot]):
+                    found.append(slots[slot])
+        for slot in unordered:
+            byte = slot >> 3
+            if (byte < len(mask_bytes) and mask_bytes[byte] >> (slot & 7) & 1
+                    and accept(slots[slot])):
+                found.append(slots[slot])
+        return self._best(found, limit)
+
+    def _first_ranked(self, accept, limit):
+        found = []
+        docs = self._docs
+        for _, task_id in self._ranked:
+            if accept(task_id):
+                found.append(docs[task_id][2])
+                if len(found) >= limit:
+                    break
+        return found
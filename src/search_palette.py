@@ -0,0 +1,82 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QBrush
+from PyQt5.QtWidgets import (QApplication, QFrame, QLineEdit, QListWidget, QListWidgetItem,
+                             QVBoxLayout)
+from src.metrics import timed
+from src.task_model import COMPLETED_COLOR
+
+MAX_RESULTS = 50
+
+
+class SearchPalette(QFrame):
+    """Ctrl+K popup that searches tasks as you type
+
+    Queries run against the in-process SearchIndex, so every keystroke is
+    answered without touching the page or the database.
+    """
+
+    def __init__(self, index, main_window):
+        super().__init__(main_window, Qt.Popup | Qt.FramelessWindowHint)
+        self.index = index
+        self.main_window = main_window
+        self.setFrameShape(QFrame.StyledPanel)
+        self.resize(520, 360)
+
+        self.query = QLineEdit(self)
+        self.query.setPlaceholderText("Search tasks")
+        self.query.textChanged.connect(self.run_query)
+        self.query.returnPressed.connect(self.open_current)
+
+        self.results = QListWidget(self)
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.open_item)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.addWidget(self.query)
+        layout.addWidget(self.results)
+        self.setLayout(layout)
+
+    def open(self):
+        """Center over the main window (or the screen) and focus the query"""
+        if self.main_window.isVisible():
+            area = self.main_window.frameGeometry()
+        else:
+            area = QApplication.primaryScreen().availableGeometry()
+        self.move(area.center().x() - self.width() // 2, area.top() + area.height() // 5)
+        self.query.selectAll()
+        self.run_query(self.query.text())
+        self.show()
+        self.query.setFocus()
+
+    def run_query(self, text):
+        self.results.clear()
+        with timed('search.query'):
+            found = self.index.search(text, MAX_RESULTS)
+        for task in found:
+            label = f"{task['title']}  ({task['due']})" if task.get('due') else task['title']
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, task['id'])
+            if task.get('completed'):
+                item.setForeground(QBrush(COMPLETED_COLOR))
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def keyPressEvent(self, event):
+        # Arrow keys move through the results while the query keeps focus
+        if event.key() in (Qt.Key_Up, Qt.Key_Down) and self.results.count():
+            step = -1 if event.key() == Qt.Key_Up else 1
+            row = (self.results.currentRow() + step) % self.results.count()
+            self.results.setCurrentRow(row)
+            return
+        super().keyPressEvent(event)
+
+    def open_current(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.open_item(item)
+
+    def open_item(self, item):
+        self.hide()
+        self.main_window.reveal_task(item.data(Qt.UserRole))
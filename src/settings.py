@@ -6,7 +6,30 @@ def load_settings():
         'theme': 'light',
         'notifications': True,
         'sound': True,
-        'start_minimized': False
+        'notification_min_interval_seconds': 30,
+        'start_minimized': False,
+        'prewarm_web_view': True,
+        'prewarm_delay_seconds': 120,
+        'prewarm_idle_seconds': 60,
+        'freeze_hidden_after_seconds': 60,
+        'discard_hidden_after_seconds': 1800,
+        'api_token_file': '',
+        'api_base_url': 'https://tasks.googleapis.com/tasks/v1',
+        'sync_interval_minutes': 15,
+        'web_cache_size_mb': 200,
+        'preload_app_shell': False,
+        'preload_app_shell_delay_seconds': 10,
+        'quick_add_hotkey': 'ctrl+shift+space',
+        'request_filter_enabled': True,
+        'request_block_rules': [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'play.google.com/log*', '*/gen_204*', '*/jserror*'
+        ],
+        'request_allow_rules': [],
+        'metrics_enabled': False,
+        'metrics_dump_minutes': 10,
+        'ics_feed_path': '',
+        'ics_feed_format': 'ics'
     }
     
     config_dir = os.path.join('config')
@@ -5,11 +5,7 @@ def setup_shortcuts(window):
     # New Task (Ctrl+N)
     new_task = QAction(window)
     new_task.setShortcut(QKeySequence("Ctrl+N"))
-    new_task.triggered.connect(
-        lambda: window.browser.page().runJavaScript("""
-            document.querySelector('div[role="button"]').click();
-        """)
-    )
+    new_task.triggered.connect(lambda: window.page_call('clickNewTask'))
     window.addAction(new_task)
     
     # Refresh (F5)
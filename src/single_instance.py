@@ -0,0 +1,106 @@
+"""Single-instance support
+
+The first GUI instance listens on a per-user local socket. Later launches
+send their command there as one JSON line and exit instead of starting a
+second QApplication and Chromium. Only QtCore and QtNetwork are needed to
+forward, so a second launch returns quickly.
+"""
+import getpass
+import json
+import sys
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+from src import cli
+
+CONNECT_TIMEOUT_MS = 200
+ACK_TIMEOUT_MS = 2000
+
+
+def server_name():
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = 'default'
+    return f"google-tasks-{user}"
+
+
+def command_message(args):
+    """Message for the running instance to handle these arguments, or None
+
+    Starting without a command (or with ``show``) raises the window, ``add``
+    adds the task in the running app, and ``export`` without ``--out``
+    opens its export dialog. Anything else runs in this process.
+    """
+    args = [arg for arg in args if arg != '--startup-profile']
+    if not args or args[0] == 'show':
+        return {'command': 'show'}
+    if args[0] == 'add':
+        parsed = cli.build_parser().parse_args(args)
+        return {'command': 'add', 'title': parsed.title, 'due': parsed.due or '',
+                'notes': parsed.notes, 'list_id': parsed.list_id}
+    if args[0] == 'export':
+        parsed = cli.build_parser().parse_args(args)
+        if parsed.out is None:
+            return {'command': 'export', 'format': parsed.format}
+    return None
+
+
+def forward(message):
+    """Send a message to the running instance; False when there is none"""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.write((json.dumps(message) + '\n').encode('utf-8'))
+    socket.waitForBytesWritten(ACK_TIMEOUT_MS)
+    # An instance that accepts but never answers is still running; starting
+    # another one would only take its socket away
+    if not (socket.waitForReadyRead(ACK_TIMEOUT_MS) and socket.readLine().data().startswith(b'ok')):
+        print("The running Google Tasks instance did not respond", file=sys.stderr)
+    socket.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QObject):
+    """Receive commands forwarded by later launches"""
+
+    command_received = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """Start listening, replacing a socket left behind by a crash"""
+        name = server_name()
+        if self.server.listen(name):
+            return True
+        if self.server.serverError() != QAbstractSocket.AddressInUseError:
+            return False
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            # Another instance started in the meantime
+            probe.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(name)
+        return self.server.listen(name)
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _read(self, socket):
+        while socket.canReadLine():
+            try:
+                message = json.loads(socket.readLine().data().decode('utf-8'))
+            except ValueError:
+                continue
+            socket.write(b'ok\n')
+            socket.flush()
+            if isinstance(message, dict):
+                self.command_received.emit(message)
@@ -0,0 +1,34 @@
+import sys
+import time
+
+
+class StartupProfile:
+    """Collect phase-by-phase startup timings
+
+    Each ``mark`` records the time since the previous mark. Marks are cheap
+    and always recorded, the report is only printed when enabled.
+    """
+
+    def __init__(self, enabled=False, started=None):
+        self.enabled = enabled
+        self.started = started if started is not None else time.perf_counter()
+        self._last = self.started
+        self.phases = []
+        self._reported = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - self.started))
+        self._last = now
+
+    def report(self, stream=None):
+        """Print the timing table once"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        stream = stream or sys.stderr
+        print("Startup profile", file=stream)
+        print(f"  {'phase':<22}{'step ms':>10}{'total ms':>10}", file=stream)
+        for phase, step, total in self.phases:
+            print(f"  {phase:<22}{step * 1000:>10.1f}{total * 1000:>10.1f}", file=stream)
+        stream.flush()
@@ -0,0 +1,135 @@
+import json
+import os
+import re
+from functools import lru_cache
+from src.metrics import metrics
+
+STYLES_DIR = os.path.join("assets", "styles")
+SCRIPT_NAME = "gt-stylesheets"
+
+# Creates or updates one <style id="gt-style-<layer>"> node per layer. At
+# DocumentCreation there is no <html> element yet, so it waits for one.
+APPLY_STYLES_JS = """
+(function (layers) {
+    function apply() {
+        const parent = document.head || document.documentElement;
+        Object.keys(layers).forEach(name => {
+            const id = 'gt-style-' + name;
+            let node = document.getElementById(id);
+            if (!node) {
+                node = document.createElement('style');
+                node.id = id;
+                parent.appendChild(node);
+            }
+            if (node.textContent !== layers[name]) node.textContent = layers[name];
+        });
+    }
+    if (document.documentElement) {
+        apply();
+    } else {
+        new MutationObserver((records, observer) => {
+            if (document.documentElement) {
+                observer.disconnect();
+                apply();
+            }
+        }).observe(document, { childList: true });
+    }
+})(%s);
+"""
+
+
+# Quoted strings (kept as they are) and comments (dropped)
+CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+# Whitespace before ':' is kept: "a :hover" and "a:hover" select different things
+CSS_SPACE_RE = re.compile(r'\s*([{};,>])\s*|:\s+')
+
+
+def _squeeze_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = CSS_SPACE_RE.sub(lambda m: m.group(1) or ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace, leaving quoted strings alone"""
+    parts = []
+    code = ''
+    position = 0
+    for match in CSS_TOKEN_RE.finditer(css):
+        code += css[position:match.start()]
+        position = match.end()
+        if match.group().startswith('/*'):
+            continue
+        parts.append(_squeeze_css(code))
+        parts.append(match.group())
+        code = ''
+    parts.append(_squeeze_css(code + css[position:]))
+    return ''.join(parts).strip()
+
+
+@lru_cache(maxsize=None)
+def load_stylesheet(name):
+    """Read assets/styles/<name>.css once, empty when missing
+
+    Themes are minified. custom.css is the user's own and is used as
+    written.
+    """
+    try:
+        with open(os.path.join(STYLES_DIR, f"{name}.css"), 'r', encoding='utf-8') as f:
+            css = f.read()
+    except OSError:
+        return ''
+    return css if name == 'custom' else minify_css(css)
+
+
+def available_themes():
+    """Return theme names found in the styles directory"""
+    try:
+        return sorted(os.path.splitext(entry)[0] for entry in os.listdir(STYLES_DIR)
+                      if entry.endswith('.css') and entry != 'custom.css')
+    except OSError:
+        return []
+
+
+class StyleSheetManager:
+    """Keep one style node per layer (theme, font, custom) in the page
+
+    The layers are registered as a QWebEngineScript at DocumentCreation, so
+    every load and reload is styled before first paint. Changes are also
+    applied in place to the current document, replacing the text of the
+    existing node instead of stacking new ones.
+    """
+
+    LAYERS = ('theme', 'font', 'custom')
+
+    def __init__(self, page):
+        self.page = page
+        self.layers = dict.fromkeys(self.LAYERS, '')
+
+    def set_layers(self, **layers):
+        """Update any number of layers with one restyle"""
+        changed = {name: css for name, css in layers.items()
+                   if self.layers.get(name) != css}
+        if not changed:
+            return
+        from PyQt5.QtWebEngineWidgets import QWebEngineScript
+        started = metrics.start()
+        self.layers.update(changed)
+        self._register_script()
+        self.page.runJavaScript(APPLY_STYLES_JS % json.dumps(changed),
+                                QWebEngineScript.ApplicationWorld,
+                                lambda result: metrics.record_since('css.inject', started))
+
+    def _register_script(self):
+        from PyQt5.QtWebEngineWidgets import QWebEngineScript
+        scripts = self.page.scripts()
+        for script in scripts.findScripts(SCRIPT_NAME):
+            scripts.remove(script)
+
+        script = QWebEngineScript()
+        script.setName(SCRIPT_NAME)
+        script.setSourceCode(APPLY_STYLES_JS % json.dumps(self.layers))
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
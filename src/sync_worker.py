@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from src.metrics import timed
+from src.tasks_api import (RETRY_STATUSES, AuthError, TasksApiClient, TasksApiError,
+                           find_created_task, sync, task_from_api)
+
+
+class SyncSignals(QObject):
+    finished = pyqtSignal(object)  # SyncChanges
+    failed = pyqtSignal(str)
+
+
+class SyncJob(QRunnable):
+    """Run an incremental API sync on a pool thread"""
+
+    def __init__(self, store, credentials, base_url):
+        super().__init__()
+        self.store = store
+        self.client = TasksApiClient(credentials, base_url)
+        self.signals = SyncSignals()
+
+    def run(self):
+        try:
+            with timed('api.sync'):
+                changes = sync(self.client, self.store)
+        except (TasksApiError, OSError, ValueError) as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(changes)
+
+
+class ApplyOpSignals(QObject):
+    finished = pyqtSignal(dict, dict)  # op, task
+    failed = pyqtSignal(dict, str, bool)  # op, error, worth retrying
+    auth_needed = pyqtSignal(dict, str)  # op, error
+
+
+class ApplyOpJob(QRunnable):
+    """Apply one logged task mutation through the API on a pool thread
+
+    An add that may already have reached the server (its response was
+    lost) is looked up before it is sent again, so replaying it is safe.
+    Completing is idempotent by nature.
+    """
+
+    def __init__(self, store, credentials, base_url, op):
+        super().__init__()
+        self.store = store
+        self.client = TasksApiClient(credentials, base_url)
+        self.op = op
+        self.list_id = op.get('list_id') or '@default'
+        self.signals = ApplyOpSignals()
+
+    def run(self):
+        try:
+            item = self._apply()
+        except AuthError as e:
+            # Stays queued, but only signing in again will get it through
+            self.signals.auth_needed.emit(self.op, str(e))
+            return
+        except TasksApiError as e:
+            self.signals.failed.emit(self.op, str(e), e.status in RETRY_STATUSES
+                                     or e.status == 408)
+            return
+        except OSError as e:
+            # Offline, DNS failure, timeout
+            self.signals.failed.emit(self.op, str(e), True)
+            return
+        except ValueError as e:
+            self.signals.failed.emit(self.op, str(e), False)
+            return
+        task = task_from_api(item, self.list_id)
+        if self.store.preferred_source() == 'api':
+            self.store.upsert_tasks([task], source='api', list_id=self.list_id)
+        self.signals.finished.emit(self.op, task)
+
+    def _apply(self):
+        op = self.op
+        if op['kind'] == 'complete':
+            return self.client.patch_task(self.list_id, op['task_id'], {'status': 'completed'})
+        if op.get('sent'):
+            item = find_created_task(self.client, self.list_id, op['body'], op['time'] - 60)
+            if item is not None:
+                return item
+        return self.client.insert_task(self.list_id, op['body'])
@@ -0,0 +1,230 @@
+import json
+from PyQt5.QtCore import QObject, QFile, QIODevice, pyqtSignal, pyqtSlot
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.page_dates import page_due_ts
+
+# Shared by the observer and the page runtime (src.js_runtime). A task's id
+# is the page's own id when it has one, otherwise a hash of its title and
+# due date, so the same task keeps its id across reloads. Identical tasks
+# are told apart by a suffix in document order. The id is kept on the
+# element as data-gt-id for lookups.
+TASK_ID_JS = """
+(function () {
+    if (window.__gtTaskId) return;
+    const owners = new Map();
+
+    function hash(text) {
+        let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (let i = 0; i < text.length; i++) {
+            const c = text.charCodeAt(i);
+            h1 = Math.imul(h1 ^ c, 2654435761);
+            h2 = Math.imul(h2 ^ c, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(36);
+    }
+
+    function taken(id, item) {
+        const owner = owners.get(id);
+        return owner && owner !== item && owner.isConnected;
+    }
+
+    window.__gtTaskId = function (item) {
+        if (item.dataset.gtId) return item.dataset.gtId;
+        let id = item.dataset.id || item.dataset.taskId || '';
+        if (!id) {
+            const titleElem = item.querySelector('[aria-label="Task title"]');
+            const dateElem = item.querySelector('[aria-label="Due date"]');
+            const base = 'page-' + hash((titleElem ? titleElem.textContent : '') + '\n' +
+                                        (dateElem ? dateElem.textContent : ''));
+            id = base;
+            for (let n = 2; taken(id, item); n++) id = base + '-' + n;
+        }
+        owners.set(id, item);
+        item.dataset.gtId = id;
+        return id;
+    };
+})();
+"""
+
+# Installed once per document. Watches the task list with a MutationObserver
+# and pushes only added, changed and removed tasks to Python.
+OBSERVER_JS = """
+(function () {
+    if (window.__gtObserverInstalled) return;
+    window.__gtObserverInstalled = true;
+
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        const bridge = channel.objects.taskBridge;
+        const ITEM = '[role="listitem"]';
+        const known = new Map();
+        const dirty = new Set();
+        let scheduled = false;
+
+        function snapshot(item) {
+            const titleElem = item.querySelector('[aria-label="Task title"]');
+            if (!titleElem) return null;
+            const dateElem = item.querySelector('[aria-label="Due date"]');
+            const checkbox = item.querySelector('input[type="checkbox"]');
+            // due_ts is worked out in Python: Date.parse reads a year-less
+            // "Tue, May 1" as 2001
+            return {
+                id: window.__gtTaskId(item),
+                title: titleElem.textContent,
+                due: dateElem ? dateElem.textContent : '',
+                completed: !!(checkbox && checkbox.checked)
+            };
+        }
+
+        function flush() {
+            scheduled = false;
+            const upserted = [];
+            const removed = [];
+            dirty.forEach(item => {
+                const id = item.dataset.gtId;
+                const task = item.isConnected ? snapshot(item) : null;
+                if (task) {
+                    const key = JSON.stringify(task);
+                    if (known.get(task.id) !== key) {
+                        known.set(task.id, key);
+                        upserted.push(task);
+                    }
+                } else if (id && known.has(id)) {
+                    known.delete(id);
+                    removed.push(id);
+                }
+            });
+            dirty.clear();
+            if (upserted.length || removed.length) {
+                bridge.push_changes(JSON.stringify({
+                    reset: false, upserted: upserted, removed: removed
+                }));
+            }
+        }
+
+        function schedule() {
+            if (!scheduled) {
+                scheduled = true;
+                setTimeout(flush, 250);
+            }
+        }
+
+        // A change inside an item: only that item. Never a scan of the
+        // target's descendants, which for the list container is every task.
+        function markDirty(node) {
+            if (node && node.nodeType !== Node.ELEMENT_NODE) node = node.parentElement;
+            const item = node && node.closest(ITEM);
+            if (item) {
+                dirty.add(item);
+                schedule();
+            }
+        }
+
+        // Added or removed subtrees: the items inside them
+        function markTree(node) {
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            if (node.matches(ITEM)) dirty.add(node);
+            node.querySelectorAll(ITEM).forEach(child => dirty.add(child));
+            schedule();
+        }
+
+        const observer = new MutationObserver(records => {
+            records.forEach(record => {
+                record.removedNodes.forEach(markTree);
+                record.addedNodes.forEach(markTree);
+                markDirty(record.target);
+            });
+        });
+        observer.observe(document.body, {
+            childList: true, subtree: true, characterData: true,
+            attributes: true, attributeFilter: ['aria-checked', 'aria-label', 'checked']
+        });
+        // Checkbox state is a property, not an attribute
+        document.addEventListener('change', e => markDirty(e.target), true);
+
+        const initial = [];
+        document.querySelectorAll(ITEM).forEach(item => {
+            const task = snapshot(item);
+            if (task) {
+                known.set(task.id, JSON.stringify(task));
+                initial.push(task);
+            }
+        });
+        bridge.push_changes(JSON.stringify({
+            reset: true, upserted: initial, removed: []
+        }));
+    });
+})();
+"""
+
+
+def _read_qwebchannel_js():
+    """Read the qwebchannel.js client shipped inside QtWebChannel's resources"""
+    qfile = QFile(":/qtwebchannel/qwebchannel.js")
+    if not qfile.open(QIODevice.ReadOnly):
+        return ""
+    source = bytes(qfile.readAll()).decode("utf-8")
+    qfile.close()
+    return source
+
+
+class TaskBridge(QObject):
+    """Receives task changes pushed from the page over QWebChannel"""
+
+    # (upserted task dicts, removed task ids, whether this is a full reset)
+    tasks_changed = pyqtSignal(list, list, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks = {}
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("taskBridge", self)
+
+    def install(self, page):
+        """Register the bridge and observer scripts on a page"""
+        page.setWebChannel(self.channel, QWebEngineScript.ApplicationWorld)
+
+        scripts = page.scripts()
+        for name in ("gt-qwebchannel", "gt-task-observer"):
+            for script in scripts.findScripts(name):
+                scripts.remove(script)
+
+        channel_script = QWebEngineScript()
+        channel_script.setName("gt-qwebchannel")
+        channel_script.setSourceCode(_read_qwebchannel_js())
+        channel_script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        channel_script.setWorldId(QWebEngineScript.ApplicationWorld)
+        channel_script.setRunsOnSubFrames(False)
+        scripts.insert(channel_script)
+
+        observer_script = QWebEngineScript()
+        observer_script.setName("gt-task-observer")
+        observer_script.setSourceCode(TASK_ID_JS + OBSERVER_JS)
+        observer_script.setInjectionPoint(QWebEngineScript.DocumentReady)
+        observer_script.setWorldId(QWebEngineScript.ApplicationWorld)
+        observer_script.setRunsOnSubFrames(False)
+        scripts.insert(observer_script)
+
+    @pyqtSlot(str)
+    def push_changes(self, payload):
+        """Apply a batch of changes sent by the page observer"""
+        try:
+            changes = json.loads(payload)
+        except ValueError:
+            return
+
+        reset = bool(changes.get("reset"))
+        if reset:
+            self.tasks.clear()
+
+        upserted = changes.get("upserted") or []
+        removed = changes.get("removed") or []
+        for task in upserted:
+            task["due_ts"] = page_due_ts(task.get("due") or "")
+            self.tasks[task["id"]] = task
+        for task_id in removed:
+            self.tasks.pop(task_id, None)
+
+        self.tasks_changed.emit(upserted, removed, reset)
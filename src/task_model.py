@@ -0,0 +1,117 @@
+import time
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+OVERDUE_COLOR = QColor("#d93025")
+COMPLETED_COLOR = QColor("#80868b")
+
+
+class TaskRecord:
+    """Compact in-memory task"""
+
+    __slots__ = ('id', 'title', 'notes', 'due', 'due_ts', 'completed')
+
+    def __init__(self, id, title='', notes='', due='', due_ts=None, completed=False):
+        self.id = id
+        self.title = title
+        self.notes = notes
+        self.due = due
+        self.due_ts = due_ts
+        self.completed = completed
+
+    @classmethod
+    def from_dict(cls, task):
+        return cls(task['id'], task.get('title') or '', task.get('notes') or '',
+                   task.get('due') or '', task.get('due_ts'), bool(task.get('completed')))
+
+
+class TaskListModel(QAbstractListModel):
+    """List model over TaskRecords that applies incremental changes"""
+
+    IdRole = Qt.UserRole + 1
+    DueTimestampRole = Qt.UserRole + 2
+    CompletedRole = Qt.UserRole + 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+        self._rows = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._records[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{record.title}  ({record.due})" if record.due else record.title
+        if role == Qt.ToolTipRole:
+            return record.notes or record.title
+        if role == Qt.ForegroundRole:
+            if record.completed:
+                return QBrush(COMPLETED_COLOR)
+            if record.due_ts is not None and record.due_ts <= time.time():
+                return QBrush(OVERDUE_COLOR)
+            return None
+        if role == self.IdRole:
+            return record.id
+        if role == self.DueTimestampRole:
+            return record.due_ts
+        if role == self.CompletedRole:
+            return record.completed
+        return None
+
+    def record(self, row):
+        return self._records[row]
+
+    def reset(self, tasks):
+        """Replace every record"""
+        self.beginResetModel()
+        self._records = [TaskRecord.from_dict(task) for task in tasks]
+        self._reindex()
+        self.endResetModel()
+
+    def apply_changes(self, upserted, removed):
+        """Update, insert and remove records without resetting the view"""
+        rows = sorted((self._rows[task_id] for task_id in removed if task_id in self._rows),
+                      reverse=True)
+        # Remove contiguous runs from the bottom up so row numbers stay valid
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._records[first:last + 1]
+            self.endRemoveRows()
+        if removed:
+            self._reindex()
+
+        new_records = []
+        for task in upserted:
+            record = TaskRecord.from_dict(task)
+            row = self._rows.get(record.id)
+            if row is None:
+                new_records.append(record)
+            else:
+                self._records[row] = record
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+        if new_records:
+            first = len(self._records)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_records) - 1)
+            for offset, record in enumerate(new_records):
+                self._rows[record.id] = first + offset
+            self._records.extend(new_records)
+            self.endInsertRows()
+
+    def _reindex(self):
+        self._rows = {record.id: row for row, record in enumerate(self._records)}
+
+
+class PendingTasksProxy(QSortFilterProxyModel):
+    """Hide completed tasks"""
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self.sourceModel().record(source_row).completed
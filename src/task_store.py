@@ -0,0 +1,274 @@
+import os
+import sqlite3
+import threading
+from src.utilities import get_data_dir, ensure_directory_exists
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT NOT NULL,
+    list_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    due TEXT NOT NULL DEFAULT '',
+    due_ts REAL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated TEXT NOT NULL DEFAULT '',
+    position TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_source_list ON tasks (source, list_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_pending_due ON tasks (completed, due_ts);
+CREATE TABLE IF NOT EXISTS tasklists (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    updated TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+TASK_COLUMNS = ("id", "list_id", "source", "title", "notes", "due", "due_ts",
+                "completed", "updated", "position")
+
+PAGE_LIST_ID = "page"
+
+# Bumped whenever SCHEMA changes in a way CREATE IF NOT EXISTS can't apply
+SCHEMA_VERSION = 2
+
+
+def default_store_path():
+    """Return the location of the task database"""
+    data_dir = get_data_dir()
+    ensure_directory_exists(data_dir)
+    return os.path.join(data_dir, "tasks.db")
+
+
+class TaskStore:
+    """Indexed on-disk copy of the user's tasks
+
+    Tasks come either from the Google Tasks API (source 'api') or from the
+    embedded page (source 'page'). Readers get API tasks once a sync has
+    happened and fall back to the page copy otherwise.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def _migrate(self):
+        """Drop tables from an older schema
+
+        The store is a cache of the API and the page, so rather than
+        converting rows it starts over: clearing sync_state makes the next
+        sync a full one, and the page pushes its tasks again when it loads.
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'").fetchone()
+        if exists and version < SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE tasks; DROP TABLE IF EXISTS tasklists; "
+                "DROP TABLE IF EXISTS sync_state;")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Writes
+
+    def upsert_tasks(self, tasks, source="page", list_id=PAGE_LIST_ID):
+        """Insert or update task dicts"""
+        rows = [self._task_row(task, source, list_id) for task in tasks]
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_COLUMNS)}) "
+                f"VALUES ({placeholders})", rows)
+
+    def delete_tasks(self, task_ids, source="page"):
+        """Remove tasks of one source by id"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE source = ? AND id = ?",
+                [(source, i) for i in task_ids])
+
+    def replace_list(self, list_id, tasks, source="page"):
+        """Replace every task of a list in one transaction
+
+        Only rows that differ are written. Returns ``(upserted, removed)``:
+        the new or changed tasks as store dicts and the ids that are gone,
+        for mirrors that apply changes instead of rebuilding.
+        """
+        rows = {}
+        for task in tasks:
+            row = self._task_row(task, source, list_id)
+            rows[row[0]] = row
+        with self._lock, self._conn:
+            existing = {row[0]: tuple(row) for row in self._conn.execute(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks "
+                "WHERE source = ? AND list_id = ?", (source, list_id))}
+            removed = [task_id for task_id in existing if task_id not in rows]
+            changed = [row for task_id, row in rows.items() if existing.get(task_id) != row]
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE source = ? AND id = ?",
+                [(source, task_id) for task_id in removed])
+            placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_COLUMNS)}) "
+                f"VALUES ({placeholders})", changed)
+        return [self._row_task(dict(zip(TASK_COLUMNS, row))) for row in changed], removed
+
+    def upsert_tasklists(self, tasklists):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasklists (id, title, updated) VALUES (?, ?, ?)",
+                [(tl["id"], tl.get("title", ""), tl.get("updated", ""))
+                 for tl in tasklists])
+
+    def remove_tasklists_except(self, keep_ids):
+        """Drop lists (and their tasks) that no longer exist upstream
+
+        Returns the ids of the tasks removed with them.
+        """
+        keep_ids = set(keep_ids)
+        removed = []
+        with self._lock, self._conn:
+            stale = [row["id"] for row in
+                     self._conn.execute("SELECT id FROM tasklists")
+                     if row["id"] not in keep_ids]
+            for list_id in stale:
+                removed.extend(row["id"] for row in self._conn.execute(
+                    "SELECT id FROM tasks WHERE source = 'api' AND list_id = ?", (list_id,)))
+                self._conn.execute("DELETE FROM tasklists WHERE id = ?", (list_id,))
+                self._conn.execute(
+                    "DELETE FROM tasks WHERE source = 'api' AND list_id = ?", (list_id,))
+                self._conn.execute(
+                    "DELETE FROM sync_state WHERE key LIKE ?", (f"list:{list_id}:%",))
+        return removed
+
+    # Reads
+
+    def tasklists(self):
+        with self._lock:
+            return [dict(row) for row in
+                    self._conn.execute("SELECT * FROM tasklists ORDER BY title")]
+
+    def get_task(self, task_id, source=None):
+        """Return one task by id from ``source`` (default: the preferred one), or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM tasks WHERE source = ? AND id = ?",
+                (source or self.preferred_source(), task_id)).fetchone()
+        return self._row_task(row) if row else None
+
+    def preferred_source(self):
+        """Return 'api' once the API has been synced, otherwise 'page'"""
+        return "api" if self.get_state("last_sync") else "page"
+
+    def all_tasks(self, include_completed=True):
+        """Return every task from the preferred source"""
+        query = "SELECT * FROM tasks WHERE source = ?"
+        if not include_completed:
+            query += " AND completed = 0"
+        query += " ORDER BY list_id, position, rowid"
+        with self._lock:
+            rows = self._conn.execute(query, (self.preferred_source(),)).fetchall()
+        return [self._row_task(row) for row in rows]
+
+    def iter_tasks(self, chunk_size=500):
+        """Yield tasks from the preferred source in bounded chunks
+
+        Uses keyset pagination on rowid so memory stays flat and the lock is
+        only held while one chunk is fetched. ``+source`` keeps SQLite off the
+        source index, which would sort the whole source again for every chunk,
+        and on a plain rowid range scan.
+        """
+        source = self.preferred_source()
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid AS _rowid, * FROM tasks WHERE +source = ? AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?", (source, last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1]["_rowid"]
+            for row in rows:
+                task = self._row_task(row)
+                del task["_rowid"]
+                yield task
+
+    def due_tasks(self, now):
+        """Return incomplete tasks due at or before ``now`` (epoch seconds)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE completed = 0 AND due_ts IS NOT NULL "
+                "AND due_ts <= ? AND source = ? ORDER BY due_ts",
+                (now, self.preferred_source())).fetchall()
+        return [self._row_task(row) for row in rows]
+
+    def scheduled_tasks(self):
+        """Return incomplete tasks that have a due time"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE completed = 0 AND due_ts IS NOT NULL "
+                "AND source = ?", (self.preferred_source(),)).fetchall()
+        return [self._row_task(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE source = ?",
+                (self.preferred_source(),)).fetchone()[0]
+
+    # Sync bookkeeping
+
+    def get_state(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_state(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                (key, value))
+
+    @staticmethod
+    def _task_row(task, source, list_id):
+        return (
+            task["id"],
+            task.get("list_id") or list_id,
+            source,
+            task.get("title") or "",
+            task.get("notes") or "",
+            task.get("due") or "",
+            task.get("due_ts"),
+            1 if task.get("completed") else 0,
+            task.get("updated") or "",
+            task.get("position") or "",
+        )
+
+    @staticmethod
+    def _row_task(row):
+        task = dict(row)
+        task["completed"] = bool(task["completed"])
+        return task
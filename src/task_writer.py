@@ -0,0 +1,183 @@
+from PyQt5.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+from src.op_log import OpLog, new_op
+from src.sync_worker import ApplyOpJob
+from src.tasks_api import get_api_credentials, new_task_body
+
+# Backoff between replays after a failure that is worth retrying
+RETRY_MIN_SECONDS = 5
+RETRY_MAX_SECONDS = 300
+# What the page runtime's completeTask returns when the task isn't there;
+# false means the page wasn't ready for it
+NOT_FOUND = 'not-found'
+
+
+class TaskWriter(QObject):
+    """Apply task mutations through a durable operation log
+
+    Every add and complete is written to the OpLog before anything else
+    happens, then applied: through the API by ApplyOpJobs on a private
+    single-thread pool (so they land in submission order without blocking
+    the UI) when there are API credentials, through the page otherwise. An op is
+    retired only once it has been applied. Ops that fail because the
+    network or the page isn't there stay queued and are replayed, in
+    order, on the next ``replay()``: after a successful sync, when the
+    page loads, on a backoff timer, or at the next start.
+    """
+
+    applied = pyqtSignal(dict, dict)  # op, task ({} when the page applied it)
+    failed = pyqtSignal(str, str)  # title, error
+    queued = pyqtSignal(str)  # title of an op waiting for the network or the page
+    auth_needed = pyqtSignal(str)  # error; ops wait until the user signs in again
+    page_needed = pyqtSignal()
+
+    def __init__(self, store, settings, page_call, page_ready, parent=None, op_log=None):
+        super().__init__(parent)
+        self.store = store
+        self.settings = settings
+        self.page_call = page_call
+        self.page_ready = page_ready
+        self.log = op_log if op_log is not None else OpLog()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.in_flight = set()
+        self.reported = set()
+        self.retry_seconds = RETRY_MIN_SECONDS
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.replay)
+
+    def pending_count(self):
+        return len(self.log)
+
+    def add(self, title, due='', notes='', list_id='@default'):
+        """Queue a new task; returns its op id, or None"""
+        try:
+            body = new_task_body(title, notes, due)
+        except ValueError as e:
+            self.failed.emit(title, str(e))
+            return None
+        op = self.log.append(new_op('add', list_id=list_id, body=body))
+        if op is None:
+            return None
+        self._submit(op)
+        return op['op_id']
+
+    def complete(self, task_id, title='', list_id=None):
+        """Queue completing a task"""
+        op = new_op('complete', task_id=task_id, title=title,
+                    list_id=list_id or self._list_of(task_id))
+        op = self.log.append(op)
+        if op is not None:
+            self._submit(op)
+
+    def _submit(self, op):
+        if not self._uses_api(op) and not self.page_ready():
+            self._report_queued(op)
+        self.replay()
+
+    def replay(self):
+        """Apply every queued op that isn't already on its way
+
+        Ops for the page wait while it is loading or frozen; page_needed
+        asks for it to be woken up, and it replays them once it's back.
+        """
+        credentials = get_api_credentials(self.settings)
+        waiting_for_page = False
+        for op in self.log.pending_ops():
+            if op['op_id'] in self.in_flight:
+                continue
+            use_api = credentials and self._uses_api(op)
+            if use_api:
+                self._apply_api(op, credentials)
+            elif self.page_ready():
+                self._apply_page(op)
+            else:
+                waiting_for_page = True
+        if waiting_for_page:
+            self.page_needed.emit()
+
+    def _apply_api(self, op, credentials):
+        self.in_flight.add(op['op_id'])
+        # From here on the op can't be coalesced, and a retry checks
+        # whether the first attempt landed
+        self.log.mark_sent(op['op_id'])
+        job = ApplyOpJob(self.store, credentials, self.settings['api_base_url'], op)
+        job.signals.finished.connect(self._on_applied)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.auth_needed.connect(self._on_auth_needed)
+        self.pool.start(job)
+
+    def _apply_page(self, op):
+        self.in_flight.add(op['op_id'])
+        self.log.mark_sent(op['op_id'])
+        if op['kind'] == 'add':
+            body = op['body']
+            self.page_call('addTask', body['title'], (body.get('due') or '')[:10],
+                           body.get('status') == 'completed',
+                           callback=lambda ok: self._on_page_result(op, ok))
+        else:
+            self.page_call('completeTask', op['task_id'], op.get('title', ''),
+                           callback=lambda ok: self._on_page_result(op, ok))
+
+    def _on_page_result(self, op, result):
+        self.in_flight.discard(op['op_id'])
+        if result is True:
+            self.log.mark_done(op['op_id'])
+            self.retry_seconds = RETRY_MIN_SECONDS
+            self.applied.emit(op, {})
+        elif result == NOT_FOUND:
+            # The task isn't on the page (any more); nothing left to do
+            self.log.mark_done(op['op_id'])
+            self.failed.emit(self._title(op), "The task could not be found")
+        else:
+            # False: the page wasn't ready for it. None: the script never
+            # ran, e.g. the page navigated away. Either way it may not have
+            # been applied, so it stays queued and is tried again.
+            self._report_queued(op)
+            self._retry_later()
+
+    def _on_applied(self, op, task):
+        self.in_flight.discard(op['op_id'])
+        self.log.mark_done(op['op_id'])
+        self.retry_seconds = RETRY_MIN_SECONDS
+        self.applied.emit(op, task)
+
+    def _on_failed(self, op, error, retry):
+        self.in_flight.discard(op['op_id'])
+        if not retry:
+            self.log.mark_done(op['op_id'])
+            self.failed.emit(self._title(op), error)
+            return
+        self._report_queued(op)
+        self._retry_later()
+
+    def _retry_later(self):
+        if not self.retry_timer.isActive():
+            self.retry_timer.start(int(self.retry_seconds * 1000))
+            self.retry_seconds = min(self.retry_seconds * 2, RETRY_MAX_SECONDS)
+
+    def _on_auth_needed(self, op, error):
+        # No backoff: the op waits for the next replay, after signing in
+        self.in_flight.discard(op['op_id'])
+        self._report_queued(op)
+        self.auth_needed.emit(error)
+
+    def _report_queued(self, op):
+        if op['op_id'] not in self.reported:
+            self.reported.add(op['op_id'])
+            self.queued.emit(self._title(op))
+
+    def _uses_api(self, op):
+        """Adds always can, completes only for tasks the API knows"""
+        if not get_api_credentials(self.settings):
+            return False
+        return op['kind'] == 'add' or (
+            self.store.get_task(op['task_id'], source='api') is not None)
+
+    def _list_of(self, task_id):
+        task = self.store.get_task(task_id, source='api')
+        return task['list_id'] if task else None
+
+    @staticmethod
+    def _title(op):
+        return op['body']['title'] if op['kind'] == 'add' else op.get('title', '')
@@ -0,0 +1,281 @@
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+API_BASE_URL = "https://tasks.googleapis.com/tasks/v1"
+PAGE_SIZE = 100
+# Worth retrying: rate limiting and server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TasksApiError(Exception):
+    """Raised when the Google Tasks API returns an error"""
+
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class AuthError(TasksApiError):
+    """Raised when the API needs the user to sign in again
+
+    Unlike other failures, waiting and retrying never helps.
+    """
+
+    def __init__(self, message):
+        super().__init__(401, message)
+
+
+def get_api_credentials(settings):
+    """Return credentials for the API, or None when there are none
+
+    A token from ``google-tasks auth`` (kept in the data directory) is
+    refreshed as needed; GOOGLE_TASKS_TOKEN is used as is.
+    """
+    from src.google_auth import StaticToken, load_credentials
+    token = os.environ.get('GOOGLE_TASKS_TOKEN')
+    if token:
+        return StaticToken(token)
+    return load_credentials(settings.get('api_token_file') or None)
+
+
+def parse_rfc3339(value):
+    """Parse an API timestamp into epoch seconds"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def local_date_ts(day):
+    """Epoch seconds of local midnight on ``day`` (YYYY-MM-DD), or None
+
+    The API only keeps the date part of ``due`` and sends it as midnight
+    UTC, which is hours off the user's day anywhere else.
+    """
+    try:
+        return datetime.strptime(day[:10], '%Y-%m-%d').timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def format_rfc3339(timestamp):
+    """Format epoch seconds as an API timestamp"""
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def new_task_body(title, notes='', due=''):
+    """API resource for a new task; ``due`` is YYYY-MM-DD"""
+    body = {'title': title, 'notes': notes}
+    if due:
+        day = datetime.strptime(due, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        body['due'] = day.isoformat().replace('+00:00', 'Z')
+    return body
+
+
+def task_from_api(item, list_id):
+    """Convert an API task resource into the store's task dict"""
+    due = item.get('due') or ''
+    return {
+        'id': item['id'],
+        'list_id': list_id,
+        'title': item.get('title', ''),
+        'notes': item.get('notes', ''),
+        'due': due[:10],
+        'due_ts': local_date_ts(due),
+        'completed': item.get('status') == 'completed',
+        'updated': item.get('updated', ''),
+        'position': item.get('position', ''),
+        'source': 'api',
+    }
+
+
+class SyncChanges:
+    """What one sync wrote to the store"""
+
+    def __init__(self):
+        self.upserted = []
+        self.removed = []
+        # The first sync moves readers from the page's tasks to the API's
+        self.switched = False
+
+    def __len__(self):
+        return len(self.upserted) + len(self.removed)
+
+
+class TasksApiClient:
+    """Minimal Google Tasks REST client with ETag support
+
+    ``credentials`` provides ``access_token()`` and ``refresh()``; a 401 is
+    retried once with a refreshed token before it raises AuthError.
+    """
+
+    def __init__(self, credentials, base_url=API_BASE_URL, timeout=30):
+        self.credentials = credentials
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, params=None, body=None, etag=None):
+        """Send a request and return (status, data, etag)
+
+        A 304 Not Modified response returns ``(304, None, etag)``.
+        """
+        try:
+            return self._send(method, path, params, body, etag)
+        except AuthError:
+            if not self.credentials.refresh():
+                raise
+        return self._send(method, path, params, body, etag)
+
+    def _send(self, method, path, params, body, etag):
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(
+                {k: v for k, v in params.items() if v is not None})
+
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method)
+        req.add_header('Accept', 'application/json')
+        req.add_header('Authorization', f'Bearer {self.credentials.access_token()}')
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        if etag:
+            req.add_header('If-None-Match', etag)
+
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                raw = resp.read()
+                return (resp.status, json.loads(raw) if raw else None,
+                        resp.headers.get('ETag'))
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, None, etag
+            if e.code == 401:
+                raise AuthError(e.read().decode('utf-8', 'replace')) from e
+            raise TasksApiError(e.code, e.read().decode('utf-8', 'replace')) from e
+
+    def list_tasklists(self, etag=None):
+        """Return (tasklists, etag), or (None, etag) when unchanged"""
+        tasklists = []
+        page_token = None
+        while True:
+            status, data, new_etag = self.request(
+                'GET', '/users/@me/lists',
+                {'maxResults': PAGE_SIZE, 'pageToken': page_token},
+                etag=etag if page_token is None else None)
+            if status == 304:
+                return None, etag
+            if page_token is None:
+                first_etag = new_etag
+            tasklists.extend(data.get('items', []))
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                return tasklists, first_etag
+
+    def list_tasks(self, list_id, updated_min=None, etag=None):
+        """Return (tasks, etag) changed since ``updated_min``
+
+        Deleted and completed tasks are included so the caller can apply
+        them. Returns (None, etag) when the list is unchanged.
+        """
+        tasks = []
+        page_token = None
+        path = f'/lists/{urllib.parse.quote(list_id, safe="")}/tasks'
+        while True:
+            status, data, new_etag = self.request('GET', path, {
+                'maxResults': PAGE_SIZE,
+                'pageToken': page_token,
+                'showCompleted': 'true',
+                'showDeleted': 'true',
+                'showHidden': 'true',
+                'updatedMin': updated_min,
+            }, etag=etag if page_token is None else None)
+            if status == 304:
+                return None, etag
+            if page_token is None:
+                first_etag = new_etag
+            tasks.extend(data.get('items', []))
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                return tasks, first_etag
+
+    def insert_task(self, list_id, task):
+        """Create a task and return the API resource"""
+        path = f'/lists/{urllib.parse.quote(list_id, safe="")}/tasks'
+        _, data, _ = self.request('POST', path, body=task)
+        return data
+
+    def patch_task(self, list_id, task_id, fields):
+        """Update fields of a task and return the API resource"""
+        path = (f'/lists/{urllib.parse.quote(list_id, safe="")}'
+                f'/tasks/{urllib.parse.quote(task_id, safe="")}')
+        _, data, _ = self.request('PATCH', path, body=fields)
+        return data
+
+
+def find_created_task(client, list_id, body, since):
+    """Return a task matching ``body`` created after ``since``, or None
+
+    Lets an insert whose response was lost be retried without creating
+    the task twice.
+    """
+    items, _ = client.list_tasks(list_id, updated_min=format_rfc3339(since))
+    for item in items or ():
+        if (not item.get('deleted') and item.get('title') == body['title']
+                and (item.get('due') or '')[:10] == (body.get('due') or '')[:10]):
+            return item
+    return None
+
+
+def sync(client, store):
+    """Incrementally sync the store with the API
+
+    Each list remembers the newest ``updated`` timestamp it has seen and the
+    ETag of its last response, so unchanged lists cost one 304 round trip
+    and changed lists only transfer the tasks that changed.
+    Returns the SyncChanges.
+    """
+    changes = SyncChanges()
+    changes.switched = store.preferred_source() != 'api'
+    tasklists, lists_etag = client.list_tasklists(store.get_state('lists:etag'))
+    if tasklists is None:
+        tasklists = store.tasklists()
+    else:
+        store.upsert_tasklists(tasklists)
+        changes.removed.extend(store.remove_tasklists_except(tl['id'] for tl in tasklists))
+        store.set_state('lists:etag', lists_etag)
+
+    for tasklist in tasklists:
+        list_id = tasklist['id']
+        updated_key = f'list:{list_id}:updated_min'
+        etag_key = f'list:{list_id}:etag'
+        updated_min = store.get_state(updated_key)
+
+        items, etag = client.list_tasks(
+            list_id, updated_min, store.get_state(etag_key))
+        if items is None:
+            continue
+
+        deleted = [item['id'] for item in items
+                   if item.get('deleted')]
+        live = [task_from_api(item, list_id) for item in items
+                if not item.get('deleted')]
+        store.upsert_tasks(live, source='api', list_id=list_id)
+        store.delete_tasks(deleted, source='api')
+        changes.upserted.extend(live)
+        changes.removed.extend(deleted)
+
+        newest = max((item.get('updated', '') for item in items),
+                     default=updated_min)
+        if newest:
+            store.set_state(updated_key, newest)
+        store.set_state(etag_key, etag)
+
+    store.set_state('last_sync', datetime.now(timezone.utc).isoformat())
+    return changes
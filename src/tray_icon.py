@@ -22,28 +22,18 @@ class SystemTrayIcon(QSystemTrayIcon):
         new_task.triggered.connect(self.parent.add_new_task)
         menu.addAction(new_task)
         
+        quick_add = QAction("Quick Add Task", self.parent)
+        quick_add.triggered.connect(self.parent.show_quick_add)
+        menu.addAction(quick_add)
+        
         complete_task = QAction("Complete Task", self.parent)
         complete_task.triggered.connect(self.parent.complete_selected_task)
         menu.addAction(complete_task)
         
         menu.addSeparator()
         
-        # Export Submenu
-        export_menu = QMenu("Export Tasks", self.parent)
-        
-        export_json = QAction("JSON", self.parent)
-        export_json.triggered.connect(lambda: self.parent.export_tasks('json'))
-        
-        export_csv = QAction("CSV", self.parent)
-        export_csv.triggered.connect(lambda: self.parent.export_tasks('csv'))
-        
-        export_txt = QAction("Text", self.parent)
-        export_txt.triggered.connect(lambda: self.parent.export_tasks('txt'))
-        
-        export_menu.addAction(export_json)
-        export_menu.addAction(export_csv)
-        export_menu.addAction(export_txt)
-        menu.addMenu(export_menu)
+        # Export Submenu, one entry per registered format
+        menu.addMenu(self.parent.create_export_menu())
         
         menu.addSeparator()
         
@@ -56,6 +46,10 @@ class SystemTrayIcon(QSystemTrayIcon):
         fullscreen.triggered.connect(self.parent.toggle_fullscreen)
         menu.addAction(fullscreen)
         
+        mini_view = QAction("Mini Task View", self.parent)
+        mini_view.triggered.connect(self.parent.toggle_mini_view)
+        menu.addAction(mini_view)
+        
         menu.addSeparator()
         
         # App Control
@@ -13,4 +13,20 @@ def get_data_dir():
 
 def ensure_directory_exists(path):
     """Ensure directory exists"""
-    os.makedirs(path, exist_ok=True)
\ No newline at end of file
+    os.makedirs(path, exist_ok=True)
+
+def system_idle_seconds():
+    """Seconds since the last user input, or None where unsupported"""
+    if sys.platform != 'win32':
+        return None
+    import ctypes
+    
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+    
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    elapsed_ms = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+    return elapsed_ms / 1000.0
\ No newline at end of file
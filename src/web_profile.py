@@ -0,0 +1,74 @@
+import os
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+from src.metrics import metrics
+from src.utilities import ensure_directory_exists, get_data_dir
+
+PROFILE_NAME = "google-tasks"
+APP_URL = "https://tasks.google.com/embed/"
+# Late resources (fonts, lazy bundles) are counted after this delay
+CACHE_STATS_DELAY_MS = 5000
+
+
+def create_web_profile(settings, parent=None):
+    """Persistent profile whose cookies, storage and HTTP cache live in the data dir
+
+    A cache size of 0 lets Chromium pick one.
+    """
+    root = os.path.join(get_data_dir(), "web-profile")
+    storage_path = os.path.join(root, "storage")
+    cache_path = os.path.join(root, "cache")
+    ensure_directory_exists(storage_path)
+    ensure_directory_exists(cache_path)
+
+    profile = QWebEngineProfile(PROFILE_NAME, parent)
+    profile.setPersistentStoragePath(storage_path)
+    profile.setCachePath(cache_path)
+    profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(settings['web_cache_size_mb'] * 1024 * 1024)
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+    return profile
+
+
+def record_cache_stats(stats):
+    """Count a page's resources served from cache versus the network
+
+    Cross-origin resources without Timing-Allow-Origin report no sizes and
+    are counted as unknown.
+    """
+    if not stats:
+        return
+    metrics.increment('web.cache.hit', stats['cached'])
+    metrics.increment('web.cache.miss', stats['network'])
+    metrics.increment('web.cache.unknown', stats['unknown'])
+    metrics.increment('web.bytes_transferred', stats['transferred'])
+
+
+class AppShellPreloader(QObject):
+    """Fetch the Tasks app shell into the disk cache with a throwaway page
+
+    Unlike prewarming, no renderer is kept around afterwards: the page is
+    deleted once loaded, leaving its JS and CSS bundles in the HTTP cache
+    for the real view.
+    """
+
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.page = None
+
+    def start(self, delay_ms=0):
+        QTimer.singleShot(delay_ms, self._load)
+
+    def _load(self):
+        if self.page is not None:
+            return
+        self.page = QWebEnginePage(self.profile, self)
+        self.page.setAudioMuted(True)
+        self.page.loadFinished.connect(self.stop)
+        self.page.load(QUrl(APP_URL))
+
+    def stop(self, *args):
+        if self.page is not None:
+            self.page.deleteLater()
+            self.page = None
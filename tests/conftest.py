@@ -0,0 +1,166 @@
+"""A local stand-in for the Google Tasks REST API
+
+Serves task lists and tasks from memory with the parts of the real API
+that sync relies on: pageToken pagination, updatedMin, showDeleted, ETags
+with If-None-Match, and bearer tokens, plus task inserts. Every request is
+recorded so tests can check what went over the wire.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.google_auth import StaticToken  # noqa: E402
+from src.task_store import TaskStore  # noqa: E402
+from src.tasks_api import TasksApiClient  # noqa: E402
+
+TOKEN = 'test-token'
+
+
+class FakeTasksApi:
+    def __init__(self):
+        self.lists = {}
+        self.tasks = {}
+        self.requests = []
+        self.clock = 0
+        self.valid_token = TOKEN
+        # Title -> status to answer inserts of that title with
+        self.insert_errors = {}
+
+    def add_list(self, list_id, title=''):
+        self.lists[list_id] = {'id': list_id, 'title': title or list_id,
+                               'updated': self._tick()}
+        self.tasks.setdefault(list_id, {})
+
+    def put_task(self, list_id, task_id, **fields):
+        task = self.tasks[list_id].setdefault(task_id, {'id': task_id, 'title': ''})
+        task.update(fields, updated=self._tick())
+        return task
+
+    def delete_task(self, list_id, task_id):
+        self.put_task(list_id, task_id, deleted=True)
+
+    def _tick(self):
+        self.clock += 1
+        minutes, seconds = divmod(self.clock, 60)
+        return f"2026-01-01T00:{minutes:02d}:{seconds:02d}.000Z"
+
+
+def _etag(collection):
+    """Version of a whole collection, whatever part of it was asked for"""
+    payload = json.dumps(collection, sort_keys=True).encode('utf-8')
+    return '"' + hashlib.sha1(payload).hexdigest() + '"'
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, data=None, etag=None):
+            payload = json.dumps(data).encode('utf-8') if data is not None else b''
+            if etag and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _page(self, items, query):
+            size = int(query.get('maxResults', ['100'])[0])
+            start = int(query.get('pageToken', ['0'])[0])
+            data = {'items': items[start:start + size]}
+            if start + size < len(items):
+                data['nextPageToken'] = str(start + size)
+            return data
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            parts = [urllib.parse.unquote(part) for part in url.path.split('/') if part]
+            api.requests.append((self.command, url.path, query,
+                                 self.headers.get('If-None-Match')))
+            if self.headers.get('Authorization') != f'Bearer {api.valid_token}':
+                self._reply(401, {'error': 'unauthorized'})
+                return
+            if parts == ['users', '@me', 'lists']:
+                self._reply(200, self._page(list(api.lists.values()), query),
+                            _etag(api.lists))
+            elif len(parts) == 3 and parts[0] == 'lists' and parts[2] == 'tasks':
+                if parts[1] not in api.tasks:
+                    self._reply(404, {'error': 'not found'})
+                    return
+                items = list(api.tasks[parts[1]].values())
+                updated_min = query.get('updatedMin', [None])[0]
+                if updated_min:
+                    items = [task for task in items if task['updated'] >= updated_min]
+                if query.get('showDeleted', ['false'])[0] != 'true':
+                    items = [task for task in items if not task.get('deleted')]
+                self._reply(200, self._page(items, query), _etag(api.tasks[parts[1]]))
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            url = urllib.parse.urlparse(self.path)
+            parts = [urllib.parse.unquote(part) for part in url.path.split('/') if part]
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            api.requests.append((self.command, url.path, body, None))
+            if self.headers.get('Authorization') != f'Bearer {api.valid_token}':
+                self._reply(401, {'error': 'unauthorized'})
+                return
+            if len(parts) != 3 or parts[0] != 'lists' or parts[2] != 'tasks':
+                self._reply(404, {'error': 'not found'})
+                return
+            status = api.insert_errors.get(body.get('title'))
+            if status:
+                self._reply(status, {'error': 'rejected'})
+                return
+            api.tasks.setdefault(parts[1], {})
+            task_id = f"new{len(api.tasks[parts[1]]) + 1}"
+            self._reply(200, api.put_task(parts[1], task_id, **body))
+
+    return Handler
+
+
+@pytest.fixture
+def fake_api():
+    api = FakeTasksApi()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(api))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(fake_api):
+    return TasksApiClient(StaticToken(TOKEN), fake_api.base_url)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(str(tmp_path / 'tasks.db'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def app():
+    """A core application, for the timers in the Qt objects under test"""
+    return QCoreApplication.instance() or QCoreApplication([])
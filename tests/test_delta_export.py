@@ -0,0 +1,135 @@
+import csv
+import json
+
+import pytest
+
+from src.delta_export import (MANIFEST_VERSION, DeltaExport, content_hash, get_delta_format,
+                              load_manifest, manifest_path)
+from src.exporter import export_record
+
+
+def task(task_id, title=None, **fields):
+    return dict({'id': task_id, 'title': title or f"Task {task_id}", 'notes': '',
+                 'due': '', 'completed': False}, **fields)
+
+
+def run(tmp_path, tasks, format_name='jsonl'):
+    """One delta run, committed; returns the run and the records it wrote"""
+    filename = str(tmp_path / f"delta.{format_name}")
+    export = DeltaExport(get_delta_format(format_name), manifest_path(filename))
+    with open(filename, 'a', encoding='utf-8') as f:
+        start = f.tell()
+    for _ in export.append(tasks, filename):
+        pass
+    export.commit()
+    with open(filename, encoding='utf-8') as f:
+        f.seek(start)
+        written = f.read()
+    if format_name == 'jsonl':
+        return export, [json.loads(line) for line in written.splitlines()]
+    return export, written
+
+
+def ops(records):
+    return [(record['op'], record['id']) for record in records]
+
+
+def test_the_first_run_adds_every_task(tmp_path):
+    export, records = run(tmp_path, [task('a'), task('b')])
+
+    assert ops(records) == [('add', 'a'), ('add', 'b')]
+    assert export.summary() == "2 added, 0 changed, 0 deleted"
+
+
+def test_unchanged_tasks_are_not_written_again(tmp_path):
+    run(tmp_path, [task('a'), task('b')])
+
+    export, records = run(tmp_path, [task('a'), task('b')])
+
+    assert records == []
+    assert export.summary() == "0 added, 0 changed, 0 deleted"
+
+
+def test_adds_changes_and_deletes_are_told_apart(tmp_path):
+    run(tmp_path, [task('a'), task('b'), task('c')])
+
+    export, records = run(tmp_path, [task('a', completed=True), task('c'), task('d')])
+
+    assert ops(records) == [('change', 'a'), ('add', 'd'), ('delete', 'b')]
+    assert records[0]['completed'] is True
+    assert records[2]['title'] == ''
+    assert export.summary() == "1 added, 1 changed, 1 deleted"
+
+
+@pytest.mark.parametrize('field, value', [('title', 'Renamed'), ('notes', 'More'),
+                                          ('due', '2026-05-01'), ('completed', True)])
+def test_any_exported_field_counts_as_a_change(tmp_path, field, value):
+    run(tmp_path, [task('a')])
+
+    _, records = run(tmp_path, [task('a', **{field: value})])
+
+    assert ops(records) == [('change', 'a')]
+
+
+def test_fields_that_are_not_exported_do_not(tmp_path):
+    run(tmp_path, [task('a', due_ts=100)])
+
+    _, records = run(tmp_path, [task('a', due_ts=200, list_id='work')])
+
+    assert records == []
+
+
+def test_the_manifest_holds_the_content_hash_of_every_task(tmp_path):
+    tasks = [task('a'), task('b', notes='x')]
+    run(tmp_path, tasks)
+
+    manifest = load_manifest(manifest_path(str(tmp_path / 'delta.jsonl')))
+
+    assert manifest == {t['id']: content_hash(export_record(t)) for t in tasks}
+    assert content_hash(export_record(tasks[0])) != content_hash(export_record(task('a', 'A')))
+
+
+def test_an_uncommitted_run_is_diffed_again(tmp_path):
+    run(tmp_path, [task('a')])
+    filename = str(tmp_path / 'delta.jsonl')
+    export = DeltaExport(get_delta_format('jsonl'), manifest_path(filename))
+    for _ in export.append([task('a', 'Renamed')], filename):
+        pass
+
+    _, records = run(tmp_path, [task('a', 'Renamed')])
+
+    assert ops(records) == [('change', 'a')]
+
+
+def test_closing_a_run_early_truncates_what_it_wrote(tmp_path):
+    run(tmp_path, [task('a')])
+    filename = str(tmp_path / 'delta.jsonl')
+    with open(filename, encoding='utf-8') as f:
+        before = f.read()
+    export = DeltaExport(get_delta_format('jsonl'), manifest_path(filename))
+    steps = export.append([task('b'), task('c')], filename)
+    next(steps)
+    next(steps)
+    steps.close()
+
+    with open(filename, encoding='utf-8') as f:
+        assert f.read() == before
+
+
+def test_csv_runs_share_one_header(tmp_path):
+    run(tmp_path, [task('a')], 'csv')
+    run(tmp_path, [task('a'), task('b')], 'csv')
+
+    with open(tmp_path / 'delta.csv', newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0][0] == 'Op'
+    assert [(row[0], row[5]) for row in rows[1:]] == [('add', 'a'), ('add', 'b')]
+
+
+def test_an_unknown_manifest_version_is_refused(tmp_path):
+    path = tmp_path / 'delta.jsonl.manifest.json'
+    path.write_text(json.dumps({'version': MANIFEST_VERSION + 1, 'hashes': {}}))
+
+    with pytest.raises(ValueError):
+        load_manifest(str(path))
@@ -0,0 +1,73 @@
+import sqlite3
+
+from src.export_worker import ExportJob
+from src.exporter import ExportFormat
+from src.ics_feed import IcsFeed
+
+
+def text_format(writer):
+    return ExportFormat('test', "Test", "", 'txt', False, writer, ())
+
+
+def write_ids(tasks, f):
+    for task in tasks:
+        f.write(task['id'] + '\n')
+        yield
+
+
+def writer_failing_with(error):
+    def writer(tasks, f):
+        for _ in tasks:
+            f.write('partial\n')
+            yield
+            raise error
+    return text_format(writer)
+
+
+def run_job(job):
+    failures = []
+    job.signals.failed.connect(failures.append)
+    job.run()
+    return failures
+
+
+def test_unexpected_writer_error_fails_the_job_and_removes_the_partial_file(tmp_path, capsys):
+    path = tmp_path / 'tasks.txt'
+    job = ExportJob(writer_failing_with(TypeError("bad field")), [{'id': 'a'}], str(path))
+
+    failures = run_job(job)
+
+    assert len(failures) == 1 and 'bad field' in failures[0]
+    assert not path.exists()
+    assert not (tmp_path / 'tasks.txt.part').exists()
+    assert 'TypeError' in capsys.readouterr().err
+
+
+def test_store_error_while_reading_tasks_fails_the_job(tmp_path, capsys):
+    def tasks():
+        yield {'id': 'a'}
+        raise sqlite3.OperationalError("database is locked")
+
+    path = tmp_path / 'tasks.txt'
+    job = ExportJob(text_format(write_ids), tasks(), str(path))
+
+    failures = run_job(job)
+
+    assert len(failures) == 1 and 'database is locked' in failures[0]
+    assert not (tmp_path / 'tasks.txt.part').exists()
+
+
+def test_feed_keeps_refreshing_after_a_job_could_not_start(tmp_path):
+    class BrokenStore:
+        def iter_tasks(self):
+            raise sqlite3.OperationalError("disk I/O error")
+
+    feed = IcsFeed(BrokenStore(), str(tmp_path / 'tasks.ics'))
+    feed.timer.stop()
+    failures = []
+    feed.failed.connect(failures.append)
+
+    feed.regenerate()
+
+    assert failures == ["disk I/O error"]
+    assert feed.running is False
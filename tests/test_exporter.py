@@ -0,0 +1,115 @@
+import io
+from datetime import date
+
+import pytest
+
+from src.exporter import ICS_LINE_OCTETS, fold_ics_line, ics_text, run_export, task_due_date
+from src.page_dates import page_due_ts
+
+# As the page bridge dates "Tue, May 1" when it is seen in April 2026
+MAY_1 = page_due_ts('Tue, May 1', date(2026, 4, 20))
+
+
+def task(task_id, due='', due_ts=None, completed=False):
+    return {'id': task_id, 'title': f"Task {task_id}", 'notes': '', 'due': due,
+            'due_ts': due_ts, 'completed': completed}
+
+
+def test_due_date_falls_back_to_due_ts_for_page_dates():
+    assert task_due_date(task('a', 'Tue, May 1', MAY_1)) == date(2026, 5, 1)
+    assert task_due_date(task('b', '2026-06-02', MAY_1)) == date(2026, 6, 2)
+    assert task_due_date(task('c', 'Tue, May 1')) is None
+    assert task_due_date(task('d')) is None
+
+
+@pytest.mark.parametrize('format_name', ['parquet', 'arrow'])
+def test_columnar_due_uses_due_ts_when_the_text_does_not_parse(format_name):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    tasks = [task('a', 'Tue, May 1', MAY_1), task('b', '2026-06-02'), task('c')]
+    buffer = io.BytesIO()
+
+    assert run_export(format_name, tasks, buffer) == 3
+
+    buffer.seek(0)
+    table = pq.read_table(buffer) if format_name == 'parquet' else pa.ipc.open_file(buffer).read_all()
+    assert table.column('due').to_pylist() == [date(2026, 5, 1), date(2026, 6, 2), None]
+
+
+def ics_dates(data, prefix):
+    return [line.split(':', 1)[1] for line in data.decode('utf-8').split('\r\n')
+            if line.startswith(prefix)]
+
+
+def test_ics_events_use_due_ts_and_count_only_written_events():
+    tasks = [task('a', 'Tue, May 1', MAY_1), task('b', '2026-06-02'), task('c')]
+    buffer = io.BytesIO()
+
+    assert run_export('ics', tasks, buffer) == 2
+
+    assert ics_dates(buffer.getvalue(), 'DTSTART') == ['20260501', '20260602']
+
+
+def test_ics_todos_include_undated_tasks():
+    tasks = [task('a', 'Tue, May 1', MAY_1), task('c')]
+    buffer = io.BytesIO()
+
+    assert run_export('ics-todo', tasks, buffer) == 2
+
+    assert ics_dates(buffer.getvalue(), 'DUE') == ['20260501']
+
+
+def unfold(data):
+    return data.replace(b'\r\n ', b'')
+
+
+@pytest.mark.parametrize('line', [
+    'SUMMARY:' + 'x' * 67,
+    'SUMMARY:' + 'x' * 68,
+    'SUMMARY:' + 'x' * 500,
+    # A two-, three- and four-octet character straddling the first fold
+    'SUMMARY:' + 'x' * 66 + 'é' * 40,
+    'SUMMARY:' + 'x' * 66 + '€' * 40,
+    'SUMMARY:' + 'x' * 65 + '😀' * 40,
+])
+def test_folded_lines_fit_in_75_octets_and_unfold_to_the_original(line):
+    folded = fold_ics_line(line)
+
+    assert folded.endswith(b'\r\n')
+    physical = folded[:-2].split(b'\r\n')
+    assert all(len(piece) <= ICS_LINE_OCTETS for piece in physical)
+    assert all(piece.startswith(b' ') for piece in physical[1:])
+    # Every piece is valid UTF-8 on its own: no sequence is split
+    for piece in physical:
+        piece.decode('utf-8')
+    assert unfold(folded[:-2]).decode('utf-8') == line
+
+
+def test_short_lines_are_not_folded():
+    line = 'SUMMARY:' + 'x' * (ICS_LINE_OCTETS - len('SUMMARY:'))
+
+    assert fold_ics_line(line) == line.encode('utf-8') + b'\r\n'
+
+
+def test_folds_are_as_long_as_a_character_boundary_allows():
+    # The 75th octet is the middle of an "é", so the fold comes before it
+    physical = fold_ics_line('x' * 74 + 'é' * 10).split(b'\r\n')
+
+    assert len(physical[0]) == 74
+    assert physical[1].startswith(b' \xc3\xa9')
+
+
+def test_text_values_escape_separators_and_newlines():
+    assert ics_text('a,b;c\\d') == 'a\\,b\\;c\\\\d'
+    assert ics_text('one\ntwo\r\nthree') == 'one\\ntwo\\nthree'
+
+
+def test_exported_summaries_round_trip_through_escaping_and_folding():
+    title = 'Call Zoë, Ana; pick up 🎂 ' * 6 + '\nthen rest'
+    buffer = io.BytesIO()
+
+    run_export('ics-todo', [dict(task('a'), title=title)], buffer)
+
+    summary = ics_dates(unfold(buffer.getvalue()), 'SUMMARY')[0]
+    assert summary == ics_text(title)
+    assert all(len(line) <= ICS_LINE_OCTETS for line in buffer.getvalue().split(b'\r\n'))
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from conftest import TOKEN
+from src import importer
+from src.google_auth import StaticToken
+from src.importer import ImportCancelled, import_to_api
+from src.op_log import OpLog
+from src.tasks_api import TasksApiClient
+
+
+def make_client(fake_api):
+    return lambda: TasksApiClient(StaticToken(TOKEN), fake_api.base_url)
+
+
+def tasks(*titles, due=''):
+    return [{'title': title, 'notes': '', 'due': due, 'completed': False} for title in titles]
+
+
+class FakeRuntime:
+    """The page runtime's addTasks, answering straight away"""
+
+    def __init__(self):
+        self.added = []
+
+    def call(self, name, items, callback):
+        assert name == 'addTasks'
+        self.added.extend(title for title, _ in items)
+        callback(len(items))
+
+
+def test_import_writes_each_chunk_to_the_log_and_retires_it(fake_api, store, tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+
+    result = import_to_api(tasks(*(f"Task {n}" for n in range(7))), make_client(fake_api),
+                           store, 'work', concurrency=2, chunk_size=3, op_log=log)
+
+    assert (result.imported, result.failed, result.queued) == (7, 0, 0)
+    assert len(log) == 0
+    assert sorted(task['title'] for task in fake_api.tasks['work'].values()) == [
+        f"Task {n}" for n in range(7)]
+
+
+def test_import_keeps_identical_lines(fake_api, store, tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+
+    result = import_to_api(tasks('Buy milk', 'Buy milk'), make_client(fake_api), store,
+                           'work', op_log=log)
+
+    assert result.imported == 2
+    assert len(fake_api.tasks['work']) == 2
+
+
+def test_retryable_failures_stay_queued_for_replay(fake_api, store, tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, 'RETRY_DELAY', 0)
+    fake_api.insert_errors = {'Flaky': 503, 'Bad': 400}
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+
+    result = import_to_api(tasks('Fine', 'Flaky', 'Bad'), make_client(fake_api), store,
+                           'work', op_log=log)
+
+    assert (result.imported, result.failed, result.queued) == (1, 1, 1)
+    pending, = log.pending_ops()
+    assert pending['body']['title'] == 'Flaky'
+    assert pending['list_id'] == 'work'
+    assert pending['sent'] is True
+    # Still queued for the next run
+    assert [op['body']['title'] for op in OpLog(log.path).pending_ops()] == ['Flaky']
+
+
+def test_claimed_ops_are_hidden_from_replay_until_released(tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    _, ops = importer.import_ops(tasks('One', 'Two'), importer.ImportResult())
+
+    log.append_batch(ops)
+    assert len(log) == 2
+    assert log.pending_ops() == []
+
+    log.mark_done(ops[0]['op_id'])
+    log.release([ops[1]['op_id']])
+    assert [op['body']['title'] for op in log.pending_ops()] == ['Two']
+
+
+def test_cancelled_import_stops_between_chunks(fake_api, store, tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    cancelled = threading.Event()
+
+    def cancel_after_first_chunk(result):
+        cancelled.set()
+
+    with pytest.raises(ImportCancelled):
+        import_to_api(tasks('One', 'Two', 'Three'), make_client(fake_api), store, 'work',
+                      chunk_size=2, on_progress=cancel_after_first_chunk,
+                      cancelled=cancelled, op_log=log)
+
+    assert len(fake_api.tasks['work']) == 2
+    assert len(log) == 0
+
+
+def test_bad_due_date_fails_the_row_and_the_api_import_goes_on(fake_api, store, tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    rows = (tasks('Before') + tasks('US date', due='05/01/2024') + tasks('No such day', due='2024-02-30')
+            + tasks('After', due='2024-05-01'))
+
+    result = import_to_api(rows, make_client(fake_api), store, 'work', chunk_size=2, op_log=log)
+
+    assert (result.imported, result.failed, result.queued) == (2, 2, 0)
+    assert 'US date' in result.errors[0]
+    assert sorted(task['title'] for task in fake_api.tasks['work'].values()) == ['After', 'Before']
+    assert len(log) == 0
+
+
+def test_bad_due_date_fails_the_row_and_the_page_import_goes_on(tmp_path):
+    from PyQt5.QtCore import QCoreApplication
+    from src.import_worker import PageImporter
+    app = QCoreApplication.instance() or QCoreApplication([])
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    runtime = FakeRuntime()
+    rows = (tasks('Before') + tasks('Bad one', 'Bad two', due='05/01/2024')
+            + tasks('After', due='2024-05-01'))
+    page_importer = PageImporter(runtime, rows, log, chunk_size=1)
+    results = []
+    page_importer.signals.finished.connect(results.append)
+
+    page_importer.start()
+    for _ in range(100):
+        if results:
+            break
+        app.processEvents()
+
+    result, = results
+    assert (result.imported, result.failed, result.queued) == (2, 2, 0)
+    assert runtime.added == ['Before', 'After']
+    assert len(log) == 0
@@ -0,0 +1,216 @@
+import json
+
+import pytest
+
+from src import op_log
+from src.op_log import DEDUPE_SECONDS, OpLog, new_op
+from src.task_writer import NOT_FOUND, RETRY_MAX_SECONDS, RETRY_MIN_SECONDS, TaskWriter
+
+
+def add_op(title, at=0, list_id='@default'):
+    return dict(new_op('add', list_id=list_id, body={'title': title, 'notes': ''}), time=at)
+
+
+def complete_op(task_id, at=0):
+    return dict(new_op('complete', task_id=task_id, title='', list_id='@default'), time=at)
+
+
+def records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_identical_adds_within_the_dedupe_window_are_one_op(tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+
+    assert log.append(add_op('Buy milk', at=100)) is not None
+    assert log.append(add_op('Buy milk', at=100 + DEDUPE_SECONDS - 1)) is None
+    assert log.append(add_op('Buy milk', at=100, list_id='work')) is not None
+    assert log.append(add_op('Buy bread', at=101)) is not None
+    assert log.append(add_op('Buy milk', at=100 + DEDUPE_SECONDS)) is not None
+    assert len(log) == 4
+
+
+def test_a_second_complete_of_the_same_task_is_dropped(tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+
+    assert log.append(complete_op('t1')) is not None
+    assert log.append(complete_op('t1')) is None
+    assert log.append(complete_op('t2')) is not None
+    assert [op['task_id'] for op in log.pending_ops()] == ['t1', 't2']
+
+
+def test_reappending_a_queued_op_is_a_no_op(tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    op = log.append(add_op('Buy milk'))
+
+    assert log.append(dict(op)) is None
+    assert len(log) == 1
+
+
+def test_reload_keeps_pending_and_sent_ops_and_drops_done_ones(tmp_path):
+    path = str(tmp_path / 'ops.jsonl')
+    log = OpLog(path)
+    first = log.append(add_op('First'))
+    second = log.append(add_op('Second'))
+    log.append(add_op('Third'))
+    log.mark_sent(first['op_id'])
+    log.mark_done(second['op_id'])
+
+    reloaded = OpLog(path)
+
+    ops = reloaded.pending_ops()
+    assert [op['body']['title'] for op in ops] == ['First', 'Third']
+    assert ops[0].get('sent') and not ops[1].get('sent')
+
+
+def test_reload_skips_a_torn_trailing_line(tmp_path):
+    path = str(tmp_path / 'ops.jsonl')
+    log = OpLog(path)
+    log.append(add_op('Kept'))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": {"op_id": "torn", "kind": "ad')
+
+    reloaded = OpLog(path)
+
+    assert [op['body']['title'] for op in reloaded.pending_ops()] == ['Kept']
+    # Loading compacts the torn line away
+    assert [record['op']['body']['title'] for record in records(path)] == ['Kept']
+
+
+def test_the_log_is_compacted_once_nothing_is_pending(tmp_path):
+    path = str(tmp_path / 'ops.jsonl')
+    log = OpLog(path)
+    ops = [log.append(add_op(f"Task {n}")) for n in range(3)]
+
+    log.mark_done(*(op['op_id'] for op in ops[:2]))
+    assert len(records(path)) == 5  # Three ops and two done records
+    log.mark_done(ops[2]['op_id'])
+
+    assert records(path) == []
+
+
+def test_a_large_log_is_compacted_to_its_pending_ops(tmp_path, monkeypatch):
+    monkeypatch.setattr(op_log, 'COMPACT_BYTES', 200)
+    path = str(tmp_path / 'ops.jsonl')
+    log = OpLog(path)
+    kept = log.append(add_op('Kept'))
+    for n in range(5):
+        log.mark_done(log.append(add_op(f"Task {n}"))['op_id'])
+
+    assert records(path)[0] == {'op': kept}
+    assert len(records(path)) < 1 + 5 * 2
+
+
+def test_batches_stay_claimed_until_released(tmp_path):
+    log = OpLog(str(tmp_path / 'ops.jsonl'))
+    batch = [add_op('Same'), add_op('Same')]
+
+    log.append_batch(batch)
+    assert len(log) == 2 and log.pending_ops() == []
+    log.release([batch[1]['op_id']])
+
+    assert [op['op_id'] for op in log.pending_ops()] == [batch[1]['op_id']]
+
+
+class FakePage:
+    """The page runtime, answering each call with the next scripted result"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+        self.ready = True
+
+    def call(self, name, *args, callback):
+        self.calls.append((name,) + args)
+        callback(self.results.pop(0))
+
+
+@pytest.fixture
+def writer(app, store, tmp_path, monkeypatch):
+    # No credentials, so every op goes through the page
+    monkeypatch.delenv('GOOGLE_TASKS_TOKEN', raising=False)
+    settings = {'api_token_file': str(tmp_path / 'no-token.json'), 'api_base_url': ''}
+    page = FakePage()
+    writer = TaskWriter(store, settings, page.call, lambda: page.ready,
+                        op_log=OpLog(str(tmp_path / 'ops.jsonl')))
+    writer.page = page
+    yield writer
+    writer.retry_timer.stop()
+
+
+def test_ops_queued_while_the_page_is_away_are_replayed_in_order(writer):
+    writer.page.ready = False
+    needed = []
+    writer.page_needed.connect(lambda: needed.append(True))
+
+    writer.add('First')
+    writer.complete('t1', title='Second')
+    assert writer.page.calls == [] and needed and writer.pending_count() == 2
+
+    writer.page.ready = True
+    writer.page.results = [True, True]
+    writer.replay()
+
+    assert [call[:2] for call in writer.page.calls] == [('addTask', 'First'),
+                                                       ('completeTask', 't1')]
+    assert writer.pending_count() == 0
+
+
+def test_a_failed_page_call_backs_off_exponentially(writer, monkeypatch):
+    delays = []
+    monkeypatch.setattr(writer.retry_timer, 'start', delays.append)
+    monkeypatch.setattr(writer.retry_timer, 'isActive', lambda: False)
+    writer.page.results = [False] * 10
+
+    writer.add('Flaky')
+    for _ in range(9):
+        writer.replay()
+
+    assert delays[:3] == [RETRY_MIN_SECONDS * 1000, RETRY_MIN_SECONDS * 2000,
+                          RETRY_MIN_SECONDS * 4000]
+    assert delays[-1] == RETRY_MAX_SECONDS * 1000
+    assert writer.pending_count() == 1
+
+    writer.page.results = [True]
+    writer.replay()
+    assert writer.pending_count() == 0
+    assert writer.retry_seconds == RETRY_MIN_SECONDS
+
+
+def test_a_retry_already_scheduled_is_not_pushed_back(writer, monkeypatch):
+    delays = []
+    monkeypatch.setattr(writer.retry_timer, 'start', delays.append)
+    monkeypatch.setattr(writer.retry_timer, 'isActive', lambda: bool(delays))
+    writer.page.results = [False, False]
+
+    writer.add('Flaky')
+    writer.replay()
+
+    assert delays == [RETRY_MIN_SECONDS * 1000]
+
+
+def test_completing_a_task_missing_from_the_page_retires_the_op(writer):
+    failures = []
+    writer.failed.connect(lambda title, error: failures.append(title))
+    writer.page.results = [NOT_FOUND]
+
+    writer.complete('gone', title='Old task')
+
+    assert failures == ['Old task']
+    assert writer.pending_count() == 0
+    assert not writer.retry_timer.isActive()
+
+
+def test_unsent_ops_are_replayed_by_a_new_writer(writer, store, tmp_path):
+    writer.page.ready = False
+    writer.add('Survives a restart')
+
+    page = FakePage(True)
+    restarted = TaskWriter(store, writer.settings, page.call, lambda: True,
+                           op_log=OpLog(str(tmp_path / 'ops.jsonl')))
+    restarted.replay()
+
+    assert page.calls[0][:2] == ('addTask', 'Survives a restart')
+    assert restarted.pending_count() == 0
+
@@ -0,0 +1,41 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.page_dates import page_due_date, page_due_ts
+
+TODAY = date(2026, 10, 18)
+
+
+@pytest.mark.parametrize('label, expected', [
+    ('Today', date(2026, 10, 18)),
+    ('Tomorrow', date(2026, 10, 19)),
+    ('Yesterday', date(2026, 10, 17)),
+    ('Tue, Oct 20', date(2026, 10, 20)),
+    ('Oct 20', date(2026, 10, 20)),
+    ('20 Oct', date(2026, 10, 20)),
+    ('Mon, Jan 4, 2027', date(2027, 1, 4)),
+    ('Tue, May 1', date(2026, 5, 1)),
+])
+def test_labels(label, expected):
+    assert page_due_date(label, TODAY) == expected
+
+
+def test_year_less_label_takes_the_year_closest_to_today():
+    # Seen in late December, early January is next year
+    assert page_due_date('Jan 3', date(2026, 12, 28)) == date(2027, 1, 3)
+    # Seen in early January, late December is last year (overdue)
+    assert page_due_date('Dec 20', date(2027, 1, 5)) == date(2026, 12, 20)
+
+
+@pytest.mark.parametrize('label', ['', 'Overdue', 'Repeats weekly', 'Feb 30', 'Foo 3'])
+def test_non_dates_are_none(label):
+    assert page_due_date(label, TODAY) is None
+    assert page_due_ts(label, TODAY) is None
+
+
+def test_due_ts_is_local_midnight_of_the_current_year():
+    due_ts = page_due_ts('Tue, May 1')
+    due = datetime.fromtimestamp(due_ts)
+    assert (due.hour, due.minute) == (0, 0)
+    assert abs(due.year - date.today().year) <= 1
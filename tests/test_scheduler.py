@@ -0,0 +1,127 @@
+import pytest
+from PyQt5.QtCore import QTimer
+
+from src import scheduler
+from src.scheduler import MAX_SLEEP_MS, DueScheduler
+
+NOW = 1_000_000.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def due(app, clock):
+    due = DueScheduler()
+    due.fired = []
+    due.tasks_due.connect(lambda tasks: due.fired.append([task['id'] for task in tasks]))
+    yield due
+    due._timer.stop()
+
+
+def task(task_id, due_ts, completed=False):
+    return {'id': task_id, 'due_ts': due_ts, 'completed': completed}
+
+
+def fire_at(due, clock, ts):
+    clock.now = ts
+    due._fire()
+    return due.fired.pop() if due.fired else []
+
+
+def test_the_earliest_task_is_next_whatever_the_order(due):
+    due.set_tasks([task('c', NOW + 300), task('a', NOW + 100), task('b', NOW + 200),
+                   task('done', NOW + 50, completed=True), task('undated', None)])
+
+    assert due.next_due() == NOW + 100
+    assert due._timer.isActive()
+    assert due._timer.interval() == 100 * 1000
+
+
+def test_tasks_fire_in_due_order_once_each(due, clock):
+    due.set_tasks([task(str(n), NOW + n) for n in (5, 1, 4, 2, 3)])
+
+    assert fire_at(due, clock, NOW + 2) == ['1', '2']
+    assert fire_at(due, clock, NOW + 2) == []
+    assert fire_at(due, clock, NOW + 10) == ['3', '4', '5']
+    assert due.next_due() is None
+    assert not due._timer.isActive()
+
+
+def test_rescheduling_a_task_moves_it(due, clock):
+    due.set_tasks([task('a', NOW + 100), task('b', NOW + 200)])
+
+    due.update([task('a', NOW + 300)], [])
+
+    assert due.next_due() == NOW + 200
+    assert due._timer.interval() == 200 * 1000
+    assert fire_at(due, clock, NOW + 150) == []
+    assert fire_at(due, clock, NOW + 250) == ['b']
+    assert fire_at(due, clock, NOW + 350) == ['a']
+
+
+def test_rescheduling_earlier_rearms_the_timer(due):
+    due.set_tasks([task('a', NOW + 100)])
+
+    due.update([task('b', NOW + 10)], [])
+
+    assert due.next_due() == NOW + 10
+    assert due._timer.interval() == 10 * 1000
+
+
+def test_completed_and_removed_tasks_never_fire(due, clock):
+    due.set_tasks([task('a', NOW + 100), task('b', NOW + 200), task('c', NOW + 300)])
+
+    due.update([task('a', NOW + 100, completed=True)], ['b'])
+
+    assert due.next_due() == NOW + 300
+    assert fire_at(due, clock, NOW + 400) == ['c']
+
+
+def test_completing_the_last_task_stops_the_timer(due):
+    due.set_tasks([task('a', NOW + 100)])
+
+    due.update([task('a', NOW + 100, completed=True)], [])
+
+    assert due.next_due() is None
+    assert not due._timer.isActive()
+
+
+def test_overdue_tasks_fire_straight_away(due):
+    due.set_tasks([task('late', NOW - 60)])
+
+    assert due._timer.interval() == 0
+
+
+def test_far_off_tasks_are_rechecked_within_the_sleep_limit(due):
+    due.set_tasks([task('a', NOW + 10 * 24 * 3600)])
+
+    assert due._timer.interval() == MAX_SLEEP_MS
+
+
+def test_one_timer_however_many_tasks(due):
+    due.set_tasks([task(str(n), NOW + n) for n in range(1000)])
+    due.update([task(str(n), NOW + 2000 + n) for n in range(0, 1000, 2)], [])
+
+    assert len(due.findChildren(QTimer)) == 1
+
+
+def test_stale_heap_entries_are_compacted(due):
+    due.set_tasks([task('a', NOW + 1)])
+    for n in range(500):
+        due.update([task('a', NOW + 1000 - n)], [])
+
+    assert due.next_due() == NOW + 501
+    assert len(due._heap) <= 2 * len(due._pending) + 64
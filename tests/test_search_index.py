@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from src import search_index
+from src.search_index import SearchIndex, tokenize
+
+WORDS = ('buy', 'milk', 'bread', 'beer', 'email', 'meeting', 'report', 'review',
+         'keep', 'deep', 'green', 'tree', 'free', 'seen', 'need', 'feed')
+
+
+def reference_search(tasks, query, limit=50):
+    """Every query token prefixes a term, or is inside one from 3 characters"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    def matches(task):
+        terms = SearchIndex._terms(task)
+        return all(any(term.startswith(token) or (len(token) >= 3 and token in term)
+                       for term in terms) for token in tokens)
+
+    hits = sorted((SearchIndex._rank(task), task['id']) for task in tasks.values()
+                  if matches(task))
+    return [task_id for _, task_id in hits[:limit]]
+
+
+def random_task(rng, task_id):
+    due_ts = rng.choice([None, rng.randrange(1_700_000_000, 1_700_100_000, 3600)])
+    return {'id': task_id,
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(1, 3))),
+            'notes': rng.choice(['', ' '.join(rng.choices(WORDS, k=2))]),
+            'due': '' if due_ts is None else '2023-11-14',
+            'due_ts': due_ts,
+            'completed': rng.random() < 0.3}
+
+
+def random_query(rng):
+    words = rng.choices(WORDS, k=rng.randint(1, 2))
+    # Whole words, prefixes and infixes of every length
+    parts = []
+    for word in words:
+        start = rng.randrange(len(word))
+        parts.append(word[rng.choice([0, start]):rng.randint(start + 1, len(word))])
+    return ' '.join(parts)
+
+
+@pytest.fixture(params=['plain', 'bitsets'])
+def thresholds(request, monkeypatch):
+    if request.param == 'bitsets':
+        # Small enough that the bitset and scan paths all get used
+        monkeypatch.setattr(search_index, 'BITSET_MIN', 4)
+        monkeypatch.setattr(search_index, 'SCAN_RATIO', 4)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_search_agrees_with_a_reference_matcher(seed, thresholds):
+    rng = random.Random(seed)
+    tasks = {f"t{n}": random_task(rng, f"t{n}") for n in range(120)}
+    index = SearchIndex()
+    index.reset(tasks.values())
+    next_id = len(tasks)
+
+    for step in range(300):
+        action = rng.random()
+        if action < 0.15:
+            task = random_task(rng, f"t{next_id}")
+            next_id += 1
+            tasks[task['id']] = task
+            index.add(task)
+        elif action < 0.25 and tasks:
+            task = random_task(rng, rng.choice(sorted(tasks)))
+            tasks[task['id']] = task
+            index.update([task], [])
+        elif action < 0.35 and tasks:
+            task_id = rng.choice(sorted(tasks))
+            del tasks[task_id]
+            index.remove(task_id)
+        query = random_query(rng)
+        limit = rng.choice([1, 5, 50])
+        found = [task['id'] for task in index.search(query, limit)]
+        assert found == reference_search(tasks, query, limit), (step, query)
+
+    assert len(index) == len(tasks)
+
+
+def test_short_tokens_match_only_at_the_start_of_a_word():
+    index = SearchIndex()
+    index.reset([{'id': 'a', 'title': 'green tree'}, {'id': 'b', 'title': 'email'}])
+
+    assert index.search('ee') == []
+    assert [task['id'] for task in index.search('ree')] == ['a']
+    assert [task['id'] for task in index.search('em')] == ['b']
+
+
+def test_every_token_has_to_match():
+    index = SearchIndex()
+    index.reset([{'id': 'a', 'title': 'buy milk'}, {'id': 'b', 'title': 'buy bread'}])
+
+    assert [task['id'] for task in index.search('buy mil')] == ['a']
+    assert index.search('milk bread') == []
+    assert index.search('  ') == []
+
+
+def test_pending_tasks_rank_first_then_by_due_date():
+    index = SearchIndex()
+    index.reset([
+        {'id': 'done', 'title': 'report', 'due_ts': 1, 'completed': True},
+        {'id': 'undated', 'title': 'report'},
+        {'id': 'later', 'title': 'report', 'due_ts': 200},
+        {'id': 'sooner', 'title': 'report', 'due_ts': 100},
+    ])
+
+    assert [task['id'] for task in index.search('rep')] == ['sooner', 'later', 'undated', 'done']
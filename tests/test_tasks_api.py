@@ -0,0 +1,158 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from src import tasks_api
+from src.google_auth import StaticToken
+from src.tasks_api import AuthError, TasksApiClient, sync, task_from_api
+
+
+def task_requests(fake_api, list_id):
+    return [request for request in fake_api.requests
+            if request[1] == f'/lists/{list_id}/tasks']
+
+
+def test_first_sync_stores_every_list_and_task(fake_api, client, store):
+    fake_api.add_list('work')
+    fake_api.add_list('home')
+    fake_api.put_task('work', 'w1', title='Write report', due='2026-05-01T00:00:00.000Z')
+    fake_api.put_task('home', 'h1', title='Water plants', status='completed')
+
+    assert len(sync(client, store)) == 2
+
+    assert store.preferred_source() == 'api'
+    assert {tl['id'] for tl in store.tasklists()} == {'work', 'home'}
+    report = store.get_task('w1', source='api')
+    assert report['title'] == 'Write report'
+    assert report['list_id'] == 'work'
+    assert report['due'] == '2026-05-01'
+    assert store.get_task('h1', source='api')['completed'] is True
+
+
+def test_pagination_follows_next_page_token(fake_api, client, store, monkeypatch):
+    monkeypatch.setattr(tasks_api, 'PAGE_SIZE', 10)
+    fake_api.add_list('big')
+    for n in range(25):
+        fake_api.put_task('big', f't{n}', title=f"Task {n}")
+
+    assert len(sync(client, store)) == 25
+
+    assert store.count() == 25
+    page_tokens = [query.get('pageToken', [None])[0]
+                   for _, _, query, _ in task_requests(fake_api, 'big')]
+    assert page_tokens == [None, '10', '20']
+
+
+def test_unchanged_list_costs_one_not_modified_round_trip(fake_api, client, store):
+    fake_api.add_list('work')
+    fake_api.put_task('work', 'w1', title='Write report')
+    sync(client, store)
+    etag = store.get_state('list:work:etag')
+    fake_api.requests.clear()
+
+    assert len(sync(client, store)) == 0
+
+    requests = task_requests(fake_api, 'work')
+    assert len(requests) == 1
+    assert requests[0][3] == etag
+    assert store.get_task('w1', source='api')['title'] == 'Write report'
+
+
+def test_incremental_sync_sends_updated_min_and_merges_changes(fake_api, client, store):
+    fake_api.add_list('work')
+    fake_api.put_task('work', 'w1', title='Write report')
+    fake_api.put_task('work', 'w2', title='Book flights')
+    fake_api.put_task('work', 'w3', title='Call Sam')
+    sync(client, store)
+    newest = store.get_state('list:work:updated_min')
+    fake_api.requests.clear()
+
+    fake_api.put_task('work', 'w1', title='Write final report')
+    fake_api.delete_task('work', 'w2')
+    fake_api.put_task('work', 'w4', title='Send invoice')
+
+    assert len(sync(client, store)) == 4
+
+    (_, _, query, _), = task_requests(fake_api, 'work')
+    assert query['updatedMin'] == [newest]
+    assert query['showDeleted'] == ['true']
+    assert store.get_task('w1', source='api')['title'] == 'Write final report'
+    assert store.get_task('w2', source='api') is None
+    assert store.get_task('w3', source='api')['title'] == 'Call Sam'
+    assert store.get_task('w4', source='api')['title'] == 'Send invoice'
+    assert store.get_state('list:work:updated_min') > newest
+
+
+def test_removed_list_drops_its_tasks(fake_api, client, store):
+    fake_api.add_list('work')
+    fake_api.add_list('old')
+    fake_api.put_task('old', 'o1', title='Stale')
+    sync(client, store)
+
+    del fake_api.lists['old']
+    sync(client, store)
+
+    assert [tl['id'] for tl in store.tasklists()] == ['work']
+    assert store.get_task('o1', source='api') is None
+    assert store.get_state('list:old:etag') is None
+
+
+def test_api_sync_leaves_page_tasks_with_the_same_id_alone(fake_api, client, store):
+    store.upsert_tasks([{'id': 'shared', 'title': 'From the page'}])
+    fake_api.add_list('work')
+    fake_api.put_task('work', 'shared', title='From the API')
+    sync(client, store)
+
+    fake_api.delete_task('work', 'shared')
+    sync(client, store)
+
+    assert store.get_task('shared', source='api') is None
+    assert store.get_task('shared', source='page')['title'] == 'From the page'
+
+
+def test_expired_token_raises_auth_error(fake_api, store):
+    fake_api.add_list('work')
+    client = TasksApiClient(StaticToken('expired'), fake_api.base_url)
+
+    with pytest.raises(AuthError):
+        sync(client, store)
+    assert store.get_state('last_sync') is None
+
+
+def test_rejected_token_is_refreshed_once(fake_api, store):
+    class Refreshing:
+        token = 'expired'
+
+        def access_token(self):
+            return self.token
+
+        def refresh(self):
+            self.token = fake_api.valid_token
+            return True
+
+    fake_api.add_list('work')
+    fake_api.put_task('work', 'w1', title='Write report')
+
+    assert len(sync(TasksApiClient(Refreshing(), fake_api.base_url), store)) == 1
+
+
+def test_date_only_due_is_local_midnight():
+    task = task_from_api({'id': 'a', 'due': '2026-05-01T00:00:00.000Z'}, 'work')
+
+    due = datetime.fromtimestamp(task['due_ts'])
+    assert (due.year, due.month, due.day, due.hour, due.minute) == (2026, 5, 1, 0, 0)
+    assert task_from_api({'id': 'b'}, 'work')['due_ts'] is None
+
+
+def test_due_is_local_midnight_in_other_time_zones(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip("time.tzset is not available on this platform")
+    monkeypatch.setenv('TZ', 'America/Los_Angeles')
+    time.tzset()
+    try:
+        task = task_from_api({'id': 'a', 'due': '2026-05-01T00:00:00.000Z'}, 'work')
+        assert time.localtime(task['due_ts'])[:4] == (2026, 5, 1, 0)
+    finally:
+        monkeypatch.undo()
+        time.tzset()